@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from Media.serializers import ImageVariantsField
 
 User = get_user_model()
 
@@ -33,11 +34,12 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer for user profile"""
     profile_image = serializers.SerializerMethodField()
+    profile_image_variants = ImageVariantsField(source='profile_image')
     
     class Meta:
         model = User
         fields = ('id', 'username', 'email', 'first_name', 'last_name', 'date_joined', 
-                 'profile_image', 'phone_number', 'address', 'date_of_birth')
+                 'profile_image', 'profile_image_variants', 'phone_number', 'address', 'date_of_birth')
         read_only_fields = ('id', 'username', 'date_joined', 'created_at', 'updated_at')
     
     def get_profile_image(self, obj):
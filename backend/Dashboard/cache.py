@@ -0,0 +1,42 @@
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from backend.conditional import request_fingerprint
+from .models import MonthlyRollup, DailyRollup
+
+
+def cache_dashboard_response(view_method):
+    """
+    Cache successful dashboard GET responses, keyed by view, query params,
+    today's date (views default to the current year/month) and the rollup
+    table fingerprint.
+    The fingerprint is read from the database on every request (usually
+    already by conditional_get), so a write made through any worker changes
+    the key everywhere, even with a per-process cache backend.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        params = urlencode(sorted(request.query_params.items()))
+        fingerprint = hashlib.md5(
+            str(request_fingerprint(request, MonthlyRollup, DailyRollup)).encode(), usedforsecurity=False
+        ).hexdigest()
+        key = (
+            f'dashboard:{type(self).__name__}:{timezone.now().date().isoformat()}:'
+            f'{fingerprint}:{params}'
+        )
+
+        data = cache.get(key)
+        if data is not None:
+            return Response(data, status=status.HTTP_200_OK)
+
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.DASHBOARD_CACHE_TIMEOUT)
+        return response
+
+    return wrapper
@@ -0,0 +1,64 @@
+import time
+from django.core.management.base import BaseCommand
+from Dashboard.responses import MonthlyProfit, DashboardData, DashboardSummary
+from Dashboard.serializers import DashboardDataSerializer
+
+
+def build_points(count):
+    return [
+        MonthlyProfit(
+            month=f'P{index}',
+            product_profit=index * 10.5,
+            project_profit=index * 3.25,
+            total_profit=index * 13.75
+        )
+        for index in range(count)
+    ]
+
+
+def build_response(points):
+    return DashboardData(
+        chart_data=points,
+        summary=DashboardSummary(
+            total_product_profit=1.0,
+            total_project_profit=2.0,
+            total_profit=3.0,
+            current_month_profit=4.0,
+            current_month='P0'
+        ),
+        current_month='P0'
+    ).to_dict()
+
+
+def build_and_validate(points):
+    data = build_response(points)
+    DashboardDataSerializer(data=data).is_valid()
+    return data
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the per-request CPU time of building a dashboard response "
+        "with and without the serializer validation round-trip"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500)
+        parser.add_argument('--points', type=int, nargs='+', default=[12, 365])
+
+    def measure(self, func, points, iterations):
+        start = time.process_time()
+        for _ in range(iterations):
+            func(points)
+        return (time.process_time() - start) / iterations * 1000
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        self.stdout.write(f"{'points':>8} {'validated ms':>14} {'dto only ms':>13} {'saved ms':>10}")
+        for count in options['points']:
+            points = build_points(count)
+            validated = self.measure(build_and_validate, points, iterations)
+            dto_only = self.measure(build_response, points, iterations)
+            self.stdout.write(
+                f"{count:>8} {validated:>14.3f} {dto_only:>13.3f} {validated - dto_only:>10.3f}"
+            )
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from Dashboard.rollups import check_rollups, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Compare the dashboard rollup tables against a full recompute and report any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Rebuild the rollup tables when drift is found',
+        )
+
+    def handle(self, *args, **options):
+        drift = check_rollups()
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Dashboard rollups are consistent"))
+            return
+
+        for entry in drift:
+            self.stdout.write(
+                f"{entry['table']} {entry['bucket']} {entry['field']}: "
+                f"stored {entry['stored']}, expected {entry['expected']}"
+            )
+
+        if options['fix']:
+            monthly, daily = rebuild_rollups()
+            self.stdout.write(self.style.WARNING(
+                f"Rebuilt {monthly} monthly and {daily} daily rollup rows"
+            ))
+        else:
+            raise CommandError(f"Found {len(drift)} drifted rollup values")
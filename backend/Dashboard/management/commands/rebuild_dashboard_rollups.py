@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from Dashboard.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the dashboard rollup tables from scratch using the raw source tables"
+
+    def handle(self, *args, **options):
+        monthly, daily = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {monthly} monthly and {daily} daily rollup rows"
+        ))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('source', models.CharField(choices=[('product', 'Product'), ('zarorrat', 'Zarorrat Project'), ('unique_solar', 'Unique Solar Project'), ('expense', 'Expense'), ('salary', 'Salary')], max_length=20)),
+                ('record_count', models.PositiveIntegerField(default=0)),
+                ('pending_count', models.PositiveIntegerField(default=0, help_text="Projects with status 'pending' (projects only)")),
+                ('amount', models.DecimalField(decimal_places=2, default=0, help_text='Product profit, project amount, expense or salary total', max_digits=14)),
+                ('active_amount', models.DecimalField(decimal_places=2, default=0, help_text="Amount of 'complete' and 'in_progress' projects (same as amount for other sources)", max_digits=14)),
+                ('sales_value', models.DecimalField(decimal_places=2, default=0, help_text='Total sale value (products only)', max_digits=14)),
+                ('purchase_cost', models.DecimalField(decimal_places=2, default=0, help_text='Total purchase cost (products only)', max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['year', 'month', 'source'],
+                'unique_together': {('year', 'month', 'source')},
+            },
+        ),
+    ]
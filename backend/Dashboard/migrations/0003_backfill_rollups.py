@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def backfill_rollups(apps, schema_editor):
+    """Fill the rollup tables from the source tables, like rebuild_dashboard_rollups"""
+    from Dashboard.rollups import rebuild_rollups
+    rebuild_rollups(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Dashboard', '0002_dailyrollup'),
+        # The source tables as the rollups read them
+        ('Product', '0002_alter_productimage_image'),
+        ('Project', '0014_alter_uniquesolarprojectimage_image'),
+        ('Expense', '0004_alter_expense_image1_alter_expense_image2_and_more'),
+        ('Salary', '0011_advancebalance'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
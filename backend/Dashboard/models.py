@@ -1,3 +1,81 @@
 from django.db import models
 
 # Create your models here.
+
+class RollupTotals(models.Model):
+    """Totals shared by the monthly and daily dashboard rollups"""
+    SOURCE_CHOICES = [
+        ('product', 'Product'),
+        ('zarorrat', 'Zarorrat Project'),
+        ('unique_solar', 'Unique Solar Project'),
+        ('expense', 'Expense'),
+        ('salary', 'Salary'),
+    ]
+
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    # Plain integers (not Positive*) so a drifted row can never make a
+    # source write fail on a CHECK constraint while deltas are applied
+    record_count = models.IntegerField(default=0)
+    pending_count = models.IntegerField(
+        default=0,
+        help_text="Projects with status 'pending' (projects only)"
+    )
+    amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Product profit, project amount, expense or salary total"
+    )
+    active_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Amount of 'complete' and 'in_progress' projects (same as amount for other sources)"
+    )
+    sales_value = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Total sale value (products only)"
+    )
+    purchase_cost = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Total purchase cost (products only)"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+
+class MonthlyRollup(RollupTotals):
+    """
+    Pre-aggregated monthly totals for one dashboard data source.
+
+    One row per (year, month, source). Rows are kept current by the
+    signal handlers in Dashboard.signals and can be rebuilt from the raw
+    tables with `python manage.py rebuild_dashboard_rollups`.
+    """
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+
+    def __str__(self):
+        return f"{self.year}-{self.month:02d} {self.source}"
+
+    class Meta:
+        ordering = ['year', 'month', 'source']
+        unique_together = ['year', 'month', 'source']
+
+
+class DailyRollup(RollupTotals):
+    """Pre-aggregated daily totals for one dashboard data source"""
+    date = models.DateField()
+
+    def __str__(self):
+        return f"{self.date} {self.source}"
+
+    class Meta:
+        ordering = ['date', 'source']
+        unique_together = ['date', 'source']
@@ -0,0 +1,101 @@
+from dataclasses import dataclass, field
+from django.conf import settings
+
+
+@dataclass(slots=True)
+class MonthlyProfit:
+    """One chart point of DashboardDataView"""
+    month: str
+    product_profit: float = 0
+    project_profit: float = 0
+    total_profit: float = 0
+
+    def to_dict(self):
+        return {
+            'month': self.month,
+            'product_profit': self.product_profit,
+            'project_profit': self.project_profit,
+            'total_profit': self.total_profit,
+        }
+
+
+@dataclass(slots=True)
+class DashboardSummary:
+    total_product_profit: float
+    total_project_profit: float
+    total_profit: float
+    current_month_profit: float
+    current_month: str
+
+    def to_dict(self):
+        return {
+            'total_product_profit': self.total_product_profit,
+            'total_project_profit': self.total_project_profit,
+            'total_profit': self.total_profit,
+            'current_month_profit': self.current_month_profit,
+            'current_month': self.current_month,
+        }
+
+
+@dataclass(slots=True)
+class DashboardData:
+    """Response body of DashboardDataView (see DashboardDataSerializer)"""
+    chart_data: list
+    summary: DashboardSummary
+    current_month: str
+    success: bool = True
+
+    def to_dict(self):
+        return {
+            'success': self.success,
+            'chart_data': [point.to_dict() for point in self.chart_data],
+            'summary': self.summary.to_dict(),
+            'current_month': self.current_month,
+        }
+
+
+@dataclass(slots=True)
+class DashboardStats:
+    total_projects: int
+    total_products: int
+    total_expenses: float
+    total_salaries: float
+    pending_projects: int
+    year: int
+
+    def to_dict(self):
+        return {
+            'total_projects': self.total_projects,
+            'total_products': self.total_products,
+            'total_expenses': self.total_expenses,
+            'total_salaries': self.total_salaries,
+            'pending_projects': self.pending_projects,
+            'year': self.year,
+        }
+
+
+@dataclass(slots=True)
+class DashboardSummaryResponse:
+    """Response body of DashboardSummaryView (see DashboardSummaryResponseSerializer)"""
+    summary: DashboardStats
+    success: bool = True
+
+    def to_dict(self):
+        return {
+            'success': self.success,
+            'summary': self.summary.to_dict(),
+        }
+
+
+def schema_errors(serializer_class, data):
+    """
+    Validate a response body against its serializer when
+    DASHBOARD_VALIDATE_RESPONSES is on (debug and test runs).
+    Returns the serializer errors, or None when valid or skipped.
+    """
+    if not settings.DASHBOARD_VALIDATE_RESPONSES:
+        return None
+    serializer = serializer_class(data=data)
+    if serializer.is_valid():
+        return None
+    return serializer.errors
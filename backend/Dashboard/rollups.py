@@ -0,0 +1,300 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Sum, Count, Q, F, DecimalField
+from django.utils import timezone
+from Product.models import Product
+from Project.models import ZarorratProject, UniqueSolarProject
+from Expense.models import Expense
+from Salary.models import Salary
+from .models import MonthlyRollup, DailyRollup
+
+ACTIVE_PROJECT_STATUSES = ['complete', 'in_progress']
+PROJECT_SOURCES = ['zarorrat', 'unique_solar']
+
+COUNT_FIELDS = ['record_count', 'pending_count']
+MONEY_FIELDS = ['amount', 'active_amount', 'sales_value', 'purchase_cost']
+ROLLUP_FIELDS = COUNT_FIELDS + MONEY_FIELDS
+
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+
+class ProductSource:
+    """Product profit, sale value and purchase cost"""
+    model = Product
+    fields = ['date', 'sale_price', 'purchase_price', 'quantity']
+
+    def aggregates(self):
+        profit = (F('sale_price') - F('purchase_price')) * F('quantity')
+        return {
+            'record_count': Count('id'),
+            'amount': Sum(profit, output_field=MONEY),
+            'active_amount': Sum(profit, output_field=MONEY),
+            'sales_value': Sum(F('sale_price') * F('quantity'), output_field=MONEY),
+            'purchase_cost': Sum(F('purchase_price') * F('quantity'), output_field=MONEY),
+        }
+
+    def contribution(self, values):
+        sales = values['sale_price'] * values['quantity']
+        cost = values['purchase_price'] * values['quantity']
+        return {
+            'record_count': 1,
+            'amount': sales - cost,
+            'active_amount': sales - cost,
+            'sales_value': sales,
+            'purchase_cost': cost,
+        }
+
+
+class ProjectSource:
+    """Project amounts, split by status"""
+
+    def __init__(self, model, amount_field):
+        self.model = model
+        self.amount_field = amount_field
+        self.fields = ['date', 'status', amount_field]
+
+    def aggregates(self):
+        return {
+            'record_count': Count('id'),
+            'pending_count': Count('id', filter=Q(status='pending')),
+            'amount': Sum(self.amount_field),
+            'active_amount': Sum(self.amount_field, filter=Q(status__in=ACTIVE_PROJECT_STATUSES)),
+        }
+
+    def contribution(self, values):
+        amount = values[self.amount_field]
+        return {
+            'record_count': 1,
+            'pending_count': 1 if values['status'] == 'pending' else 0,
+            'amount': amount,
+            'active_amount': amount if values['status'] in ACTIVE_PROJECT_STATUSES else 0,
+        }
+
+
+class AmountSource:
+    """Plain amount totals (expenses, salaries)"""
+
+    def __init__(self, model):
+        self.model = model
+        self.fields = ['date', 'amount']
+
+    def aggregates(self):
+        return {
+            'record_count': Count('id'),
+            'amount': Sum('amount'),
+            'active_amount': Sum('amount'),
+        }
+
+    def contribution(self, values):
+        return {
+            'record_count': 1,
+            'amount': values['amount'],
+            'active_amount': values['amount'],
+        }
+
+
+SOURCES = {
+    'product': ProductSource(),
+    'zarorrat': ProjectSource(ZarorratProject, 'amount'),
+    'unique_solar': ProjectSource(UniqueSolarProject, 'grand_total'),
+    'expense': AmountSource(Expense),
+    'salary': AmountSource(Salary),
+}
+
+SOURCE_BY_MODEL = {source.model: name for name, source in SOURCES.items()}
+
+
+def _model(model, apps=None):
+    """The model itself, or its historical version when run from a migration"""
+    return apps.get_model(model._meta.label) if apps else model
+
+
+def _compute(rollup_model, group_by, build_key, apps=None):
+    rows = []
+    for name, source in SOURCES.items():
+        grouped = _model(source.model, apps).objects.order_by().values(*group_by).annotate(**{
+            # Prefixed so 'amount' does not clash with the model field
+            f'rollup_{field}': expression for field, expression in source.aggregates().items()
+        })
+
+        for row in grouped:
+            rollup = rollup_model(source=name, **build_key(row))
+            for field in ROLLUP_FIELDS:
+                setattr(rollup, field, row.get(f'rollup_{field}') or 0)
+            rows.append(rollup)
+    return rows
+
+
+def compute_monthly_rollups(apps=None):
+    """Aggregate every source table into (year, month, source) buckets"""
+    return _compute(
+        _model(MonthlyRollup, apps),
+        ['date__year', 'date__month'],
+        lambda row: {'year': row['date__year'], 'month': row['date__month']},
+        apps,
+    )
+
+
+def compute_daily_rollups(apps=None):
+    """Aggregate every source table into (date, source) buckets"""
+    return _compute(_model(DailyRollup, apps), ['date'], lambda row: {'date': row['date']}, apps)
+
+
+def rebuild_rollups(apps=None):
+    """
+    Replace both rollup tables with a full recompute.
+    Pass the migration app registry as `apps` to run it from a migration.
+    Returns (monthly row count, daily row count).
+    """
+    monthly_model = _model(MonthlyRollup, apps)
+    daily_model = _model(DailyRollup, apps)
+    monthly = compute_monthly_rollups(apps)
+    daily = compute_daily_rollups(apps)
+    with transaction.atomic():
+        monthly_model.objects.all().delete()
+        monthly_model.objects.bulk_create(monthly)
+        daily_model.objects.all().delete()
+        daily_model.objects.bulk_create(daily)
+    return len(monthly), len(daily)
+
+
+def snapshot(instance):
+    """Return the rollup-relevant field values of a model instance"""
+    source = SOURCES[SOURCE_BY_MODEL[type(instance)]]
+    values = {}
+    for name in source.fields:
+        field = instance._meta.get_field(name)
+        # to_python normalises e.g. the datetime default of a DateField
+        values[name] = field.to_python(getattr(instance, name))
+    return values
+
+
+def stored_values(instance):
+    """Return the rollup-relevant field values currently in the database"""
+    source = SOURCES[SOURCE_BY_MODEL[type(instance)]]
+    return type(instance).objects.filter(pk=instance.pk).values(*source.fields).first()
+
+
+def _add_to_bucket(rollup_model, source, lookup, delta):
+    rollup, _ = rollup_model.objects.get_or_create(source=source, **lookup)
+    updates = {field: F(field) + value for field, value in delta.items()}
+    rollup_model.objects.filter(pk=rollup.pk).update(updated_at=timezone.now(), **updates)
+    rollup_model.objects.filter(pk=rollup.pk, record_count=0).delete()
+
+
+def _apply_deltas(name, deltas):
+    """Add {date: {field: delta}} to the daily buckets and their monthly buckets"""
+    monthly = defaultdict(lambda: defaultdict(Decimal))
+    for day, delta in deltas.items():
+        delta = {field: value for field, value in delta.items() if value}
+        if not delta:
+            continue
+        _add_to_bucket(DailyRollup, name, {'date': day}, delta)
+        for field, value in delta.items():
+            monthly[(day.year, day.month)][field] += value
+
+    for (year, month), delta in monthly.items():
+        delta = {field: value for field, value in delta.items() if value}
+        if delta:
+            _add_to_bucket(MonthlyRollup, name, {'year': year, 'month': month}, delta)
+
+
+def apply_change(model, old_values=None, new_values=None):
+    """
+    Move one record's contribution from its old bucket to its new one.
+    Pass old_values=None for an insert and new_values=None for a delete.
+    """
+    name = SOURCE_BY_MODEL[model]
+    source = SOURCES[name]
+
+    deltas = defaultdict(lambda: defaultdict(Decimal))
+    if old_values:
+        for field, value in source.contribution(old_values).items():
+            deltas[old_values['date']][field] -= value
+    if new_values:
+        for field, value in source.contribution(new_values).items():
+            deltas[new_values['date']][field] += value
+
+    _apply_deltas(name, deltas)
+
+
+def apply_bulk_create(model, instances):
+    """
+    Add rows written with bulk_create (which sends no signals) to the rollups,
+    one bucket update per touched day and month rather than per row.
+    """
+    name = SOURCE_BY_MODEL[model]
+    source = SOURCES[name]
+
+    deltas = defaultdict(lambda: defaultdict(Decimal))
+    for instance in instances:
+        values = snapshot(instance)
+        for field, value in source.contribution(values).items():
+            deltas[values['date']][field] += value
+
+    _apply_deltas(name, deltas)
+
+
+def check_rollups():
+    """
+    Compare the stored rollups with a full recompute.
+    Returns a list of drift entries; an empty list means the tables are consistent.
+    """
+    drift = []
+    tables = [
+        (MonthlyRollup, compute_monthly_rollups(), lambda r: (r.year, r.month, r.source)),
+        (DailyRollup, compute_daily_rollups(), lambda r: (r.date, r.source)),
+    ]
+    for rollup_model, computed, key in tables:
+        expected = {key(rollup): rollup for rollup in computed}
+        stored = {key(rollup): rollup for rollup in rollup_model.objects.all()}
+
+        for bucket in sorted(expected.keys() | stored.keys()):
+            for field in ROLLUP_FIELDS:
+                expected_value = getattr(expected[bucket], field) if bucket in expected else 0
+                stored_value = getattr(stored[bucket], field) if bucket in stored else 0
+                if expected_value != stored_value:
+                    drift.append({
+                        'table': rollup_model.__name__,
+                        'bucket': bucket,
+                        'field': field,
+                        'expected': expected_value,
+                        'stored': stored_value,
+                    })
+    return drift
+
+
+def aggregate_range(start, end, sources=None):
+    """
+    Aggregate the raw source tables between two dates (inclusive) in the database,
+    one aggregate() query per source.
+    Returns the same {source: {field: value}} shape as totals_by_source.
+    """
+    totals = {}
+    for name in sources or SOURCES:
+        source = SOURCES[name]
+        row = source.model.objects.filter(date__range=(start, end)).aggregate(**{
+            f'rollup_{field}': expression for field, expression in source.aggregates().items()
+        })
+        totals[name] = {field: 0 for field in COUNT_FIELDS}
+        totals[name].update({field: Decimal('0') for field in MONEY_FIELDS})
+        for field in ROLLUP_FIELDS:
+            totals[name][field] = row.get(f'rollup_{field}') or totals[name][field]
+    return totals
+
+
+def totals_by_source(rollups):
+    """
+    Sum rollup rows per source.
+    Returns {source: {field: value}} with zeroes for sources without rows.
+    """
+    totals = {}
+    for source in SOURCES:
+        totals[source] = {field: 0 for field in COUNT_FIELDS}
+        totals[source].update({field: Decimal('0') for field in MONEY_FIELDS})
+
+    for rollup in rollups:
+        for field in ROLLUP_FIELDS:
+            totals[rollup.source][field] += getattr(rollup, field)
+    return totals
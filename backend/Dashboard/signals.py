@@ -0,0 +1,28 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from .rollups import SOURCE_BY_MODEL, apply_change, snapshot, stored_values
+
+
+def remember_stored_values(sender, instance, raw=False, **kwargs):
+    """Keep the pre-save database row so post_save can move it out of its old bucket"""
+    if raw:
+        return
+    instance._rollup_previous = stored_values(instance) if instance.pk else None
+
+
+def update_rollups_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = None if created else getattr(instance, '_rollup_previous', None)
+    apply_change(sender, old_values=previous, new_values=snapshot(instance))
+    instance._rollup_previous = None
+
+
+def update_rollups_on_delete(sender, instance, **kwargs):
+    apply_change(sender, old_values=snapshot(instance))
+
+
+def connect_rollup_signals():
+    for model in SOURCE_BY_MODEL:
+        pre_save.connect(remember_stored_values, sender=model, dispatch_uid=f'rollup_pre_save_{model.__name__}')
+        post_save.connect(update_rollups_on_save, sender=model, dispatch_uid=f'rollup_post_save_{model.__name__}')
+        post_delete.connect(update_rollups_on_delete, sender=model, dispatch_uid=f'rollup_post_delete_{model.__name__}')
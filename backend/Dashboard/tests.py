@@ -1,3 +1,427 @@
-from django.test import TestCase
+import io
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from decimal import Decimal
+from datetime import date
+from Product.models import Product
+from Project.models import ZarorratProject, UniqueSolarProject
+from Expense.models import Expense
+from Salary.models import Employee, Salary
+from .models import MonthlyRollup, DailyRollup
+from .rollups import rebuild_rollups, check_rollups
+from .responses import (
+    MonthlyProfit, DashboardData, DashboardSummary, DashboardStats, DashboardSummaryResponse, schema_errors
+)
+from .serializers import DashboardDataSerializer, DashboardSummaryResponseSerializer
+from .management.commands.benchmark_dashboard_responses import build_points, build_response
 
 # Create your tests here.
+
+class DashboardRollupTestCase(TestCase):
+    def setUp(self):
+        """Set up one record per source in March 2024"""
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        Product.objects.create(
+            name='Panel', brand='Jinko', customer_name='Ali', date=date(2024, 3, 5),
+            purchase_price=Decimal('100.00'), sale_price=Decimal('150.00'),
+            category='Solar', quantity=4
+        )
+        ZarorratProject.objects.create(
+            customer_name='Bilal', address='Lahore', date=date(2024, 3, 10),
+            valid_until=date(2024, 4, 10), amount=Decimal('1000.00'), status='complete'
+        )
+        ZarorratProject.objects.create(
+            customer_name='Hamza', address='Lahore', date=date(2024, 3, 12),
+            valid_until=date(2024, 4, 12), amount=Decimal('300.00'), status='pending'
+        )
+        UniqueSolarProject.objects.create(
+            customer_name='Usman', address='Karachi', date=date(2024, 3, 15),
+            valid_until=date(2024, 4, 15), installation_amount=Decimal('500.00'),
+            status='in_progress'
+        )
+        Expense.objects.create(
+            title='Fuel', utilizer='Tariq', amount=Decimal('80.00'), date=date(2024, 3, 20)
+        )
+        Salary.objects.create(
+            employee=Employee.for_name('Kashif'), month=date(2024, 3, 1), total_paid=400,
+            amount=Decimal('400.00'), date=date(2024, 3, 31)
+        )
+
+    def test_rebuild_creates_one_row_per_source_and_month(self):
+        """Test that the rebuild aggregates each source into its month"""
+        self.assertEqual(rebuild_rollups(), (5, 6))
+
+        zarorrat = MonthlyRollup.objects.get(year=2024, month=3, source='zarorrat')
+        self.assertEqual(zarorrat.record_count, 2)
+        self.assertEqual(zarorrat.pending_count, 1)
+        self.assertEqual(zarorrat.amount, Decimal('1300.00'))
+        self.assertEqual(zarorrat.active_amount, Decimal('1000.00'))
+
+        product = MonthlyRollup.objects.get(year=2024, month=3, source='product')
+        self.assertEqual(product.amount, Decimal('200.00'))
+        self.assertEqual(product.sales_value, Decimal('600.00'))
+        self.assertEqual(product.purchase_cost, Decimal('400.00'))
+
+    def test_signals_keep_rollups_consistent(self):
+        """Test that rollups maintained by signals match a full recompute"""
+        self.assertEqual(check_rollups(), [])
+
+    def test_dashboard_data_reads_rollups(self):
+        """Test that the yearly chart is served from a single rollup query"""
+        rebuild_rollups()
+        # ETag fingerprint + rollup read
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('dashboard:dashboard_data'), {'year': 2024})
+
+        march = response.data['chart_data'][2]
+        self.assertEqual(march['product_profit'], 200.0)
+        self.assertEqual(march['project_profit'], 1500.0)
+        self.assertEqual(response.data['summary']['total_profit'], 1700.0)
+
+    def test_summary_and_financial_views_read_rollups(self):
+        """Test that summary counts and monthly financials match the raw data"""
+        rebuild_rollups()
+
+        summary = self.client.get(reverse('dashboard:dashboard_summary'), {'year': 2024}).data['summary']
+        self.assertEqual(summary['total_projects'], 3)
+        self.assertEqual(summary['total_products'], 1)
+        self.assertEqual(summary['pending_projects'], 1)
+        self.assertEqual(summary['total_expenses'], 80.0)
+        self.assertEqual(summary['total_salaries'], 400.0)
+
+        financial = self.client.get(
+            reverse('dashboard:financial_summary'), {'year': 2024, 'month': 3}
+        ).data['data']
+        self.assertEqual(financial['total_sales'], 600.0)
+        self.assertEqual(financial['product_profit'], 200.0)
+        self.assertEqual(financial['project_amount'], 1800.0)
+        self.assertEqual(financial['total_profit'], 1920.0)
+
+    def test_financial_summary_range_mode(self):
+        """Test that ?from=&to= aggregates the raw tables over the given dates"""
+        # ETag fingerprint + one aggregate per source
+        with self.assertNumQueries(5):
+            response = self.client.get(
+                reverse('dashboard:financial_summary'), {'from': '2024-03-06', 'to': '2024-03-31'}
+            )
+
+        self.assertEqual(response.data['from'], date(2024, 3, 6))
+        financial = response.data['data']
+        self.assertEqual(financial['total_sales'], 0)
+        self.assertEqual(financial['project_amount'], 1800.0)
+        self.assertEqual(financial['total_expenses'], 80.0)
+
+        bad = self.client.get(reverse('dashboard:financial_summary'), {'from': '2024-03-06'})
+        self.assertEqual(bad.status_code, 400)
+
+
+class DashboardRollupSignalTestCase(TestCase):
+    def setUp(self):
+        """Create a pending project so the rollups start from a known state"""
+        self.project = ZarorratProject.objects.create(
+            customer_name='Bilal', address='Lahore', date=date(2024, 3, 10),
+            valid_until=date(2024, 4, 10), amount=Decimal('1000.00'), status='pending'
+        )
+
+    def test_insert_is_added_to_monthly_and_daily_buckets(self):
+        """Test that a new record shows up without a rebuild"""
+        monthly = MonthlyRollup.objects.get(year=2024, month=3, source='zarorrat')
+        self.assertEqual(monthly.record_count, 1)
+        self.assertEqual(monthly.pending_count, 1)
+        self.assertEqual(monthly.active_amount, 0)
+
+        daily = DailyRollup.objects.get(date=date(2024, 3, 10), source='zarorrat')
+        self.assertEqual(daily.amount, Decimal('1000.00'))
+
+    def test_status_change_and_date_move_adjust_both_buckets(self):
+        """Test that an update moves the old contribution into the new bucket"""
+        self.project.status = 'complete'
+        self.project.date = date(2024, 5, 2)
+        self.project.save()
+
+        self.assertFalse(MonthlyRollup.objects.filter(year=2024, month=3).exists())
+        self.assertFalse(DailyRollup.objects.filter(date=date(2024, 3, 10)).exists())
+
+        may = MonthlyRollup.objects.get(year=2024, month=5, source='zarorrat')
+        self.assertEqual(may.pending_count, 0)
+        self.assertEqual(may.active_amount, Decimal('1000.00'))
+        self.assertEqual(check_rollups(), [])
+
+    def test_delete_removes_contribution(self):
+        """Test that deleting the only record empties its buckets"""
+        self.project.delete()
+        self.assertFalse(MonthlyRollup.objects.exists())
+        self.assertFalse(DailyRollup.objects.exists())
+
+    def test_checker_reports_drift(self):
+        """Test that the consistency checker spots rows edited behind its back"""
+        MonthlyRollup.objects.filter(source='zarorrat').update(amount=Decimal('1.00'))
+
+        drift = check_rollups()
+        self.assertEqual(len(drift), 1)
+        self.assertEqual(drift[0]['field'], 'amount')
+        self.assertEqual(drift[0]['expected'], Decimal('1000.00'))
+
+
+class ZarorratProfitViewTestCase(TestCase):
+    def setUp(self):
+        """Create Zarorrat projects across two months"""
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        for day, amount in [(3, '100.10'), (3, '200.20'), (18, '50.00')]:
+            ZarorratProject.objects.create(
+                customer_name='Bilal', address='Lahore', date=date(2024, 2, day),
+                valid_until=date(2024, 3, 1), amount=Decimal(amount)
+            )
+        ZarorratProject.objects.create(
+            customer_name='Hamza', address='Lahore', date=date(2024, 7, 1),
+            valid_until=date(2024, 8, 1), amount=Decimal('999.99')
+        )
+
+    def test_profit_series_from_two_grouped_queries(self):
+        """Test that monthly and daily series cost two queries regardless of row count"""
+        # ETag fingerprint + monthly and daily grouped reads
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse('dashboard:zarorrat_profit'), {'year': 2024, 'month': 2}
+            )
+
+        self.assertEqual(response.data['monthly_data'][1]['profit'], 350.3)
+        self.assertEqual(response.data['monthly_data'][1]['project_count'], 3)
+        self.assertEqual(response.data['monthly_data'][6]['project_count'], 1)
+        self.assertEqual(len(response.data['daily_data']), 29)
+        self.assertEqual(response.data['daily_data'][2]['profit'], 300.3)
+        self.assertEqual(response.data['summary'], {
+            'total_yearly_profit': 1350.29,
+            'total_monthly_profit': 350.3,
+            'total_projects': 4,
+            'month_projects': 3,
+        })
+
+
+class TimeSeriesViewTestCase(TestCase):
+    def setUp(self):
+        """Create records spread over several years"""
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        Product.objects.create(
+            name='Panel', brand='Jinko', customer_name='Ali', date=date(2020, 1, 15),
+            purchase_price=Decimal('100.00'), sale_price=Decimal('150.00'),
+            category='Solar', quantity=2
+        )
+        ZarorratProject.objects.create(
+            customer_name='Bilal', address='Lahore', date=date(2024, 12, 31),
+            valid_until=date(2025, 1, 31), amount=Decimal('700.00'), status='complete'
+        )
+        Expense.objects.create(
+            title='Fuel', utilizer='Tariq', amount=Decimal('80.00'), date=date(2022, 6, 1)
+        )
+
+    def test_monthly_buckets_over_multiple_years_in_one_query(self):
+        """Test that a five-year range is answered with one grouped query"""
+        # ETag fingerprint + grouped read
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse('dashboard:timeseries'), {'from': '2020-01-01', 'to': '2024-12-31'}
+            )
+
+        data = response.data['data']
+        self.assertEqual(len(data), 60)
+        self.assertEqual(data[0]['period'], date(2020, 1, 1))
+        self.assertEqual(data[0]['product_profit'], 100.0)
+        self.assertEqual(data[29]['expenses'], 80.0)
+        self.assertEqual(data[-1]['project_profit'], 700.0)
+        self.assertEqual(data[-1]['total_profit'], 700.0)
+
+    def test_weekly_buckets_start_on_monday(self):
+        """Test that weekly buckets are keyed by the Monday of each week"""
+        response = self.client.get(
+            reverse('dashboard:timeseries'),
+            {'from': '2024-12-25', 'to': '2024-12-31', 'interval': 'week'}
+        )
+
+        data = response.data['data']
+        self.assertEqual([bucket['period'] for bucket in data], [date(2024, 12, 23), date(2024, 12, 30)])
+        self.assertEqual(data[1]['project_profit'], 700.0)
+
+    def test_range_is_limited_per_interval(self):
+        """Test that a range with too many buckets is rejected"""
+        url = reverse('dashboard:timeseries')
+        response = self.client.get(url, {'interval': 'week', 'from': '2015-01-01', 'to': '2024-12-31'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('week', response.data['error'])
+
+        response = self.client.get(url, {'interval': 'month', 'from': '2015-01-01', 'to': '2024-12-31'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['data']), 120)
+
+        response = self.client.get(url, {'from': '0001-01-01', 'to': '9999-12-31'})
+        self.assertEqual(response.status_code, 400)
+
+        # The default range fits the weekly limit
+        response = self.client.get(url, {'interval': 'week'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_invalid_interval(self):
+        """Test that unknown intervals are rejected"""
+        response = self.client.get(reverse('dashboard:timeseries'), {'interval': 'day'})
+        self.assertEqual(response.status_code, 400)
+
+
+class DashboardCacheTestCase(TestCase):
+    def setUp(self):
+        """Set up an authenticated client with an empty cache"""
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_response_is_cached_until_a_source_write_commits(self):
+        """Test that repeat requests skip the database and writes invalidate them"""
+        url = reverse('dashboard:dashboard_summary')
+        self.client.get(url, {'year': 2024})
+        # Only the ETag fingerprint
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'year': 2024})
+        self.assertEqual(response.data['summary']['total_expenses'], 0.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Expense.objects.create(
+                title='Fuel', utilizer='Tariq', amount=Decimal('80.00'), date=date(2024, 3, 20)
+            )
+
+        response = self.client.get(url, {'year': 2024})
+        self.assertEqual(response.data['summary']['total_expenses'], 80.0)
+
+    def test_write_from_another_process_is_not_served_stale(self):
+        """Test that a rollup change nobody announced to this process still changes the cache key"""
+        url = reverse('dashboard:dashboard_summary')
+        self.client.get(url, {'year': 2024})
+
+        # Another worker's write: no signal runs in this process
+        MonthlyRollup.objects.create(
+            year=2024, month=3, source='expense', record_count=1, amount=Decimal('80.00'), active_amount=Decimal('80.00')
+        )
+
+        response = self.client.get(url, {'year': 2024})
+        self.assertEqual(response.data['summary']['total_expenses'], 80.0)
+
+    def test_cache_is_keyed_by_query_params(self):
+        """Test that different years are cached separately"""
+        url = reverse('dashboard:dashboard_summary')
+        self.client.get(url, {'year': 2023})
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {'year': 2024})
+        self.assertEqual(response.data['summary']['year'], 2024)
+
+
+class DashboardResponseTestCase(TestCase):
+    def setUp(self):
+        """Set up an authenticated client with an empty cache"""
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_dashboard_data_matches_the_dict_payload(self):
+        """Test that DashboardData serializes to the dict the view used to build by hand"""
+        chart_data = [
+            MonthlyProfit(month='Jan', product_profit=100.0, project_profit=250.5, total_profit=350.5),
+            MonthlyProfit(month='Feb'),
+        ]
+        summary = DashboardSummary(
+            total_product_profit=100.0, total_project_profit=250.5, total_profit=350.5,
+            current_month_profit=0, current_month='Feb',
+        )
+        data = DashboardData(chart_data=chart_data, summary=summary, current_month='Feb').to_dict()
+
+        self.assertEqual(data, {
+            'success': True,
+            'chart_data': [
+                {'month': 'Jan', 'product_profit': 100.0, 'project_profit': 250.5, 'total_profit': 350.5},
+                {'month': 'Feb', 'product_profit': 0, 'project_profit': 0, 'total_profit': 0},
+            ],
+            'summary': {
+                'total_product_profit': 100.0,
+                'total_project_profit': 250.5,
+                'total_profit': 350.5,
+                'current_month_profit': 0,
+                'current_month': 'Feb',
+            },
+            'current_month': 'Feb',
+        })
+        self.assertTrue(DashboardDataSerializer(data=data).is_valid())
+
+    def test_dashboard_summary_matches_the_dict_payload(self):
+        """Test that DashboardSummaryResponse serializes to the dict the view used to build by hand"""
+        stats = DashboardStats(
+            total_projects=4, total_products=2, total_expenses=80.0, total_salaries=30000.0,
+            pending_projects=1, year=2024,
+        )
+        data = DashboardSummaryResponse(summary=stats).to_dict()
+
+        self.assertEqual(data, {
+            'success': True,
+            'summary': {
+                'total_projects': 4,
+                'total_products': 2,
+                'total_expenses': 80.0,
+                'total_salaries': 30000.0,
+                'pending_projects': 1,
+                'year': 2024,
+            },
+        })
+        self.assertTrue(DashboardSummaryResponseSerializer(data=data).is_valid())
+
+    @override_settings(DASHBOARD_VALIDATE_RESPONSES=True)
+    def test_views_pass_the_schema_check(self):
+        """Test that both views return 200 with validation on"""
+        Expense.objects.create(title='Fuel', utilizer='Tariq', amount=Decimal('80.00'), date=date(2024, 3, 20))
+
+        response = self.client.get(reverse('dashboard:dashboard_data'), {'year': 2024})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['chart_data']), 12)
+
+        response = self.client.get(reverse('dashboard:dashboard_summary'), {'year': 2024})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['summary']['total_expenses'], 80.0)
+
+    def test_schema_errors_are_reported_only_when_enabled(self):
+        """Test that a body that does not match its serializer is a 500 with the errors"""
+        broken = {'success': True, 'summary': {'year': 'not a year'}}
+        url = reverse('dashboard:dashboard_summary')
+
+        with mock.patch.object(DashboardSummaryResponse, 'to_dict', return_value=broken):
+            with override_settings(DASHBOARD_VALIDATE_RESPONSES=True):
+                response = self.client.get(url, {'year': 2024})
+            self.assertEqual(response.status_code, 500)
+            self.assertEqual(response.data['error'], 'Data validation failed')
+            self.assertIn('year', response.data['details']['summary'])
+
+            with override_settings(DASHBOARD_VALIDATE_RESPONSES=False):
+                self.assertIsNone(schema_errors(DashboardSummaryResponseSerializer, broken))
+                response = self.client.get(url, {'year': 2023})
+            self.assertEqual(response.status_code, 200)
+
+    def test_benchmark_command_builds_valid_responses(self):
+        """Test that the benchmark times responses that pass the schema check"""
+        self.assertTrue(DashboardDataSerializer(data=build_response(build_points(3))).is_valid())
+
+        output = io.StringIO()
+        call_command('benchmark_dashboard_responses', iterations=1, points=[3], stdout=output)
+        self.assertEqual(output.getvalue().splitlines()[1].split()[0], '3')
@@ -10,4 +10,5 @@ urlpatterns = [
     path('daily/', views.DailyProfitView.as_view(), name='daily_profit'),
     path('financial/', views.FinancialSummaryView.as_view(), name='financial_summary'),
     path('zarorrat/', views.ZarorratProfitView.as_view(), name='zarorrat_profit'),
+    path('timeseries/', views.TimeSeriesView.as_view(), name='timeseries'),
 ] 
\ No newline at end of file
@@ -1,22 +1,29 @@
 from django.shortcuts import render
 from django.http import JsonResponse
-from django.db.models import Sum, Q, F
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth, TruncWeek
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from Product.models import Product
-from Project.models import ZarorratProject, UniqueSolarProject
-from Expense.models import Expense
-from Salary.models import Salary
+from backend.conditional import conditional_get
+from backend.dates import month_bounds
+from .cache import cache_dashboard_response
+from .models import MonthlyRollup, DailyRollup
+from .rollups import PROJECT_SOURCES, aggregate_range, totals_by_source
+from .responses import (
+    MonthlyProfit,
+    DashboardData,
+    DashboardSummary,
+    DashboardStats,
+    DashboardSummaryResponse,
+    schema_errors
+)
 from .serializers import (
     DashboardDataSerializer, 
-    DashboardSummaryResponseSerializer,
-    MonthlyProfitSerializer,
-    DashboardSummarySerializer,
-    DashboardStatsSerializer
+    DashboardSummaryResponseSerializer
 )
 
 # Create your views here.
@@ -26,8 +33,11 @@ class DashboardDataView(APIView):
     API endpoint to provide dashboard data for graphs
     Returns monthly profit data for "All Time Payments" graph
     with year filter and status filter
+    Reads pre-aggregated MonthlyRollup rows instead of the raw tables
     """
     
+    @conditional_get(MonthlyRollup, DailyRollup)
+    @cache_dashboard_response
     def get(self, request):
         try:
             year = request.query_params.get('year', timezone.now().year)
@@ -40,87 +50,52 @@ class DashboardDataView(APIView):
             
             for month in range(1, 13):
                 month_name = datetime(year, month, 1).strftime('%b')
-                monthly_data[month_name] = {
-                    'month': month_name,
-                    'product_profit': 0,
-                    'project_profit': 0,
-                    'total_profit': 0
-                }
+                monthly_data[month_name] = MonthlyProfit(month=month_name)
             
-            products = Product.objects.filter(
-                date__year=year
-            ).values('date__month').annotate(
-                total_profit=Sum(
-                    (F('sale_price') - F('purchase_price')) * F('quantity')
-                )
-            )
-            print("products profit",products)
-            
-            for product in products:
-                month_name = datetime(year, product['date__month'], 1).strftime('%b')
-                if month_name in monthly_data:
-                    monthly_data[month_name]['product_profit'] = float(product['total_profit'] or 0)
-            
-            zarorrat_projects = ZarorratProject.objects.filter(
-                date__year=year,
-                status__in=['complete', 'in_progress']
-            ).values('date__month').annotate(
-                total_amount=Sum('amount')
+            rollups = MonthlyRollup.objects.filter(
+                year=year,
+                source__in=['product'] + PROJECT_SOURCES
             )
             
-
-            for project in zarorrat_projects:
-                month_name = datetime(year, project['date__month'], 1).strftime('%b')
-                if month_name in monthly_data:
-                    monthly_data[month_name]['project_profit'] += float(project['total_amount'] or 0)
-            
-            print("zarorrat projects",zarorrat_projects)
-            unique_solar_projects = UniqueSolarProject.objects.filter(
-                date__year=year,
-                status__in=['complete', 'in_progress']
-            ).values('date__month').annotate(
-                total_amount=Sum('grand_total')
-            )
-            print("unique solar projects",unique_solar_projects)
-            for project in unique_solar_projects:
-                month_name = datetime(year, project['date__month'], 1).strftime('%b')
-                if month_name in monthly_data:
-                    monthly_data[month_name]['project_profit'] += float(project['total_amount'] or 0)
+            for rollup in rollups:
+                point = monthly_data[datetime(year, rollup.month, 1).strftime('%b')]
+                if rollup.source == 'product':
+                    point.product_profit += float(rollup.amount)
+                else:
+                    point.project_profit += float(rollup.active_amount)
             
-            for month_data in monthly_data.values():
-                month_data['total_profit'] = month_data['product_profit'] + month_data['project_profit']
+            for point in monthly_data.values():
+                point.total_profit = point.product_profit + point.project_profit
             
             chart_data = list(monthly_data.values())
             
-            total_product_profit = sum(item['product_profit'] for item in chart_data)
-            total_project_profit = sum(item['project_profit'] for item in chart_data)
-            total_profit = sum(item['total_profit'] for item in chart_data)
+            total_product_profit = sum(point.product_profit for point in chart_data)
+            total_project_profit = sum(point.project_profit for point in chart_data)
+            total_profit = sum(point.total_profit for point in chart_data)
             
             current_month = timezone.now().strftime('%b')
-            current_month_data = monthly_data.get(current_month, {})
-            
-            response_data = {
-                'success': True,
-                'chart_data': chart_data,
-                'summary': {
-                    'total_product_profit': round(total_product_profit, 2),
-                    'total_project_profit': round(total_project_profit, 2),
-                    'total_profit': round(total_profit, 2),
-                    'current_month_profit': round(current_month_data.get('total_profit', 0), 2),
-                    'current_month': current_month
-                },
-                'current_month': current_month
-            }
-            
-            serializer = DashboardDataSerializer(data=response_data)
-            if serializer.is_valid():
-                return Response(response_data, status=status.HTTP_200_OK)
-            else:
+            current_month_profit = monthly_data[current_month].total_profit
+            
+            response_data = DashboardData(
+                chart_data=chart_data,
+                summary=DashboardSummary(
+                    total_product_profit=round(total_product_profit, 2),
+                    total_project_profit=round(total_project_profit, 2),
+                    total_profit=round(total_profit, 2),
+                    current_month_profit=round(current_month_profit, 2),
+                    current_month=current_month
+                ),
+                current_month=current_month
+            ).to_dict()
+            
+            errors = schema_errors(DashboardDataSerializer, response_data)
+            if errors:
                 return Response({
                     'success': False,
                     'error': 'Data validation failed',
-                    'details': serializer.errors
+                    'details': errors
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return Response(response_data, status=status.HTTP_200_OK)
             
         except Exception as e:
             return Response({
@@ -134,6 +109,8 @@ class DashboardSummaryView(APIView):
     API endpoint to provide dashboard summary statistics like total projects, total products, total expenses, total salaries, pending projects
     """
     
+    @conditional_get(MonthlyRollup, DailyRollup)
+    @cache_dashboard_response
     def get(self, request):
         try:
             year = request.query_params.get('year', timezone.now().year)
@@ -142,49 +119,33 @@ class DashboardSummaryView(APIView):
             except ValueError:
                 year = timezone.now().year
             
-            total_zarorrat_projects = ZarorratProject.objects.filter(date__year=year).count()
-            total_unique_solar_projects = UniqueSolarProject.objects.filter(date__year=year).count()
-            total_projects = total_zarorrat_projects + total_unique_solar_projects
-            
-            total_products = Product.objects.filter(date__year=year).count()
-            
-            total_expenses = Expense.objects.filter(
-                date__year=year
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            
-            total_salaries = Salary.objects.filter(
-                date__year=year
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            
-            pending_projects = ZarorratProject.objects.filter(
-                status='pending',
-                date__year=year
-            ).count() + UniqueSolarProject.objects.filter(
-                status='pending',
-                date__year=year
-            ).count()
-            
-            response_data = {
-                'success': True,
-                'summary': {
-                    'total_projects': total_projects,
-                    'total_products': total_products,
-                    'total_expenses': float(total_expenses),
-                    'total_salaries': float(total_salaries),
-                    'pending_projects': pending_projects,
-                    'year': year
-                }
-            }
+            totals = totals_by_source(MonthlyRollup.objects.filter(year=year))
+            
+            total_projects = sum(totals[source]['record_count'] for source in PROJECT_SOURCES)
+            total_products = totals['product']['record_count']
+            total_expenses = totals['expense']['amount']
+            total_salaries = totals['salary']['amount']
+            pending_projects = sum(totals[source]['pending_count'] for source in PROJECT_SOURCES)
+            
+            response_data = DashboardSummaryResponse(
+                summary=DashboardStats(
+                    total_projects=total_projects,
+                    total_products=total_products,
+                    total_expenses=float(total_expenses),
+                    total_salaries=float(total_salaries),
+                    pending_projects=pending_projects,
+                    year=year
+                )
+            ).to_dict()
             
-            serializer = DashboardSummaryResponseSerializer(data=response_data)
-            if serializer.is_valid():
-                return Response(response_data, status=status.HTTP_200_OK)
-            else:
+            errors = schema_errors(DashboardSummaryResponseSerializer, response_data)
+            if errors:
                 return Response({
                     'success': False,
                     'error': 'Data validation failed',
-                    'details': serializer.errors
+                    'details': errors
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return Response(response_data, status=status.HTTP_200_OK)
             
         except Exception as e:
             return Response({
@@ -198,6 +159,8 @@ class DailyProfitView(APIView):
     Simple API endpoint to get daily profit for a specific month
     """
     
+    @conditional_get(MonthlyRollup, DailyRollup)
+    @cache_dashboard_response
     def get(self, request):
         try:
             year = int(request.query_params.get('year', timezone.now().year))
@@ -205,40 +168,16 @@ class DailyProfitView(APIView):
             
             daily_data = []
             
-            products = Product.objects.filter(
-                date__year=year,
-                date__month=month
-            ).values('date__day').annotate(
-                profit=Sum((F('sale_price') - F('purchase_price')) * F('quantity'))
-            )
-            
-            zarorrat = ZarorratProject.objects.filter(
-                date__year=year,
-                date__month=month
-            ).values('date__day').annotate(
-                amount=Sum('amount')
-            )
-            
-            unique_solar = UniqueSolarProject.objects.filter(
-                date__year=year,
-                date__month=month
-            ).values('date__day').annotate(
-                amount=Sum('grand_total')
+            first_day, last_day = month_bounds(year, month)
+            rollups = DailyRollup.objects.filter(
+                date__range=(first_day, last_day),
+                source__in=['product'] + PROJECT_SOURCES
             )
             
             daily_profits = {}
-            
-            for p in products:
-                day = p['date__day']
-                daily_profits[day] = daily_profits.get(day, 0) + float(p['profit'] or 0)
-            
-            for p in zarorrat:
-                day = p['date__day']
-                daily_profits[day] = daily_profits.get(day, 0) + float(p['amount'] or 0)
-                
-            for p in unique_solar:
-                day = p['date__day']
-                daily_profits[day] = daily_profits.get(day, 0) + float(p['amount'] or 0)
+            for rollup in rollups:
+                day = rollup.date.day
+                daily_profits[day] = daily_profits.get(day, 0) + float(rollup.amount)
             
             for day in range(1, 32): 
                 daily_data.append({
@@ -263,58 +202,60 @@ class DailyProfitView(APIView):
 class FinancialSummaryView(APIView):
     """
     Simple API endpoint to get financial summary for a specific month/year
+    
+    Query Parameters:
+    - year, month: Month to summarise (default: current month), read from the rollups
+    - from, to: Optional inclusive date range (YYYY-MM-DD); when both are given
+      the totals are aggregated in the database over that range instead
     """
     
+    @conditional_get(MonthlyRollup, DailyRollup)
+    @cache_dashboard_response
     def get(self, request):
         try:
-            year = int(request.query_params.get('year', timezone.now().year))
-            month = int(request.query_params.get('month', timezone.now().month))
-            
-            try:
-                products = Product.objects.filter(
-                    date__year=year,
-                    date__month=month
-                )
-                total_sales = sum(float(p.total_sale_value) for p in products)
-                total_cost = sum(float(p.total_purchase_cost) for p in products)
-                product_profit = total_sales - total_cost
-            except Exception as e:
-                print(f"Product query error: {e}")
-                total_sales = 0
-                total_cost = 0
-                product_profit = 0
-            
-            try:
-                zarorrat = ZarorratProject.objects.filter(
-                    date__year=year,
-                    date__month=month
+            date_from = request.query_params.get('from')
+            date_to = request.query_params.get('to')
+            
+            if date_from or date_to:
+                try:
+                    start = date.fromisoformat(date_from or '')
+                    end = date.fromisoformat(date_to or '')
+                except ValueError:
+                    return Response({
+                        'success': False,
+                        'error': "Both 'from' and 'to' must be dates in YYYY-MM-DD format"
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                if start > end:
+                    return Response({
+                        'success': False,
+                        'error': "'from' must not be after 'to'"
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                
+                totals = aggregate_range(
+                    start, end, sources=['product', 'expense'] + PROJECT_SOURCES
                 )
-                unique_solar = UniqueSolarProject.objects.filter(
-                    date__year=year,
-                    date__month=month
+                period = {'from': start, 'to': end}
+            else:
+                year = int(request.query_params.get('year', timezone.now().year))
+                month = int(request.query_params.get('month', timezone.now().month))
+                
+                totals = totals_by_source(
+                    MonthlyRollup.objects.filter(year=year, month=month)
                 )
-                project_amount = sum(float(p.amount) for p in zarorrat) + sum(float(p.grand_total) for p in unique_solar)
-            except Exception as e:
-                print(f"Project query error: {e}")
-                project_amount = 0
+                period = {'year': year, 'month': month}
             
-            try:
-                expenses = Expense.objects.filter(
-                    date__year=year,
-                    date__month=month
-                )
-                total_expenses = sum(float(e.amount) for e in expenses)
-            except Exception as e:
-                print(f"Expense query error: {e}")
-                total_expenses = 0
+            total_sales = float(totals['product']['sales_value'])
+            total_cost = float(totals['product']['purchase_cost'])
+            product_profit = total_sales - total_cost
+            project_amount = sum(float(totals[source]['amount']) for source in PROJECT_SOURCES)
+            total_expenses = float(totals['expense']['amount'])
             
             total_revenue = total_sales + project_amount
             total_profit = product_profit + project_amount - total_expenses
             
             return Response({
                 'success': True,
-                'year': year,
-                'month': month,
+                **period,
                 'data': {
                     'total_sales': round(total_sales, 2),
                     'product_profit': round(product_profit, 2),
@@ -337,45 +278,64 @@ class ZarorratProfitView(APIView):
     API endpoint to get Zarorrat project profit data (monthly and daily)
     """
     
+    @conditional_get(MonthlyRollup, DailyRollup)
+    @cache_dashboard_response
     def get(self, request):
         try:
             year = int(request.query_params.get('year', timezone.now().year))
             month = int(request.query_params.get('month', timezone.now().month))
             
-            yearly_projects = ZarorratProject.objects.filter(date__year=year)
+            # Grouped reads with Decimal sums; floats only at the response edge
+            monthly_totals = {
+                row['month']: row
+                for row in MonthlyRollup.objects.filter(
+                    year=year,
+                    source='zarorrat'
+                ).values('month').annotate(
+                    profit=Sum('amount'),
+                    project_count=Sum('record_count')
+                ).order_by()
+            }
+            
+            first_day, last_day = month_bounds(year, month)
+            daily_totals = {
+                row['date'].day: row['profit']
+                for row in DailyRollup.objects.filter(
+                    date__range=(first_day, last_day),
+                    source='zarorrat'
+                ).values('date').annotate(
+                    profit=Sum('amount')
+                ).order_by()
+            }
             
+            zero = Decimal('0')
             monthly_data = []
+            total_yearly_profit = zero
+            total_projects = 0
             for m in range(1, 13):
-                month_projects = yearly_projects.filter(date__month=m)
-                month_profit = sum(float(p.amount) for p in month_projects)
+                row = monthly_totals.get(m, {})
+                profit = row.get('profit') or zero
+                project_count = row.get('project_count') or 0
+                total_yearly_profit += profit
+                total_projects += project_count
                 monthly_data.append({
                     'month': m,
                     'month_name': datetime(year, m, 1).strftime('%b'),
-                    'profit': round(month_profit, 2),
-                    'project_count': month_projects.count()
+                    'profit': float(round(profit, 2)),
+                    'project_count': project_count
                 })
             
             daily_data = []
-            month_projects = yearly_projects.filter(date__month=month)
-            
-            import calendar
-            num_days = calendar.monthrange(year, month)[1]
-            
-            daily_profits = {}
-            for project in month_projects:
-                day = project.date.day
-                daily_profits[day] = daily_profits.get(day, 0) + float(project.amount)
-            
-            for day in range(1, num_days + 1):
+            total_monthly_profit = zero
+            for day in range(1, last_day.day + 1):
+                profit = daily_totals.get(day) or zero
+                total_monthly_profit += profit
                 daily_data.append({
                     'day': day,
-                    'profit': round(daily_profits.get(day, 0), 2)
+                    'profit': float(round(profit, 2))
                 })
             
-            total_yearly_profit = sum(item['profit'] for item in monthly_data)
-            total_monthly_profit = sum(item['profit'] for item in daily_data)
-            total_projects = yearly_projects.count()
-            month_projects_count = month_projects.count()
+            month_projects_count = monthly_data[month - 1]['project_count']
             
             return Response({
                 'success': True,
@@ -383,8 +343,8 @@ class ZarorratProfitView(APIView):
                 'month': month,
                 'month_name': datetime(year, month, 1).strftime('%B'),
                 'summary': {
-                    'total_yearly_profit': round(total_yearly_profit, 2),
-                    'total_monthly_profit': round(total_monthly_profit, 2),
+                    'total_yearly_profit': float(round(total_yearly_profit, 2)),
+                    'total_monthly_profit': float(round(total_monthly_profit, 2)),
                     'total_projects': total_projects,
                     'month_projects': month_projects_count
                 },
@@ -401,3 +361,132 @@ class ZarorratProfitView(APIView):
 
 
 
+
+
+class TimeSeriesView(APIView):
+    """
+    API endpoint to get profit trends over an arbitrary date range in one response
+    
+    Query Parameters:
+    - from, to: Inclusive date range (YYYY-MM-DD, default: the last five calendar years)
+    - interval: 'month' (default) or 'week'
+    
+    The range is limited per interval (MAX_RANGE_DAYS) so a request cannot
+    ask for an unbounded number of buckets; longer ranges are a 400.
+    Uses the same formulas as DashboardDataView (product profit plus
+    complete/in-progress project amounts). All sources are bucketed with
+    TruncMonth/TruncWeek over the daily rollups in a single query.
+    """
+    
+    TRUNC_FUNCTIONS = {
+        'month': TruncMonth,
+        'week': TruncWeek,
+    }
+    # About 600 monthly or 260 weekly buckets; the default five calendar
+    # years fit either
+    MAX_RANGE_DAYS = {
+        'month': 50 * 366,
+        'week': 5 * 366,
+    }
+    
+    @conditional_get(MonthlyRollup, DailyRollup)
+    @cache_dashboard_response
+    def get(self, request):
+        try:
+            today = timezone.now().date()
+            interval = request.query_params.get('interval', 'month')
+            if interval not in self.TRUNC_FUNCTIONS:
+                return Response({
+                    'success': False,
+                    'error': "interval must be 'month' or 'week'"
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            try:
+                start = date.fromisoformat(
+                    request.query_params.get('from', f'{today.year - 4}-01-01')
+                )
+                end = date.fromisoformat(request.query_params.get('to', today.isoformat()))
+            except ValueError:
+                return Response({
+                    'success': False,
+                    'error': "'from' and 'to' must be dates in YYYY-MM-DD format"
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if start > end:
+                return Response({
+                    'success': False,
+                    'error': "'from' must not be after 'to'"
+                }, status=status.HTTP_400_BAD_REQUEST)
+            max_days = self.MAX_RANGE_DAYS[interval]
+            if (end - start).days + 1 > max_days:
+                return Response({
+                    'success': False,
+                    'error': f"The range must not be longer than {max_days} days for interval '{interval}'"
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            rows = DailyRollup.objects.filter(
+                date__range=(start, end)
+            ).annotate(
+                period=self.TRUNC_FUNCTIONS[interval]('date')
+            ).values('period', 'source').annotate(
+                amount=Sum('amount'),
+                active_amount=Sum('active_amount')
+            ).order_by()
+            
+            buckets = {}
+            period = self._period_start(start, interval)
+            while period <= end:
+                buckets[period] = {
+                    'period': period,
+                    'product_profit': Decimal('0'),
+                    'project_profit': Decimal('0'),
+                    'expenses': Decimal('0'),
+                    'salaries': Decimal('0'),
+                }
+                period = self._next_period(period, interval)
+            
+            for row in rows:
+                bucket = buckets[row['period']]
+                if row['source'] == 'product':
+                    bucket['product_profit'] += row['amount']
+                elif row['source'] in PROJECT_SOURCES:
+                    bucket['project_profit'] += row['active_amount']
+                elif row['source'] == 'expense':
+                    bucket['expenses'] += row['amount']
+                elif row['source'] == 'salary':
+                    bucket['salaries'] += row['amount']
+            
+            data = []
+            for bucket in buckets.values():
+                bucket['total_profit'] = bucket['product_profit'] + bucket['project_profit']
+                data.append({
+                    key: value if key == 'period' else float(round(value, 2))
+                    for key, value in bucket.items()
+                })
+            
+            return Response({
+                'success': True,
+                'from': start,
+                'to': end,
+                'interval': interval,
+                'data': data
+            })
+            
+        except Exception as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    @staticmethod
+    def _period_start(day, interval):
+        if interval == 'week':
+            return day - timedelta(days=day.weekday())
+        return day.replace(day=1)
+    
+    @staticmethod
+    def _next_period(period, interval):
+        if interval == 'week':
+            return period + timedelta(days=7)
+        if period.month == 12:
+            return period.replace(year=period.year + 1, month=1)
+        return period.replace(month=period.month + 1)
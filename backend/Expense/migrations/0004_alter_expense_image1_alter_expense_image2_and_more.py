@@ -0,0 +1,49 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:45
+
+import Media.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Expense', '0003_expense_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='expense',
+            name='image1',
+            field=models.ImageField(blank=True, null=True, storage=Media.storage.blob_storage, upload_to='expense_images/'),
+        ),
+        migrations.AlterField(
+            model_name='expense',
+            name='image2',
+            field=models.ImageField(blank=True, null=True, storage=Media.storage.blob_storage, upload_to='expense_images/'),
+        ),
+        migrations.AlterField(
+            model_name='expense',
+            name='image3',
+            field=models.ImageField(blank=True, null=True, storage=Media.storage.blob_storage, upload_to='expense_images/'),
+        ),
+        migrations.AlterField(
+            model_name='expense',
+            name='image4',
+            field=models.ImageField(blank=True, null=True, storage=Media.storage.blob_storage, upload_to='expense_images/'),
+        ),
+        migrations.AlterField(
+            model_name='expense',
+            name='image5',
+            field=models.ImageField(blank=True, null=True, storage=Media.storage.blob_storage, upload_to='expense_images/'),
+        ),
+        migrations.AlterField(
+            model_name='expense',
+            name='image6',
+            field=models.ImageField(blank=True, null=True, storage=Media.storage.blob_storage, upload_to='expense_images/'),
+        ),
+        migrations.AlterField(
+            model_name='expense',
+            name='image7',
+            field=models.ImageField(blank=True, null=True, storage=Media.storage.blob_storage, upload_to='expense_images/'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.core.exceptions import ValidationError
 from Authentication.models import CustomUser
+from Media.storage import blob_storage
 # Create your models here.
 
 class Expense(models.Model):
@@ -14,15 +15,16 @@ class Expense(models.Model):
     category=models.CharField( max_length=255, null=True, blank=True)
     amount=models.DecimalField(max_digits=10,decimal_places=2)
     date=models.DateField()
-    image1=models.ImageField(upload_to='expense_images/',blank=True,null=True)
-    image2=models.ImageField(upload_to='expense_images/',blank=True,null=True)
-    image3=models.ImageField(upload_to='expense_images/',blank=True,null=True)
-    image4=models.ImageField(upload_to='expense_images/',blank=True,null=True)
-    image5=models.ImageField(upload_to='expense_images/',blank=True,null=True)
-    image6=models.ImageField(upload_to='expense_images/',blank=True,null=True)
-    image7=models.ImageField(upload_to='expense_images/',blank=True,null=True)
+    image1=models.ImageField(upload_to='expense_images/',storage=blob_storage,blank=True,null=True)
+    image2=models.ImageField(upload_to='expense_images/',storage=blob_storage,blank=True,null=True)
+    image3=models.ImageField(upload_to='expense_images/',storage=blob_storage,blank=True,null=True)
+    image4=models.ImageField(upload_to='expense_images/',storage=blob_storage,blank=True,null=True)
+    image5=models.ImageField(upload_to='expense_images/',storage=blob_storage,blank=True,null=True)
+    image6=models.ImageField(upload_to='expense_images/',storage=blob_storage,blank=True,null=True)
+    image7=models.ImageField(upload_to='expense_images/',storage=blob_storage,blank=True,null=True)
     updated_by=models.ForeignKey(CustomUser,on_delete=models.CASCADE, null=True, blank=True)
     description=models.TextField(blank=True,null=True)
+    updated_at=models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title
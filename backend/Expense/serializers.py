@@ -1,7 +1,20 @@
 from rest_framework import serializers
+from Media.serializers import variant_urls
+from Media.variants import IMAGE_FIELDS
 from .models import Expense
 
 class ExpenseSerializer(serializers.ModelSerializer):
+    image_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = Expense
         fields = '__all__'
+
+    def get_image_variants(self, obj):
+        """Variant URLs of each uploaded image, keyed by image field"""
+        request = self.context.get('request')
+        return {
+            field: variant_urls(getattr(obj, field), request)
+            for field in IMAGE_FIELDS['Expense.Expense']
+            if getattr(obj, field)
+        }
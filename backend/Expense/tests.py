@@ -1,3 +1,78 @@
 from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from decimal import Decimal
+from datetime import date
+from .models import Expense
+from .views import ExpenseExportView
+import csv
 
 # Create your tests here.
+
+
+class ConditionalGetTestCase(TestCase):
+    def setUp(self):
+        """Set up an authenticated client and one expense"""
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Expense.objects.create(
+            title='Fuel', utilizer='Tariq', amount=Decimal('80.00'), date=date(2024, 3, 20)
+        )
+
+    def test_matching_etag_returns_not_modified(self):
+        """Test that an unchanged list is answered with 304 and no serialization"""
+        url = reverse('expense:expense-list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_after_write(self):
+        """Test that an update to the table invalidates the ETag"""
+        url = reverse('expense:expense-list')
+        etag = self.client.get(url)['ETag']
+
+        Expense.objects.update(title='Diesel')
+        Expense.objects.first().save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_query_params(self):
+        """Test that another page gets its own ETag"""
+        url = reverse('expense:expense-list')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, {'page_size': 5}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class ExpenseExportTestCase(TestCase):
+    def setUp(self):
+        """Set up an authenticated client and expenses in two years"""
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Expense.objects.create(title='Fuel', utilizer='Tariq', amount=Decimal('80.00'), date=date(2024, 3, 20))
+        Expense.objects.create(title='Rent, March', utilizer='Tariq', amount=Decimal('500.00'), date=date(2025, 3, 1))
+
+    def test_export_streams_csv(self):
+        """Test that the export is a streamed CSV filtered by year"""
+        response = self.client.get(reverse('expense:expense-export'), {'year': 2025})
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.reader(b''.join(response.streaming_content).decode('utf-8-sig').splitlines()))
+        self.assertEqual(rows[0], ExpenseExportView.columns)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][2], 'Rent, March')
+
+    def test_invalid_year(self):
+        """Test that a non-numeric year is rejected"""
+        response = self.client.get(reverse('expense:expense-export'), {'year': 'last'})
+        self.assertEqual(response.status_code, 400)
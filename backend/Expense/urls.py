@@ -5,5 +5,6 @@ app_name = 'expense'
 
 urlpatterns = [
     path('', views.ExpenseView.as_view(), name='expense-list'),
+    path('export/', views.ExpenseExportView.as_view(), name='expense-export'),
     path('<int:expense_id>/', views.ExpenseView.as_view(), name='expense-detail'),
 ] 
\ No newline at end of file
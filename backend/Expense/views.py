@@ -6,6 +6,8 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from .models import Expense
 from .serializers import ExpenseSerializer
+from backend.conditional import conditional_get
+from backend.exports import csv_response, filter_year, iter_values
 
 class ExpensePagination(PageNumberPagination):
     page_size = 10
@@ -15,6 +17,7 @@ class ExpensePagination(PageNumberPagination):
 class ExpenseView(APIView):
     permission_classes = [IsAuthenticated]
     
+    @conditional_get(Expense)
     def get(self, request, expense_id=None):
         if expense_id:
             expense = get_object_or_404(Expense, id=expense_id)
@@ -50,3 +53,14 @@ class ExpenseView(APIView):
         expense.delete()
         return Response({'message': 'Expense deleted successfully'}, status=status.HTTP_204_NO_CONTENT)
 
+class ExpenseExportView(APIView):
+    """Stream all expenses (optionally one ?year=) as CSV"""
+    permission_classes = [IsAuthenticated]
+    columns = ['id', 'date', 'title', 'utilizer', 'category', 'amount', 'description']
+
+    def get(self, request):
+        try:
+            expenses = filter_year(Expense.objects.order_by('date', 'id'), request.query_params)
+        except ValueError:
+            return Response({'error': 'year must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        return csv_response('expenses.csv', self.columns, iter_values(expenses, self.columns))
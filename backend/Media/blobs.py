@@ -0,0 +1,158 @@
+from collections import Counter
+from datetime import timedelta
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Blob
+from .storage import BLOB_PREFIX, blob_storage
+from .variants import variant_name
+
+# Files on disk without a Blob row are only collected once they are this old,
+# so an upload whose transaction has not committed yet is left alone
+ORPHAN_GRACE_PERIOD = timedelta(hours=1)
+
+# Model label -> image fields stored in deduplicated blobs
+BLOB_FIELDS = {
+    'Product.ProductImage': ['image'],
+    'Project.UniqueSolarProjectImage': ['image'],
+    'Expense.Expense': [f'image{number}' for number in range(1, 8)],
+}
+
+
+def blob_names(instance, values=None):
+    """Count the blob names referenced by an instance (or by a values() row of it)"""
+    fields = BLOB_FIELDS[instance._meta.label]
+    if values is None:
+        names = [getattr(instance, field).name for field in fields]
+    else:
+        names = [values[field] for field in fields]
+    return Counter(name for name in names if name and name.startswith(BLOB_PREFIX))
+
+
+def stored_blob_names(instance):
+    """Blob names the instance references in the database, before a save"""
+    values = type(instance).objects.filter(pk=instance.pk).values(*BLOB_FIELDS[instance._meta.label]).first()
+    return blob_names(instance, values) if values else Counter()
+
+
+def pending_uploads(instance):
+    """{field: uploaded file} for the image fields the next save writes to storage"""
+    uploads = {}
+    for field in BLOB_FIELDS[instance._meta.label]:
+        field_file = getattr(instance, field)
+        if field_file and not field_file._committed:
+            uploads[field] = field_file.file
+    return uploads
+
+
+def retain(name, count=1, content=None):
+    """
+    Add `count` references to a blob. `content` is the upload the name was
+    saved from, if any: DeduplicatingStorage reuses an existing file without
+    a lock, so the blob may have been deleted before this reference counted.
+    """
+    while True:
+        blob, created = Blob.objects.get_or_create(name=name, defaults={'refcount': count})
+        # Waits for a delete_if_unreferenced() holding the row lock; if that
+        # deleted the row, nothing is updated and the row is created again
+        if created or Blob.objects.filter(pk=blob.pk).update(refcount=F('refcount') + count):
+            break
+
+    # The reference now keeps the file from being deleted; put it back if it
+    # went away in the meantime
+    storage = blob_storage()
+    if content is not None and not storage.exists(name):
+        content.seek(0)
+        storage.save(name, content)
+
+
+def release(name, count=1):
+    Blob.objects.filter(name=name).update(refcount=F('refcount') - count)
+    # Only delete the file once the release is committed
+    transaction.on_commit(lambda: delete_if_unreferenced(name))
+
+
+def apply_references(old_names, new_names, contents=None):
+    """
+    Move blob references from `old_names` to `new_names` (both Counters).
+    `contents` maps newly uploaded names to their files (see retain()).
+    """
+    contents = contents or {}
+    for name in new_names.keys() | old_names.keys():
+        change = new_names[name] - old_names[name]
+        if change > 0:
+            retain(name, change, contents.get(name))
+        elif change < 0:
+            release(name, -change)
+
+
+def delete_blob_file(name):
+    """Delete a blob and its image variants from storage"""
+    storage = blob_storage()
+    for variant in settings.IMAGE_VARIANTS:
+        storage.delete(variant_name(name, variant))
+    storage.delete(name)
+
+
+def delete_if_unreferenced(name):
+    """
+    Delete the blob row and file if nothing references it any more.
+    The row stays locked from the refcount check until the file is gone, so
+    a concurrent retain() of the same content cannot slip in between.
+    """
+    with transaction.atomic():
+        blob = Blob.objects.select_for_update().filter(name=name).first()
+        # Re-checked under the lock: the release may have been undone since
+        if blob is None or blob.refcount > 0:
+            return
+        delete_blob_file(name)
+        blob.delete()
+
+
+def count_references():
+    """Count every blob reference in the image fields, straight from the source tables"""
+    references = Counter()
+    for label, fields in BLOB_FIELDS.items():
+        model = apps.get_model(label)
+        for field in fields:
+            names = model.objects.filter(**{f'{field}__startswith': BLOB_PREFIX}).values_list(field, flat=True)
+            references.update(names.iterator())
+    return references
+
+
+def collect_blobs():
+    """
+    Recompute every refcount from the image fields, then delete unreferenced
+    blobs, including files on disk without a Blob row (e.g. left behind by a
+    rolled back upload).
+    Returns (refcounts fixed, blobs deleted).
+    """
+    references = count_references()
+    fixed = 0
+    with transaction.atomic():
+        for blob in Blob.objects.select_for_update():
+            if blob.refcount != references[blob.name]:
+                blob.refcount = references[blob.name]
+                blob.save(update_fields=['refcount', 'updated_at'])
+                fixed += 1
+        known = set(Blob.objects.values_list('name', flat=True))
+        Blob.objects.bulk_create(
+            [Blob(name=name, refcount=count) for name, count in references.items() if name not in known]
+        )
+        unreferenced = list(Blob.objects.filter(refcount__lte=0).values_list('name', flat=True))
+        Blob.objects.filter(name__in=unreferenced).delete()
+
+    storage = blob_storage()
+    orphans = set(unreferenced)
+    cutoff = timezone.now() - ORPHAN_GRACE_PERIOD
+    if storage.exists(BLOB_PREFIX):
+        for directory in storage.listdir(BLOB_PREFIX)[0]:
+            for filename in storage.listdir(f"{BLOB_PREFIX}{directory}")[1]:
+                name = f"{BLOB_PREFIX}{directory}/{filename}"
+                if name not in references and storage.get_modified_time(name) < cutoff:
+                    orphans.add(name)
+    for name in orphans:
+        delete_blob_file(name)
+    return fixed, len(orphans)
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from Media.blobs import collect_blobs
+
+
+class Command(BaseCommand):
+    help = "Recompute media blob reference counts and delete blobs nothing references"
+
+    def handle(self, *args, **options):
+        fixed, deleted = collect_blobs()
+        self.stdout.write(self.style.SUCCESS(
+            f"Fixed {fixed} reference counts and deleted {deleted} unreferenced blobs"
+        ))
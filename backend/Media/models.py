@@ -0,0 +1,22 @@
+from django.db import models
+
+# Create your models here.
+
+class Blob(models.Model):
+    """
+    One file written by Media.storage.DeduplicatingStorage.
+
+    refcount is the number of image fields that currently point at the
+    file. It is kept current by the signal handlers in Media.signals and can
+    be recomputed with `python manage.py collect_media_blobs`.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    refcount = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+
+    class Meta:
+        ordering = ['name']
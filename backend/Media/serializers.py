@@ -0,0 +1,32 @@
+from urllib.parse import urlencode
+from django.conf import settings
+from rest_framework import serializers
+from .variants import variant_name
+
+
+def variant_urls(file, request=None):
+    """
+    Return {variant: url} for every variant of an image, whether or not it
+    has been generated yet. The URLs name the original, so MediaView can
+    redirect to it until the variant exists; that keeps the serialized data
+    (and the ETags computed from the tables) the same before and after.
+    """
+    if not file:
+        return {}
+    urls = {}
+    query = urlencode({'original': file.name})
+    for variant in settings.IMAGE_VARIANTS:
+        url = f"{file.storage.url(variant_name(file.name, variant))}?{query}"
+        urls[variant] = request.build_absolute_uri(url) if request else url
+    return urls
+
+
+class ImageVariantsField(serializers.Field):
+    """Read-only {variant: url} of the image field named by `source`"""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return variant_urls(value, self.context.get('request'))
@@ -0,0 +1,52 @@
+from collections import Counter
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from .blobs import BLOB_FIELDS, apply_references, blob_names, pending_uploads, stored_blob_names
+from .variants import IMAGE_FIELDS, schedule_variants
+
+
+def queue_variants(sender, instance, raw=False, **kwargs):
+    """Queue variant generation for the stored images once the save commits"""
+    if raw:
+        return
+    for field in IMAGE_FIELDS[sender._meta.label]:
+        name = getattr(instance, field).name
+        if name:
+            transaction.on_commit(lambda name=name: schedule_variants(name))
+
+
+def remember_blob_names(sender, instance, raw=False, **kwargs):
+    """Keep the blobs referenced before the save so post_save can release replaced ones"""
+    if raw:
+        return
+    instance._blob_previous = stored_blob_names(instance) if instance.pk else Counter()
+    instance._blob_uploads = pending_uploads(instance)
+
+
+def update_blob_references(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # The uploads are now stored; key them by the blob name they were saved as
+    uploads = getattr(instance, '_blob_uploads', None) or {}
+    contents = {getattr(instance, field).name: upload for field, upload in uploads.items()}
+    apply_references(getattr(instance, '_blob_previous', None) or Counter(), blob_names(instance), contents)
+    instance._blob_previous = instance._blob_uploads = None
+
+
+def release_blob_references(sender, instance, **kwargs):
+    apply_references(blob_names(instance), Counter())
+
+
+def connect_variant_signals():
+    for label in IMAGE_FIELDS:
+        model = apps.get_model(label)
+        post_save.connect(queue_variants, sender=model, dispatch_uid=f'image_variants_{label}')
+
+
+def connect_blob_signals():
+    for label in BLOB_FIELDS:
+        model = apps.get_model(label)
+        pre_save.connect(remember_blob_names, sender=model, dispatch_uid=f'blob_pre_save_{label}')
+        post_save.connect(update_blob_references, sender=model, dispatch_uid=f'blob_post_save_{label}')
+        post_delete.connect(release_blob_references, sender=model, dispatch_uid=f'blob_post_delete_{label}')
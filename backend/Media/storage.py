@@ -0,0 +1,41 @@
+import hashlib
+import os
+from django.core.files.storage import FileSystemStorage
+
+BLOB_PREFIX = 'blobs/'
+
+
+class DeduplicatingStorage(FileSystemStorage):
+    """
+    File storage that keeps every distinct upload once.
+
+    Files are named after the SHA-256 of their content
+    (blobs/<first two hex digits>/<sha256><ext>), so uploading the same
+    receipt twice returns the name of the file already stored instead of
+    writing a copy. Which records still use a blob is tracked by Media.Blob;
+    a reused file that is deleted before the new reference is counted is
+    written again by Media.blobs.retain.
+    """
+
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content_hash = digest.hexdigest()
+        extension = os.path.splitext(name)[1].lower()
+        blob_name = f"{BLOB_PREFIX}{content_hash[:2]}/{content_hash}{extension}"
+
+        if self.exists(blob_name):
+            return blob_name
+        return super()._save(blob_name, content)
+
+
+_blob_storage = None
+
+
+def blob_storage():
+    """Shared DeduplicatingStorage instance, used as the storage of the image fields"""
+    global _blob_storage
+    if _blob_storage is None:
+        _blob_storage = DeduplicatingStorage()
+    return _blob_storage
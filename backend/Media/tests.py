@@ -0,0 +1,306 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from Product.models import Product, ProductImage
+from Product.serializers import ProductImageSerializer
+from Project.models import UniqueSolarProject, UniqueSolarProjectImage
+from Expense.models import Expense
+from .models import Blob
+from .storage import DeduplicatingStorage, blob_storage
+from .variants import generate_variants, variant_name
+
+# Create your tests here.
+
+
+def jpeg_upload(name='photo.jpg', size=(2000, 1500)):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'orange').save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class ImageVariantTestCase(TestCase):
+    def setUp(self):
+        """Use a throwaway MEDIA_ROOT and generate variants inline"""
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root, IMAGE_VARIANT_WORKERS=0)
+        self.settings_override.enable()
+        self.product = Product.objects.create(
+            name='Panel', brand='Jinko', customer_name='Customer', date=timezone.now().date(),
+            purchase_price='100.00', sale_price='120.00', category='Solar', quantity=1,
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_variants_are_generated_after_commit(self):
+        """Test that saving an image queues resized variants and the serializer links them"""
+        with self.captureOnCommitCallbacks(execute=True):
+            image = ProductImage.objects.create(product=self.product, image=jpeg_upload())
+
+        with default_storage.open(variant_name(image.image.name, 'thumb')) as handle:
+            thumb = Image.open(handle)
+            self.assertEqual(thumb.format, 'WEBP')
+            self.assertEqual(thumb.size, (320, 240))
+
+        variants = ProductImageSerializer(image).data['variants']
+        self.assertEqual(set(variants), {'thumb', 'medium', 'thumb_jpeg'})
+        self.assertTrue(variants['thumb'].startswith(f"/media/{variant_name(image.image.name, 'thumb')}?"))
+
+    def test_existing_variants_are_not_regenerated(self):
+        """Test that generation is idempotent"""
+        name = default_storage.save('products/photo.jpg', jpeg_upload())
+        self.assertEqual(len(generate_variants(name)), 3)
+        self.assertEqual(generate_variants(name), [])
+
+    def test_unreadable_upload_gets_no_variants(self):
+        """Test that a file Pillow cannot read is skipped"""
+        name = default_storage.save('products/broken.jpg', SimpleUploadedFile('broken.jpg', b'not an image'))
+        with self.assertLogs('Media.variants', level='WARNING'):
+            self.assertEqual(generate_variants(name), [])
+
+        # Its variant URLs keep pointing at the original
+        thumb = ProductImageSerializer(ProductImage(image=name)).data['variants']['thumb']
+        with self.assertLogs('Media.variants', level='WARNING'):
+            response = self.client.get(thumb)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], f'/media/{name}')
+
+    def test_variant_urls_do_not_change_when_variants_are_written(self):
+        """Test that the serialized URLs are fixed and redirect to the original until generated"""
+        with self.captureOnCommitCallbacks(execute=False):
+            image = ProductImage.objects.create(product=self.product, image=jpeg_upload())
+        before = ProductImageSerializer(image).data['variants']
+
+        with mock.patch('Media.views.schedule_variants') as schedule:
+            response = self.client.get(before['thumb'])
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], image.image.url)
+        self.assertEqual(response['Cache-Control'], 'no-store')
+        schedule.assert_called_once_with(image.image.name)
+
+        generate_variants(image.image.name)
+        self.assertEqual(ProductImageSerializer(image).data['variants'], before)
+        response = self.client.get(before['thumb'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+
+    def test_variant_redirect_only_names_its_own_original(self):
+        """Test that the original parameter cannot point the redirect elsewhere"""
+        name = default_storage.save('products/photo.jpg', jpeg_upload())
+        thumb = variant_name(name, 'thumb')
+        for original in ['products/other.jpg', 'private/photo.jpg', 'https://example.com/photo.jpg']:
+            response = self.client.get(f'/media/{thumb}', {'original': original})
+            self.assertEqual(response.status_code, 404)
+
+
+class DeduplicatingStorageTestCase(TestCase):
+    def setUp(self):
+        """Use a throwaway MEDIA_ROOT"""
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root, IMAGE_VARIANT_WORKERS=0)
+        self.settings_override.enable()
+        self.upload = jpeg_upload(size=(40, 30))
+        self.content = self.upload.read()
+        self.project = UniqueSolarProject.objects.create(
+            customer_name='Customer', address='Address', valid_until=timezone.now().date()
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def image(self, name='receipt.jpg'):
+        return SimpleUploadedFile(name, self.content, content_type='image/jpeg')
+
+    def test_same_content_is_stored_once(self):
+        """Test that an expense and a project image share one blob"""
+        expense = Expense.objects.create(
+            title='Invoice', utilizer='Tariq', amount='10.00', date=timezone.now().date(), image1=self.image()
+        )
+        project_image = UniqueSolarProjectImage.objects.create(project=self.project, image=self.image('copy.jpg'))
+
+        self.assertEqual(expense.image1.name, project_image.image.name)
+        self.assertTrue(expense.image1.name.startswith('blobs/'))
+        self.assertEqual(Blob.objects.get().refcount, 2)
+
+    def test_blob_is_deleted_with_its_last_reference(self):
+        """Test that deleting references garbage-collects the file after commit"""
+        expense = Expense.objects.create(
+            title='Invoice', utilizer='Tariq', amount='10.00', date=timezone.now().date(),
+            image1=self.image(), image2=self.image(),
+        )
+        project_image = UniqueSolarProjectImage.objects.create(project=self.project, image=self.image())
+        name = project_image.image.name
+        self.assertEqual(Blob.objects.get().refcount, 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            project_image.delete()
+        self.assertTrue(default_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            expense.image2 = None
+            expense.save()
+            expense.delete()
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(Blob.objects.exists())
+
+    def test_blob_retained_again_before_commit_is_kept(self):
+        """Test that the delete re-checks the refcount instead of trusting the release"""
+        project_image = UniqueSolarProjectImage.objects.create(project=self.project, image=self.image())
+        name = project_image.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            project_image.delete()
+            # The same content is uploaded again before the delete runs
+            Expense.objects.create(
+                title='Invoice', utilizer='Tariq', amount='10.00', date=timezone.now().date(), image1=self.image()
+            )
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(Blob.objects.get(name=name).refcount, 1)
+
+    def test_blob_deleted_while_reused_is_written_again(self):
+        """Test that an upload reusing a blob survives the blob being deleted before retain()"""
+        project_image = UniqueSolarProjectImage.objects.create(project=self.project, image=self.image())
+        name = project_image.image.name
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            project_image.delete()
+
+        reuse = DeduplicatingStorage._save
+
+        def save_then_collect(storage, *args):
+            saved = reuse(storage, *args)
+            # The pending delete runs after the storage found the file
+            for callback in callbacks:
+                callback()
+            return saved
+
+        with mock.patch.object(DeduplicatingStorage, '_save', save_then_collect):
+            expense = Expense.objects.create(
+                title='Invoice', utilizer='Tariq', amount='10.00', date=timezone.now().date(), image1=self.image()
+            )
+
+        self.assertEqual(expense.image1.name, name)
+        self.assertEqual(Blob.objects.get(name=name).refcount, 1)
+        with default_storage.open(name) as handle:
+            self.assertEqual(handle.read(), self.content)
+
+    def test_collect_blobs_repairs_counts_and_removes_orphans(self):
+        """Test the collect_media_blobs command against drifted counts"""
+        project_image = UniqueSolarProjectImage.objects.create(project=self.project, image=self.image())
+        Blob.objects.update(refcount=5)
+        orphan = blob_storage().save('receipt.jpg', SimpleUploadedFile('other.jpg', b'orphan'))
+        old = (timezone.now() - timedelta(days=1)).timestamp()
+        os.utime(os.path.join(self.media_root, orphan), (old, old))
+
+        output = StringIO()
+        call_command('collect_media_blobs', stdout=output)
+
+        self.assertIn('Fixed 1 reference counts and deleted 1 unreferenced blobs', output.getvalue())
+        self.assertEqual(Blob.objects.get(name=project_image.image.name).refcount, 1)
+        self.assertFalse(default_storage.exists(orphan))
+
+
+class MediaViewTestCase(TestCase):
+    def setUp(self):
+        """Store one blob and one legacy file in a throwaway MEDIA_ROOT"""
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.content = bytes(range(256)) * 4
+        self.blob = blob_storage().save('receipt.jpg', SimpleUploadedFile('receipt.jpg', self.content))
+        self.legacy = default_storage.save('products/old.jpg', SimpleUploadedFile('old.jpg', self.content))
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def get(self, name, **headers):
+        return self.client.get(reverse('media-file', args=[name]), headers=headers)
+
+    def test_full_response_headers(self):
+        """Test that a blob is served with its hash as ETag and cached as immutable"""
+        response = self.get(self.blob)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['ETag'], f'"{hashlib.sha256(self.content).hexdigest()}"')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+        legacy = self.get(self.legacy)
+        self.assertEqual(legacy['ETag'], response['ETag'])
+        self.assertEqual(legacy['Cache-Control'], 'public, max-age=86400')
+
+    def test_range_requests(self):
+        """Test byte, open-ended and suffix ranges, If-Range and unsatisfiable ranges"""
+        response = self.get(self.blob, Range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/1024')
+        self.assertEqual(b''.join(response.streaming_content), self.content[10:20])
+
+        response = self.get(self.blob, Range='bytes=1000-')
+        self.assertEqual(b''.join(response.streaming_content), self.content[1000:])
+
+        response = self.get(self.blob, Range='bytes=-4')
+        self.assertEqual(response['Content-Range'], 'bytes 1020-1023/1024')
+
+        response = self.get(self.blob, Range='bytes=0-9', **{'If-Range': '"stale"'})
+        self.assertEqual(response.status_code, 200)
+
+        response = self.get(self.blob, Range='bytes=2000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_range_of_empty_file_is_unsatisfiable(self):
+        """Test that no byte range of a 0-byte file is answered with 206"""
+        empty = default_storage.save('products/empty.jpg', SimpleUploadedFile('empty.jpg', b''))
+        for header in ('bytes=-4', 'bytes=0-', 'bytes=0-0'):
+            response = self.get(empty, Range=header)
+            self.assertEqual(response.status_code, 416)
+            self.assertEqual(response['Content-Range'], 'bytes */0')
+
+        response = self.get(empty)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Length'], '0')
+
+    def test_matching_etag_returns_not_modified(self):
+        """Test conditional GET against the content hash"""
+        etag = self.get(self.blob)['ETag']
+        self.assertEqual(self.get(self.blob, **{'If-None-Match': etag}).status_code, 304)
+
+    @override_settings(MEDIA_SENDFILE='x-accel-redirect')
+    def test_accel_redirect(self):
+        """Test that nginx is told which file to send"""
+        response = self.get(self.blob, Range='bytes=0-9')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.blob}')
+        self.assertEqual(response.content, b'')
+
+    def test_only_media_directories_are_served(self):
+        """Test that unknown directories and path traversal are rejected"""
+        self.assertEqual(self.get('other/file.jpg').status_code, 404)
+        self.assertEqual(self.get('products/../../settings.py').status_code, 404)
+        self.assertEqual(self.get('products/missing.jpg').status_code, 404)
+
+    def test_traversal_into_another_media_directory_is_rejected(self):
+        """Test that '..' cannot reach files outside the served directories"""
+        default_storage.save('private/secret.txt', SimpleUploadedFile('secret.txt', b'secret'))
+
+        self.assertEqual(self.get('private/secret.txt').status_code, 404)
+        self.assertEqual(self.get('products/../private/secret.txt').status_code, 404)
+        self.assertEqual(self.get('products/./../private/secret.txt').status_code, 404)
+        # Harmless '.' segments still reach the file
+        self.assertEqual(self.get(f'products/./{os.path.basename(self.legacy)}').status_code, 200)
@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('<path:name>', views.MediaView.as_view(), name='media-file'),
+]
@@ -0,0 +1,120 @@
+"""
+Resized, recompressed copies of uploaded images.
+
+Every upload to one of IMAGE_FIELDS gets the variants listed in
+settings.IMAGE_VARIANTS. They are generated by a small thread pool once the
+upload's transaction commits, so the upload request returns immediately.
+Variant names are derived from the original's name, which lets serializers
+link them without a database lookup; until a variant is written, its URL
+redirects to the original (see MediaView).
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Model label -> image fields whose uploads get variants
+IMAGE_FIELDS = {
+    'Product.ProductImage': ['image'],
+    'Project.UniqueSolarProjectImage': ['image'],
+    'Expense.Expense': [f'image{number}' for number in range(1, 8)],
+    'Authentication.CustomUser': ['profile_image'],
+}
+
+EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+
+_executor = None
+_executor_lock = threading.Lock()
+# Originals queued or being processed, so repeated saves do not queue them twice
+_pending = set()
+
+
+def variant_name(name, variant):
+    """Storage name of one variant, e.g. 'variants/products/photo.thumb.webp'"""
+    root, _ = os.path.splitext(name)
+    extension = EXTENSIONS[settings.IMAGE_VARIANTS[variant]['format']]
+    return f"variants/{root}.{variant}.{extension}"
+
+
+def is_variant_of(name, original):
+    """Whether `name` is the storage name of one of the variants of `original`"""
+    return any(variant_name(original, variant) == name for variant in settings.IMAGE_VARIANTS)
+
+
+def render_variant(image, spec):
+    """Return the encoded bytes of `image` shrunk to fit spec['size'] square"""
+    resized = image.copy()
+    resized.thumbnail((spec['size'], spec['size']), Image.Resampling.LANCZOS)
+    if spec['format'] == 'JPEG' and resized.mode not in ('RGB', 'L'):
+        resized = resized.convert('RGB')
+
+    buffer = BytesIO()
+    resized.save(buffer, spec['format'], quality=spec['quality'])
+    return buffer.getvalue()
+
+
+def generate_variants(name, storage=default_storage):
+    """
+    Write the missing variants of one stored image.
+    Returns the names written; files Pillow cannot read get no variants.
+    """
+    missing = {
+        variant: variant_name(name, variant)
+        for variant in settings.IMAGE_VARIANTS
+        if not storage.exists(variant_name(name, variant))
+    }
+    if not missing:
+        return []
+
+    try:
+        with storage.open(name, 'rb') as handle:
+            image = Image.open(handle)
+            # Phone photos are often stored sideways with an EXIF rotation
+            image = ImageOps.exif_transpose(image)
+            image.load()
+    except OSError:
+        logger.warning("Cannot create variants of %s", name, exc_info=True)
+        return []
+
+    written = []
+    for variant, target in missing.items():
+        content = render_variant(image, settings.IMAGE_VARIANTS[variant])
+        written.append(storage.save(target, ContentFile(content)))
+    return written
+
+
+def _generate_in_worker(name):
+    try:
+        generate_variants(name)
+    except Exception:
+        logger.exception("Generating variants of %s failed", name)
+    finally:
+        with _executor_lock:
+            _pending.discard(name)
+
+
+def schedule_variants(name):
+    """
+    Generate the variants of `name` in the worker pool, or inline when
+    IMAGE_VARIANT_WORKERS is 0.
+    """
+    global _executor
+    workers = settings.IMAGE_VARIANT_WORKERS
+    if not workers:
+        generate_variants(name)
+        return
+
+    with _executor_lock:
+        if name in _pending:
+            return
+        _pending.add(name)
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-variants')
+    _executor.submit(_generate_in_worker, name)
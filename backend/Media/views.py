@@ -0,0 +1,193 @@
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags, quote_etag
+from django.views import View
+from .storage import BLOB_PREFIX
+from .variants import is_variant_of, schedule_variants
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def is_content_addressed(name):
+    """Whether the name of a media file changes whenever its content does"""
+    return name.startswith(BLOB_PREFIX) or name.startswith(f'variants/{BLOB_PREFIX}')
+
+
+def normalize(name):
+    """
+    Return the normalized media name, or None if it is outside the
+    directories in settings.MEDIA_SERVE_PREFIXES. Checked after normalizing,
+    so 'products/../private/x' cannot leave the allowed directories.
+    """
+    name = posixpath.normpath(name)
+    if '..' in name.split('/') or not name.startswith(tuple(settings.MEDIA_SERVE_PREFIXES)):
+        return None
+    return name
+
+
+def content_hash(name, path, stat):
+    """
+    SHA-256 of a media file. Blobs carry it in their name (variants of a
+    blob add the variant, e.g. '<sha256>.thumb'); other files are hashed once
+    per size and modification time.
+    """
+    if is_content_addressed(name):
+        return os.path.splitext(os.path.basename(name))[0]
+
+    key = f'media:hash:{name}:{stat.st_size}:{stat.st_mtime_ns}'
+    digest = cache.get(key)
+    if digest is None:
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(CHUNK_SIZE), b''):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+        cache.set(key, digest, None)
+    return digest
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) for a single 'bytes=' range, None to serve the whole
+    file (no header, several ranges, other units) or raise ValueError when the
+    range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.groups() == ('', ''):
+        return None
+
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    # Also covers every range of an empty file and a zero-length suffix
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def read_range(path, start, length):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+class MediaView(View):
+    """
+    Media View
+
+    Serves uploaded files under MEDIA_ROOT for the directories listed in
+    settings.MEDIA_SERVE_PREFIXES, like <img> tags request them (no
+    authentication, as with the previous static() route).
+
+    - ETag is the SHA-256 of the file; a matching If-None-Match returns 304
+    - Content-addressed blobs and their variants are cached as immutable for
+      a year, other files for MEDIA_CACHE_MAX_AGE seconds
+    - A single byte Range (with If-Range) is answered with 206 or 416
+    - A variant that is not generated yet redirects to its original
+    - With MEDIA_SENDFILE set to 'x-accel-redirect' or 'x-sendfile' only the
+      headers are produced and the web server sends the file (and handles
+      ranges) itself
+    """
+
+    http_method_names = ['get', 'head']
+
+    def get(self, request, name):
+        name = normalize(name)
+        if name is None:
+            raise Http404("Unknown media directory")
+        try:
+            path = safe_join(settings.MEDIA_ROOT, name)
+            stat = os.stat(path)
+        except (SuspiciousFileOperation, ValueError, OSError):
+            return self.missing(request, name)
+        if not os.path.isfile(path):
+            return self.missing(request, name)
+
+        etag = quote_etag(content_hash(name, path, stat))
+        headers = {
+            'ETag': etag,
+            'Last-Modified': http_date(stat.st_mtime),
+            'Accept-Ranges': 'bytes',
+            'Cache-Control': self.cache_control(name),
+        }
+
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return self.build(HttpResponse(status=304), headers)
+
+        content_type, encoding = mimetypes.guess_type(path)
+        headers['Content-Type'] = content_type or 'application/octet-stream'
+        if encoding:
+            headers['Content-Encoding'] = encoding
+
+        sendfile = settings.MEDIA_SENDFILE
+        if sendfile == 'x-accel-redirect':
+            headers['X-Accel-Redirect'] = f"{settings.MEDIA_ACCEL_REDIRECT_PREFIX}{name}"
+            return self.build(HttpResponse(), headers)
+        if sendfile == 'x-sendfile':
+            headers['X-Sendfile'] = path
+            return self.build(HttpResponse(), headers)
+
+        size = stat.st_size
+        byte_range = None
+        if_range = request.headers.get('If-Range')
+        if not if_range or if_range == etag:
+            try:
+                byte_range = parse_range(request.headers.get('Range'), size)
+            except ValueError:
+                headers['Content-Range'] = f'bytes */{size}'
+                return self.build(HttpResponse(status=416), headers)
+
+        start, end = byte_range or (0, size - 1)
+        length = max(end - start + 1, 0)
+        headers['Content-Length'] = str(length)
+        status = 200
+        if byte_range:
+            status = 206
+            headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+        body = () if request.method == 'HEAD' else read_range(path, start, length)
+        return self.build(StreamingHttpResponse(body, status=status), headers)
+
+    def missing(self, request, name):
+        """
+        404, except for a variant that has not been generated yet: its URL
+        names the original (see Media.serializers.variant_urls), which is
+        served through a redirect browsers do not cache, while the variant
+        is (re)queued.
+        """
+        original = normalize(request.GET.get('original', ''))
+        if original is None or not is_variant_of(name, original):
+            raise Http404("Media file not found")
+        schedule_variants(original)
+        response = HttpResponseRedirect(f"{settings.MEDIA_URL}{original}")
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    def cache_control(self, name):
+        if is_content_addressed(name):
+            return IMMUTABLE
+        return f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+
+    def build(self, response, headers):
+        for header, value in headers.items():
+            response[header] = value
+        return response
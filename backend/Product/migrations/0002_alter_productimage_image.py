@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:45
+
+import Media.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Product', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='productimage',
+            name='image',
+            field=models.ImageField(help_text='Product image', storage=Media.storage.blob_storage, upload_to='products/'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 from decimal import Decimal
+from Media.storage import blob_storage
 
 # Create your models here.
 
@@ -83,6 +84,7 @@ class ProductImage(models.Model):
     )
     image = models.ImageField(
         upload_to='products/',
+        storage=blob_storage,
         help_text="Product image"
     )
     order = models.PositiveIntegerField(
@@ -90,6 +92,7 @@ class ProductImage(models.Model):
         help_text="Order of the image (1-7)"
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.product.brand} - Image {self.order}"
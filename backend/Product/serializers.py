@@ -1,11 +1,14 @@
 from rest_framework import serializers
 from .models import Product, ProductImage
 from django.db import models
+from Media.serializers import ImageVariantsField
 
 class ProductImageSerializer(serializers.ModelSerializer):
+    variants = ImageVariantsField(source='image')
+
     class Meta:
         model = ProductImage
-        fields = ['id', 'image', 'order', 'created_at']
+        fields = ['id', 'image', 'variants', 'order', 'created_at']
 
 class ProductSerializer(serializers.ModelSerializer):
     images = ProductImageSerializer(many=True, read_only=True)
@@ -6,6 +6,7 @@ app_name = 'product'
 urlpatterns = [
     path('create/', views.CreateProductView.as_view(), name='create_product'),
     path('list/', views.ListProductsView.as_view(), name='list_products'),
+    path('export/', views.ExportProductsView.as_view(), name='export_products'),
     path('get-product/<int:product_id>/', views.RetrieveProductView.as_view(), name='retrieve_product'),
     path('<int:product_id>/update/', views.UpdateProductView.as_view(), name='update_product'),
     path('<int:product_id>/delete/', views.DeleteProductView.as_view(), name='delete_product'),
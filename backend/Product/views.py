@@ -7,6 +7,8 @@ from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.shortcuts import get_object_or_404
 from .models import Product, ProductImage
 from .serializers import ProductSerializer, ProductCreateSerializer, ProductUpdateSerializer
+from backend.conditional import conditional_get
+from backend.exports import csv_response, filter_year, iter_values
 
 class ProductPagination(PageNumberPagination):
     page_size = 10
@@ -37,6 +39,7 @@ class ListProductsView(APIView):
     permission_classes = [IsAuthenticated]
     pagination_class = ProductPagination
     
+    @conditional_get(Product, ProductImage)
     def get(self, request):
         products = Product.objects.all()
         
@@ -121,3 +124,21 @@ class DeleteProductImageView(APIView):
             {"message": "Image deleted successfully"}, 
             status=status.HTTP_200_OK
         )
+
+class ExportProductsView(APIView):
+    """
+    Stream all products (optionally one ?year=) as CSV
+    Requires authentication with access token
+    """
+    permission_classes = [IsAuthenticated]
+    columns = [
+        'id', 'date', 'name', 'brand', 'category', 'customer_name',
+        'quantity', 'purchase_price', 'sale_price', 'description',
+    ]
+
+    def get(self, request):
+        try:
+            products = filter_year(Product.objects.order_by('date', 'id'), request.query_params)
+        except ValueError:
+            return Response({'error': 'year must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        return csv_response('products.csv', self.columns, iter_values(products, self.columns))
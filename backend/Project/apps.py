@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ProjectConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Project'
+
+    def ready(self):
+        from .cache import connect_checklist_signals
+        connect_checklist_signals()
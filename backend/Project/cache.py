@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from .models import UniqueSolarChecklist
+
+ACTIVE_CHECKLIST_KEY = 'project:active-checklist'
+
+
+def active_checklist():
+    """Return {id: item_name} for the active checklist items, cached between edits"""
+    catalog = cache.get(ACTIVE_CHECKLIST_KEY)
+    if catalog is None:
+        catalog = dict(
+            UniqueSolarChecklist.objects.filter(is_active=True).values_list('id', 'item_name')
+        )
+        cache.set(ACTIVE_CHECKLIST_KEY, catalog, settings.CHECKLIST_CACHE_TIMEOUT)
+    return catalog
+
+
+def split_checklist_ids(checklist_ids):
+    """
+    Split checklist ids into (active ids, invalid ids), both de-duplicated
+    and in request order.
+    The cached catalog screens out unknown ids; the ids it accepts are
+    confirmed with one query, since the cache is per process and another
+    worker may have deactivated or deleted an item since it was loaded.
+    Call inside the transaction that links the ids.
+    """
+    catalog = active_checklist()
+    checklist_ids = list(dict.fromkeys(checklist_ids))
+    cached = [checklist_id for checklist_id in checklist_ids if checklist_id in catalog]
+    active = set()
+    if cached:
+        active = set(
+            UniqueSolarChecklist.objects.filter(id__in=cached, is_active=True).values_list('id', flat=True)
+        )
+        if len(active) < len(cached):
+            # This process' copy is stale
+            invalidate_active_checklist()
+
+    valid = []
+    invalid = []
+    for checklist_id in checklist_ids:
+        (valid if checklist_id in active else invalid).append(checklist_id)
+    return valid, invalid
+
+
+def invalidate_active_checklist(**kwargs):
+    cache.delete(ACTIVE_CHECKLIST_KEY)
+
+
+def connect_checklist_signals():
+    post_save.connect(invalidate_active_checklist, sender=UniqueSolarChecklist, dispatch_uid='active_checklist_save')
+    post_delete.connect(invalidate_active_checklist, sender=UniqueSolarChecklist, dispatch_uid='active_checklist_delete')
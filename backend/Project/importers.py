@@ -0,0 +1,174 @@
+import csv
+import io
+import json
+from itertools import islice
+from django.db import transaction, DatabaseError
+from rest_framework import serializers
+from Dashboard.rollups import apply_bulk_create
+from .models import (
+    ZarorratService,
+    ZarorratProject,
+    ZarorratProjectService,
+    UniqueSolarProject,
+    UniqueSolarProjectProduct,
+    allocate_project_ids,
+)
+from .serializers import ZarorratProjectImportSerializer, UniqueSolarProjectImportSerializer
+
+FORMATS = ['csv', 'jsonl']
+DEFAULT_CHUNK_SIZE = 500
+
+
+class ZarorratImport:
+    """Zarorrat projects with their selected services"""
+    model = ZarorratProject
+    prefix = 'ZR'
+    serializer_class = ZarorratProjectImportSerializer
+    # Nested columns that arrive as JSON text in CSV files
+    json_fields = ['service_ids']
+
+    def context(self):
+        return {'service_ids': set(ZarorratService.objects.values_list('id', flat=True))}
+
+    def write(self, rows, project_ids):
+        projects = []
+        links = []
+        for data, project_id in zip(rows, project_ids):
+            service_ids = data.pop('service_ids', [])
+            project = ZarorratProject(project_id=project_id, **data)
+            projects.append(project)
+            links += [ZarorratProjectService(project=project, service_id=service_id) for service_id in service_ids]
+
+        ZarorratProject.objects.bulk_create(projects)
+        ZarorratProjectService.objects.bulk_create(links)
+        return projects
+
+
+class UniqueSolarImport:
+    """Unique Solar projects with their product lines"""
+    model = UniqueSolarProject
+    prefix = 'US'
+    serializer_class = UniqueSolarProjectImportSerializer
+    json_fields = ['products']
+
+    def context(self):
+        return {}
+
+    def write(self, rows, project_ids):
+        projects = []
+        lines = []
+        for data, project_id in zip(rows, project_ids):
+            products = data.pop('products', [])
+            project = UniqueSolarProject(project_id=project_id, **data)
+            project_lines = [UniqueSolarProjectProduct(project=project, **product) for product in products]
+            for line in project_lines:
+                line.line_total = line.quantity * line.unit_price
+            # Totals are set here because bulk_create skips save()
+            project.calculate_totals(subtotal=sum(line.line_total for line in project_lines))
+            projects.append(project)
+            lines += project_lines
+
+        UniqueSolarProject.objects.bulk_create(projects)
+        UniqueSolarProjectProduct.objects.bulk_create(lines)
+        return projects
+
+
+IMPORTERS = {
+    'zarorrat': ZarorratImport(),
+    'unique_solar': UniqueSolarImport(),
+}
+
+
+def iter_rows(stream, file_format):
+    """
+    Lazily yield (line number, row dict, parse error) from a binary CSV or
+    JSONL stream; only one line is held in memory at a time.
+    Empty CSV cells are left out so the model defaults apply.
+    If the rest of the file cannot be decoded or parsed, that is yielded as
+    the error of the line after the last one read, and reading stops.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    number = 0
+    try:
+        if file_format == 'csv':
+            reader = csv.DictReader(text)
+            for row in reader:
+                number = reader.line_num
+                yield number, {
+                    key: value for key, value in row.items() if key is not None and value != ''
+                }, None
+            return
+
+        for number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield number, None, "Each line must be a JSON object"
+                continue
+            yield number, row, None
+    except (UnicodeDecodeError, csv.Error) as e:
+        yield number + 1, None, f"Could not read the rest of the file: {e}"
+
+
+def _decode_json_fields(row, fields):
+    for field in fields:
+        if isinstance(row.get(field), str):
+            row[field] = json.loads(row[field])
+
+
+def import_projects(stream, kind, file_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Import projects of one kind ('zarorrat' or 'unique_solar') from a CSV or
+    JSONL stream. Rows are validated a chunk at a time and every valid chunk
+    is written with bulk_create in its own transaction, using one block of
+    project IDs. Invalid rows are skipped and reported; a file that cannot
+    be read to the end is reported as an error row, and the chunks before it
+    stay imported.
+    Returns {'created': count, 'failed': count, 'errors': [{'row': line, 'errors': ...}]}.
+    """
+    importer = IMPORTERS[kind]
+    # One serializer validates every row; building its fields per row would
+    # cost more than the inserts
+    validator = importer.serializer_class(context=importer.context())
+    created = 0
+    errors = []
+
+    rows = iter_rows(stream, file_format)
+    while chunk := list(islice(rows, chunk_size)):
+        numbers = []
+        valid = []
+        for number, row, error in chunk:
+            if error is None:
+                try:
+                    _decode_json_fields(row, importer.json_fields)
+                except json.JSONDecodeError as e:
+                    error = f"Invalid JSON in nested column: {e}"
+            if error is not None:
+                errors.append({'row': number, 'errors': error})
+                continue
+
+            try:
+                valid.append(validator.run_validation(row))
+            except serializers.ValidationError as e:
+                errors.append({'row': number, 'errors': e.detail})
+                continue
+            numbers.append(number)
+
+        if not valid:
+            continue
+        try:
+            with transaction.atomic():
+                project_ids = allocate_project_ids(importer.model, importer.prefix, count=len(valid))
+                projects = importer.write(valid, project_ids)
+                apply_bulk_create(importer.model, projects)
+        except DatabaseError as e:
+            errors += [{'row': number, 'errors': f"Database error: {e}"} for number in numbers]
+            continue
+        created += len(projects)
+
+    return {'created': created, 'failed': len(errors), 'errors': errors}
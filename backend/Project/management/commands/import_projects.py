@@ -0,0 +1,38 @@
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from Project.importers import DEFAULT_CHUNK_SIZE, FORMATS, IMPORTERS, import_projects
+
+
+class Command(BaseCommand):
+    help = "Import Zarorrat or Unique Solar projects from a CSV or JSONL file in bulk"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSONL file, one project per row/line")
+        parser.add_argument('--kind', required=True, choices=list(IMPORTERS))
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help="File format (defaults to the file extension)"
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Rows validated and written per transaction"
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in FORMATS:
+            raise CommandError(f"Cannot tell the format of {path}; pass --format")
+
+        with path.open('rb') as stream:
+            result = import_projects(stream, options['kind'], file_format, options['chunk_size'])
+
+        for error in result['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        style = self.style.WARNING if result['failed'] else self.style.SUCCESS
+        self.stdout.write(style(
+            f"Imported {result['created']} projects, {result['failed']} rows failed"
+        ))
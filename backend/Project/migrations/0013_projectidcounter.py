@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Project', '0012_uniquesolarproject_installation_amount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectIdCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=10)),
+                ('year', models.PositiveSmallIntegerField()),
+                ('last_number', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('prefix', 'year')},
+            },
+        ),
+    ]
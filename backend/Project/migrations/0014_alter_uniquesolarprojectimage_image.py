@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:45
+
+import Media.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Project', '0013_projectidcounter'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='uniquesolarprojectimage',
+            name='image',
+            field=models.ImageField(help_text='Project image or receipt', storage=Media.storage.blob_storage, upload_to='unique_solar_projects/'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Project', '0014_alter_uniquesolarprojectimage_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uniquesolarchecklist',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='uniquesolarprojectchecklist',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='uniquesolarprojectimage',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='uniquesolarprojectproduct',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='zarorratprojectservice',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
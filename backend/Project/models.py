@@ -1,12 +1,75 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, Sum
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 import uuid
 from django.core.exceptions import ValidationError
+from Media.storage import blob_storage
 
 # Create your models here.
 
+class ProjectIdCounter(models.Model):
+    """Last project number handed out per ID prefix and year"""
+    prefix = models.CharField(max_length=10)
+    year = models.PositiveSmallIntegerField()
+    last_number = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.prefix}-{self.year}: {self.last_number}"
+    
+    @classmethod
+    def allocate(cls, prefix, year, count=1, seed=None):
+        """
+        Atomically reserve `count` consecutive numbers and return the first one.
+        `seed` returns the highest number already in use and is only called
+        when the counter row for this prefix and year does not exist yet.
+        """
+        with transaction.atomic():
+            counter = cls.objects.select_for_update().filter(prefix=prefix, year=year).first()
+            if counter is None:
+                try:
+                    with transaction.atomic():
+                        counter = cls.objects.create(
+                            prefix=prefix, year=year, last_number=seed() if seed else 0
+                        )
+                except IntegrityError:
+                    # Another worker created it first
+                    counter = cls.objects.select_for_update().get(prefix=prefix, year=year)
+            
+            cls.objects.filter(pk=counter.pk).update(last_number=F('last_number') + count)
+            counter.refresh_from_db(fields=['last_number'])
+        return counter.last_number - count + 1
+    
+    class Meta:
+        unique_together = ['prefix', 'year']
+
+
+def _highest_project_number(model, prefix, year):
+    """Highest number used by existing '<prefix>-<year>-NNNN' project IDs"""
+    last_project = model.objects.filter(
+        project_id__startswith=f'{prefix}-{year}-'
+    ).order_by('-project_id').first()
+    
+    if last_project:
+        try:
+            return int(last_project.project_id.split('-')[-1])
+        except (ValueError, IndexError):
+            pass
+    return 0
+
+
+def allocate_project_ids(model, prefix, count=1):
+    """Reserve `count` consecutive project IDs such as 'ZR-2025-0001' for `model`"""
+    current_year = timezone.now().year
+    first = ProjectIdCounter.allocate(
+        prefix,
+        current_year,
+        count,
+        seed=lambda: _highest_project_number(model, prefix, current_year)
+    )
+    return [f"{prefix}-{current_year}-{number:04d}" for number in range(first, first + count)]
+
 class ZarorratService(models.Model):
     """Model for Zarorrat services that will be managed from backend"""
     name = models.CharField(max_length=100, unique=True)
@@ -56,22 +119,7 @@ class ZarorratProject(models.Model):
     
     def generate_project_id(self):
         """Generate project ID for Zarorrat projects"""
-        current_year = timezone.now().year
-        
-        last_project = ZarorratProject.objects.filter(
-            project_id__startswith=f'ZR-{current_year}-'
-        ).order_by('-project_id').first()
-        
-        if last_project:
-            try:
-                last_number = int(last_project.project_id.split('-')[-1])
-                next_number = last_number + 1
-            except (ValueError, IndexError):
-                next_number = 1
-        else:
-            next_number = 1
-            
-        return f"ZR-{current_year}-{next_number:04d}"
+        return allocate_project_ids(ZarorratProject, 'ZR')[0]
     
     def save(self, *args, **kwargs):
         if not self.project_id:
@@ -96,6 +144,7 @@ class ZarorratProjectService(models.Model):
         related_name='projects'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         unique_together = ['project', 'service']
@@ -189,27 +238,23 @@ class UniqueSolarProject(models.Model):
     
     def generate_project_id(self):
         """Generate project ID for Unique Solar projects"""
-        current_year = timezone.now().year
-        
-        # Get the next unique ID for Unique Solar projects this year
-        last_project = UniqueSolarProject.objects.filter(
-            project_id__startswith=f'US-{current_year}-'
-        ).order_by('-project_id').first()
-        
-        if last_project:
-            try:
-                last_number = int(last_project.project_id.split('-')[-1])
-                next_number = last_number + 1
-            except (ValueError, IndexError):
-                next_number = 1
-        else:
-            next_number = 1
-            
-        return f"US-{current_year}-{next_number:04d}"
+        return allocate_project_ids(UniqueSolarProject, 'US')[0]
     
-    def calculate_totals(self):
-        """Calculate subtotal, tax, and grand total - CORRECTED VERSION"""
-        self.subtotal = sum(item.line_total for item in self.products.all())
+    TOTAL_FIELDS = ['subtotal', 'grand_total', 'total_payment', 'completion_payment']
+    PRODUCT_LINE_FIELDS = ['product_type', 'specify_product', 'quantity', 'unit_price', 'line_total']
+
+    def calculate_totals(self, subtotal=None):
+        """
+        Calculate subtotal, tax, and grand total - CORRECTED VERSION
+        Pass `subtotal` when the line totals are already known (bulk imports).
+        """
+        # Summed in the database; a project without a pk has no products yet
+        if subtotal is not None:
+            self.subtotal = subtotal
+        elif self.pk:
+            self.subtotal = self.products.aggregate(total=Sum('line_total'))['total'] or 0
+        else:
+            self.subtotal = 0
         
         # ✅ CORRECT: Installation cost ko tax base me include karo
         installation_cost = self.installation_amount or 0
@@ -220,19 +265,109 @@ class UniqueSolarProject(models.Model):
         self.grand_total = tax_base + tax_amount
         self.total_payment = self.grand_total
         self.completion_payment = self.total_payment - self.advance_payment
+
+    def update_totals(self):
+        """Recalculate the totals and write only the total fields"""
+        self.calculate_totals()
+        # updated_at moves the project list ETag (backend.conditional)
+        self.save(update_fields=self.TOTAL_FIELDS + ['updated_at'])
+
+    def add_products(self, products):
+        """
+        Create product lines in one bulk_create and recalculate totals once.
+        `products` is a list of field dicts (e.g. validated serializer data);
+        lines without an order get their position in the list.
+        """
+        lines = [
+            UniqueSolarProjectProduct(project=self, **{'order': position, **product})
+            for position, product in enumerate(products)
+        ]
+        for line in lines:
+            # bulk_create skips save(), so fill line_total here
+            line.line_total = line.quantity * line.unit_price
+        UniqueSolarProjectProduct.objects.bulk_create(lines)
+        self.update_totals()
+        return lines
+
+    def sync_products(self, products):
+        """
+        Make the project's product lines match `products`, matched by order
+        (lines without an order get their position in the list).
+        Only new, changed and removed lines are written (one bulk_create, one
+        bulk_update, one delete) and totals are recalculated only if a line changed.
+        Returns (created, updated, deleted) line counts.
+        """
+        existing = {line.order: line for line in self.products.all()}
+        wanted = {product.get('order', position): product for position, product in enumerate(products)}
+
+        created = []
+        updated = []
+        for order, product in wanted.items():
+            # Built in full so fields left out of `product` fall back to their defaults
+            candidate = UniqueSolarProjectProduct(project=self, **{**product, 'order': order})
+            candidate.line_total = candidate.quantity * candidate.unit_price
+            line = existing.get(order)
+            if line is None:
+                created.append(candidate)
+                continue
+
+            changed = [
+                field for field in self.PRODUCT_LINE_FIELDS
+                if getattr(line, field) != getattr(candidate, field)
+            ]
+            if changed:
+                for field in changed:
+                    setattr(line, field, getattr(candidate, field))
+                # bulk_update does not apply auto_now
+                line.updated_at = timezone.now()
+                updated.append(line)
+
+        removed = [line.pk for order, line in existing.items() if order not in wanted]
+
+        if removed:
+            UniqueSolarProjectProduct.objects.filter(pk__in=removed).delete()
+        if created:
+            UniqueSolarProjectProduct.objects.bulk_create(created)
+        if updated:
+            UniqueSolarProjectProduct.objects.bulk_update(updated, self.PRODUCT_LINE_FIELDS + ['updated_at'])
+        if created or updated or removed:
+            self.update_totals()
+        return len(created), len(updated), len(removed)
+
+    def sync_checklist(self, checklist_ids):
+        """
+        Make the project's checklist links match `checklist_ids`.
+        Only missing links are inserted and only unwanted ones deleted.
+        Returns (created, deleted) link counts.
+        """
+        wanted = set(checklist_ids)
+        existing = set(self.checklist.values_list('checklist_id', flat=True))
+
+        removed = existing - wanted
+        if removed:
+            self.checklist.filter(checklist_id__in=removed).delete()
+        added = [checklist_id for checklist_id in dict.fromkeys(checklist_ids) if checklist_id not in existing]
+        if added:
+            UniqueSolarProjectChecklist.objects.bulk_create(
+                [
+                    UniqueSolarProjectChecklist(project=self, checklist_id=checklist_id)
+                    for checklist_id in added
+                ],
+                ignore_conflicts=True,
+            )
+        return len(added), len(removed)
     
     def save(self, *args, **kwargs):
         # Generate project ID if not exists
         if not self.project_id:
             self.project_id = self.generate_project_id()
         
-        super().save(*args, **kwargs)
-        
-        # Recalculate totals after product changes
-        self.calculate_totals()
+        # Totals are calculated before the write, so a full save is a single
+        # UPDATE; partial saves (update_fields) are written as given
+        if kwargs.get('update_fields') is None:
+            self.calculate_totals()
         
-        # Save only the totals fields to avoid recursion
-        super().save(update_fields=['subtotal', 'grand_total', 'total_payment', 'completion_payment'])
+        super().save(*args, **kwargs)
         
     
     class Meta:
@@ -281,6 +416,7 @@ class UniqueSolarProjectProduct(models.Model):
     )
     order = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.project.project_id} - {self.specify_product}"
@@ -290,10 +426,9 @@ class UniqueSolarProjectProduct(models.Model):
         self.line_total = self.quantity * self.unit_price
         super().save(*args, **kwargs)
 
-        # Update parent project totals automatically
-        project = self.project
-        project.calculate_totals()
-        project.save(update_fields=['subtotal', 'grand_total', 'total_payment', 'completion_payment'])
+        # Update parent project totals automatically; use
+        # UniqueSolarProject.add_products when creating several lines
+        self.project.update_totals()
     
     class Meta:
         ordering = ['order']
@@ -308,6 +443,7 @@ class UniqueSolarProjectImage(models.Model):
     )
     image = models.ImageField(
         upload_to='unique_solar_projects/',
+        storage=blob_storage,
         help_text="Project image or receipt"
     )
     order = models.PositiveIntegerField(
@@ -316,6 +452,7 @@ class UniqueSolarProjectImage(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.project.project_id} - Image {self.order}"
@@ -340,6 +477,7 @@ class UniqueSolarChecklist(models.Model):
     item_name = models.CharField(max_length=100)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.item_name}"
@@ -360,6 +498,7 @@ class UniqueSolarProjectChecklist(models.Model):
         related_name='projects'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
 
     def __str__(self):
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from Media.serializers import ImageVariantsField
 from .models import (
     ZarorratService,
     ZarorratProject,
@@ -41,6 +42,7 @@ class ZarorratProjectSerializer(serializers.ModelSerializer):
 
     def get_services(self, obj):
         """Return services in frontend-friendly format"""
+        # Reuses the selected_services__service prefetch done by the views
         return [
             {
                 "id": service.service.id,
@@ -127,6 +129,8 @@ class UniqueSolarProjectChecklistSerializer(serializers.ModelSerializer):
 
 
 class UniqueSolarProjectImageSerializer(serializers.ModelSerializer):
+    variants = ImageVariantsField(source="image")
+
     class Meta:
         model = UniqueSolarProjectImage
         fields = "__all__"
@@ -153,6 +157,15 @@ class UniqueSolarProjectProductSerializer(serializers.ModelSerializer):
         read_only_fields = ["created_at"]
 
 
+class UniqueSolarProjectProductLineSerializer(serializers.ModelSerializer):
+    """Validates one product line of a project being written in bulk"""
+
+    class Meta:
+        model = UniqueSolarProjectProduct
+        exclude = ["project"]
+        read_only_fields = ["line_total", "created_at"]
+
+
 class UniqueSolarProjectSerializer(serializers.ModelSerializer):
     images = UniqueSolarProjectImageSerializer(many=True, read_only=True)
     products = UniqueSolarProjectProductSerializer(many=True, read_only=True)
@@ -179,7 +192,8 @@ class UniqueSolarProjectSerializer(serializers.ModelSerializer):
 
     def get_image_count(self, obj):
         """Return the number of images for this project"""
-        return obj.images.count()
+        # len() of all() reuses prefetched images instead of issuing a COUNT
+        return len(obj.images.all())
 
     # ✅ ADD THIS METHOD - Transform checklist to frontend format
     def get_checklist(self, obj):
@@ -196,3 +210,37 @@ class UniqueSolarProjectSerializer(serializers.ModelSerializer):
         except Exception as e:
             print(f"Checklist error: {e}")
         return checklist_data
+
+
+class ZarorratProjectImportSerializer(serializers.ModelSerializer):
+    """Validates one imported Zarorrat project row (project IDs are allocated on import)"""
+    service_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False
+    )
+
+    class Meta:
+        model = ZarorratProject
+        exclude = ["project_id"]
+
+    def validate_service_ids(self, value):
+        # Known service ids are loaded once per import and passed in the context
+        unknown = [service_id for service_id in value if service_id not in self.context["service_ids"]]
+        if unknown:
+            raise serializers.ValidationError(f"Unknown service IDs: {unknown}")
+        return list(dict.fromkeys(value))
+
+
+class UniqueSolarProjectImportSerializer(serializers.ModelSerializer):
+    """Validates one imported Unique Solar project row with its product lines"""
+    products = UniqueSolarProjectProductLineSerializer(many=True, required=False)
+
+    class Meta:
+        model = UniqueSolarProject
+        exclude = ["project_id"] + UniqueSolarProject.TOTAL_FIELDS
+
+    def validate_products(self, value):
+        # Lines without an order keep their position in the row
+        orders = [product.setdefault("order", position) for position, product in enumerate(value)]
+        if len(orders) != len(set(orders)):
+            raise serializers.ValidationError("Each product must have a unique order.")
+        return value
@@ -1,10 +1,35 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
-from .models import UniqueSolarProject, UniqueSolarProjectImage
+from rest_framework.test import APIClient
+from .models import (
+    ZarorratService,
+    ZarorratProject,
+    ZarorratProjectService,
+    UniqueSolarProject,
+    UniqueSolarProjectImage,
+    UniqueSolarProjectProduct,
+    UniqueSolarChecklist,
+    UniqueSolarProjectChecklist,
+    allocate_project_ids,
+)
+from .cache import active_checklist
+from .importers import import_projects
+from Dashboard.rollups import check_rollups
 from decimal import Decimal
 from django.utils import timezone
 from datetime import timedelta
+import io
+import json
+import shutil
+import tempfile
+import csv
 
 # Create your tests here.
 
@@ -92,3 +117,527 @@ class UniqueSolarProjectImageTestCase(TestCase):
                 image=self.test_image,
                 order=0  # Same order as first image
             )
+
+
+class UniqueSolarProjectListQueryTestCase(TestCase):
+    def setUp(self):
+        """Create projects with products, images and checklist items in a throwaway MEDIA_ROOT"""
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        checklist = UniqueSolarChecklist.objects.create(item_name='Site Survey')
+        for index in range(15):
+            project = UniqueSolarProject.objects.create(
+                customer_name=f'Customer {index}',
+                address='Test Address',
+                valid_until=timezone.now().date() + timedelta(days=30),
+            )
+            UniqueSolarProjectProduct.objects.create(
+                project=project, product_type='solar_panel', quantity=2, unit_price=Decimal('100.00')
+            )
+            UniqueSolarProjectImage.objects.create(
+                project=project,
+                image=SimpleUploadedFile("test_image.jpg", b"fake image content", content_type="image/jpeg")
+            )
+            UniqueSolarProjectChecklist.objects.create(project=project, checklist=checklist)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_list_query_count_does_not_grow_with_page_size(self):
+        """Test that a page costs a constant number of queries"""
+        url = reverse('unique-solar-project-list')
+        # ETag fingerprint, count, page, images, products, checklist
+        with self.assertNumQueries(6):
+            response = self.client.get(url, {'page_size': 15})
+
+        self.assertEqual(response.data['count'], 15)
+        project = response.data['results'][0]
+        self.assertEqual(project['image_count'], 1)
+        self.assertEqual(project['checklist'], {'site_survey': True})
+        self.assertEqual(len(project['products']), 1)
+
+    def test_cursor_pagination(self):
+        """Test that cursor pagination walks every project exactly once"""
+        url = reverse('unique-solar-project-list')
+        response = self.client.get(url, {'pagination': 'cursor', 'page_size': 10})
+        seen = [project['project_id'] for project in response.data['results']]
+
+        response = self.client.get(response.data['next'])
+        seen += [project['project_id'] for project in response.data['results']]
+
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(len(set(seen)), 15)
+
+    def test_in_place_edits_change_the_etag(self):
+        """Test that renaming a checklist item or editing a product line is not answered with 304"""
+        url = reverse('unique-solar-project-list')
+        etag = self.client.get(url)['ETag']
+
+        checklist = UniqueSolarChecklist.objects.get()
+        checklist.item_name = 'Site Visit'
+        checklist.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        etag = response['ETag']
+
+        project = UniqueSolarProject.objects.first()
+        project.sync_products([
+            {'product_type': 'solar_panel', 'quantity': 2, 'unit_price': Decimal('120.00'), 'order': 0}
+        ])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class ZarorratProjectListQueryTestCase(TestCase):
+    def setUp(self):
+        """Create 100 projects with two services each"""
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        services = [
+            ZarorratService.objects.create(name='Cleaning'),
+            ZarorratService.objects.create(name='Repair'),
+        ]
+        for index in range(100):
+            project = ZarorratProject.objects.create(
+                customer_name=f'Customer {index}',
+                address='Test Address',
+                valid_until=timezone.now().date() + timedelta(days=30),
+                amount=Decimal('100.00'),
+            )
+            for service in services:
+                ZarorratProjectService.objects.create(project=project, service=service)
+
+    def test_page_of_100_projects_uses_constant_queries(self):
+        """Test that services are rendered from a single prefetch"""
+        url = reverse('zarorrat-project-list')
+        # ETag fingerprint, count, page, selected_services joined with service
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {'page_size': 100})
+
+        project = response.data['results'][0]
+        self.assertEqual(len(response.data['results']), 100)
+        self.assertEqual(
+            [service['service_name'] for service in project['selected_services']],
+            ['Cleaning', 'Repair']
+        )
+        self.assertEqual([service['name'] for service in project['services']], ['Cleaning', 'Repair'])
+
+    def test_detail_uses_prefetch(self):
+        """Test that the detail view renders services without per-row lookups"""
+        project = ZarorratProject.objects.first()
+        url = reverse('zarorrat-project-detail', args=[project.project_id])
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['services']), 2)
+
+
+class ProjectIdAllocationTestCase(TestCase):
+    def test_counter_continues_after_existing_ids(self):
+        """Test that the counter is seeded once from IDs created before it existed"""
+        year = timezone.now().year
+        ZarorratProject.objects.create(
+            project_id=f'ZR-{year}-0041',
+            customer_name='Legacy',
+            address='Test Address',
+            valid_until=timezone.now().date(),
+        )
+
+        project = ZarorratProject.objects.create(
+            customer_name='New', address='Test Address', valid_until=timezone.now().date()
+        )
+        self.assertEqual(project.project_id, f'ZR-{year}-0042')
+
+        # Savepoint, counter lookup, increment, read back, release;
+        # no scan of the project table
+        with self.assertNumQueries(5):
+            self.assertEqual(allocate_project_ids(ZarorratProject, 'ZR'), [f'ZR-{year}-0043'])
+
+    def test_block_allocation_is_consecutive_per_prefix(self):
+        """Test that blocks do not overlap and prefixes count independently"""
+        year = timezone.now().year
+        self.assertEqual(
+            allocate_project_ids(UniqueSolarProject, 'US', count=3),
+            [f'US-{year}-0001', f'US-{year}-0002', f'US-{year}-0003']
+        )
+        self.assertEqual(allocate_project_ids(UniqueSolarProject, 'US'), [f'US-{year}-0004'])
+        self.assertEqual(allocate_project_ids(ZarorratProject, 'ZR'), [f'ZR-{year}-0001'])
+
+
+class UniqueSolarProjectProductBulkTestCase(TestCase):
+    def setUp(self):
+        """Set up an authenticated client and a project"""
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = UniqueSolarProject.objects.create(
+            customer_name='Test Customer',
+            address='Test Address',
+            valid_until=timezone.now().date() + timedelta(days=30),
+            installation_amount=Decimal('100.00'),
+            tax_percentage=Decimal('10.00'),
+        )
+
+    def lines(self, count):
+        return [
+            {'product_type': 'solar_panel', 'quantity': 2, 'unit_price': Decimal('50.00'), 'order': index}
+            for index in range(count)
+        ]
+
+    def test_add_products_query_count_does_not_grow_with_lines(self):
+        """Test that 30 lines cost the same queries as 2"""
+        other = UniqueSolarProject.objects.create(
+            customer_name='Other', address='Test Address', valid_until=timezone.now().date()
+        )
+        with CaptureQueriesContext(connection) as small:
+            other.add_products(self.lines(2))
+        with CaptureQueriesContext(connection) as large:
+            self.project.add_products(self.lines(30))
+
+        self.assertEqual(len(large), len(small))
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.subtotal, Decimal('3000.00'))
+        self.assertEqual(self.project.grand_total, Decimal('3410.00'))
+        self.assertEqual(self.project.products.first().line_total, Decimal('100.00'))
+
+    def test_create_view_totals_products_once(self):
+        """Test that the create endpoint stores products and totals"""
+        response = self.client.post(
+            reverse('unique-solar-project-create'),
+            {
+                'customer_name': 'API Customer',
+                'address': 'Test Address',
+                'date': str(timezone.now().date()),
+                'valid_until': str(timezone.now().date()),
+                'tax_percentage': '10.00',
+                'products': json.dumps([
+                    {'product_type': 'inverter', 'quantity': 1, 'unit_price': '500.00', 'order': 0},
+                    {'product_type': 'battery', 'quantity': 2, 'unit_price': '250.00', 'order': 1},
+                ]),
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['products']), 2)
+        self.assertEqual(Decimal(response.data['grand_total']), Decimal('1100.00'))
+
+    def test_create_view_rejects_repeated_order(self):
+        """Test that repeated product orders are reported instead of failing on insert"""
+        response = self.client.post(
+            reverse('unique-solar-project-create'),
+            {
+                'customer_name': 'API Customer',
+                'address': 'Test Address',
+                'valid_until': str(timezone.now().date()),
+                'products': json.dumps([
+                    {'product_type': 'inverter', 'quantity': 1, 'unit_price': '500.00', 'order': 0},
+                    {'product_type': 'battery', 'quantity': 1, 'unit_price': '250.00', 'order': 0},
+                ]),
+            },
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(UniqueSolarProject.objects.filter(customer_name='API Customer').exists())
+
+
+class UniqueSolarProjectDiffUpdateTestCase(TestCase):
+    def setUp(self):
+        """Set up a project with three products and two checklist items"""
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.survey = UniqueSolarChecklist.objects.create(item_name='Site Survey')
+        self.wiring = UniqueSolarChecklist.objects.create(item_name='Wiring')
+        self.permit = UniqueSolarChecklist.objects.create(item_name='Permit')
+        self.project = UniqueSolarProject.objects.create(
+            customer_name='Test Customer',
+            address='Test Address',
+            valid_until=timezone.now().date() + timedelta(days=30),
+        )
+        self.products = [
+            {'product_type': 'solar_panel', 'quantity': 2, 'unit_price': '100.00', 'order': 0},
+            {'product_type': 'inverter', 'quantity': 1, 'unit_price': '500.00', 'order': 1},
+            {'product_type': 'battery', 'quantity': 1, 'unit_price': '300.00', 'order': 2},
+        ]
+        self.project.add_products([
+            {**product, 'unit_price': Decimal(product['unit_price'])} for product in self.products
+        ])
+        self.project.sync_checklist([self.survey.id, self.wiring.id])
+        self.url = reverse('unique-solar-project-detail', args=[self.project.project_id])
+
+    def put(self, **changes):
+        data = {
+            'customer_name': 'Test Customer',
+            'products': self.products,
+            'checklist_ids': [self.survey.id, self.wiring.id],
+        }
+        data.update(changes)
+        return self.client.put(self.url, data, format='json')
+
+    def test_unchanged_lines_are_not_rewritten(self):
+        """Test that editing only the customer keeps every product and checklist row"""
+        product_ids = list(self.project.products.values_list('id', flat=True))
+        checklist_ids = list(self.project.checklist.values_list('id', flat=True))
+
+        response = self.put(customer_name='Renamed Customer')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(self.project.products.values_list('id', flat=True)), product_ids)
+        self.assertEqual(list(self.project.checklist.values_list('id', flat=True)), checklist_ids)
+        self.assertEqual(Decimal(response.data['grand_total']), Decimal('1000.00'))
+
+    def test_only_changed_rows_are_written(self):
+        """Test inserts, updates and deletes are applied per row"""
+        kept = self.project.products.get(order=0)
+        changed = self.project.products.get(order=1)
+        products = [
+            self.products[0],
+            {**self.products[1], 'quantity': 2},
+            {'product_type': 'structure', 'quantity': 1, 'unit_price': '50.00', 'order': 3},
+        ]
+
+        response = self.put(products=products, checklist_ids=[self.wiring.id, self.permit.id])
+
+        self.assertEqual(response.status_code, 200)
+        lines = {line.order: line for line in self.project.products.all()}
+        self.assertEqual(sorted(lines), [0, 1, 3])
+        self.assertEqual(lines[0].id, kept.id)
+        self.assertEqual(lines[1].id, changed.id)
+        self.assertEqual(lines[1].line_total, Decimal('1000.00'))
+        self.assertEqual(
+            set(self.project.checklist.values_list('checklist_id', flat=True)),
+            {self.wiring.id, self.permit.id}
+        )
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.subtotal, Decimal('1250.00'))
+
+    def test_lines_without_order_keep_their_position(self):
+        """Test that lines sent without an order are not collapsed into one"""
+        products = [{key: value for key, value in product.items() if key != 'order'} for product in self.products]
+
+        response = self.put(products=products)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(self.project.products.values_list('order', 'product_type')),
+            [(0, 'solar_panel'), (1, 'inverter'), (2, 'battery')]
+        )
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.subtotal, Decimal('1000.00'))
+
+    def test_sync_products_without_changes_writes_nothing(self):
+        """Test that an identical product list costs a single read"""
+        lines = [{**product, 'unit_price': Decimal(product['unit_price'])} for product in self.products]
+        with self.assertNumQueries(1):
+            self.assertEqual(self.project.sync_products(lines), (0, 0, 0))
+
+
+class ChecklistLinkingTestCase(TestCase):
+    def setUp(self):
+        """Set up an authenticated client and a checklist catalog"""
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.items = [
+            UniqueSolarChecklist.objects.create(item_name=f'Item {index}') for index in range(5)
+        ]
+        self.inactive = UniqueSolarChecklist.objects.create(item_name='Retired', is_active=False)
+
+    def create(self, checklist_ids):
+        return self.client.post(
+            reverse('unique-solar-project-create'),
+            {
+                'customer_name': 'API Customer',
+                'address': 'Test Address',
+                'date': str(timezone.now().date()),
+                'valid_until': str(timezone.now().date()),
+                'checklist_ids': json.dumps(checklist_ids),
+            },
+        )
+
+    def test_catalog_is_cached_until_an_item_changes(self):
+        """Test that the active catalog is read once and refreshed after an edit"""
+        self.assertEqual(len(active_checklist()), 5)
+        with self.assertNumQueries(0):
+            active_checklist()
+
+        self.inactive.is_active = True
+        self.inactive.save()
+        self.assertIn(self.inactive.id, active_checklist())
+
+    def test_create_links_checklist_in_one_insert(self):
+        """Test that ids are validated with one query and linked in one insert"""
+        active_checklist()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.create([item.id for item in self.items] + [self.items[0].id])
+
+        self.assertEqual(response.status_code, 201)
+        statements = [query['sql'] for query in queries.captured_queries]
+        inserts = [sql for sql in statements if 'INTO "Project_uniquesolarprojectchecklist"' in sql]
+        self.assertEqual(len(inserts), 1)
+        # One confirming lookup for all ids; the catalog was already cached
+        self.assertEqual(len([sql for sql in statements if sql.startswith('SELECT "Project_uniquesolarchecklist"')]), 1)
+        project = UniqueSolarProject.objects.get(project_id=response.data['project_id'])
+        self.assertEqual(project.checklist.count(), 5)
+
+    def test_create_reports_invalid_ids(self):
+        """Test that unknown and inactive ids are rejected and nothing is created"""
+        response = self.create([self.items[0].id, self.inactive.id, 9999])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str([self.inactive.id, 9999]), response.data['error'])
+        self.assertFalse(UniqueSolarProject.objects.filter(customer_name='API Customer').exists())
+
+    def test_stale_cached_catalog_is_not_trusted(self):
+        """Test that an item removed behind the cache's back is reported, not linked"""
+        active_checklist()
+        # Another worker's change: this process' cached catalog is not cleared
+        UniqueSolarChecklist.objects.filter(pk__in=[self.items[0].pk, self.items[1].pk]).update(is_active=False)
+
+        response = self.create([item.id for item in self.items])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str([self.items[0].id, self.items[1].id]), response.data['error'])
+        self.assertFalse(UniqueSolarProject.objects.filter(customer_name='API Customer').exists())
+        self.assertNotIn(self.items[0].id, active_checklist())
+
+
+class ProjectImportTestCase(TestCase):
+    def setUp(self):
+        """Set up an authenticated client and two services"""
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.cleaning = ZarorratService.objects.create(name='Cleaning')
+        self.repair = ZarorratService.objects.create(name='Repair')
+        self.year = timezone.now().year
+
+    def unique_solar_csv(self, count):
+        lines = ['customer_name,address,date,valid_until,tax_percentage,products']
+        products = json.dumps([
+            {'product_type': 'solar_panel', 'quantity': 2, 'unit_price': '100.00', 'order': 0},
+            {'product_type': 'inverter', 'quantity': 1, 'unit_price': '300.00', 'order': 1},
+        ]).replace('"', '""')
+        for index in range(count):
+            lines.append(f'Customer {index},Address,2025-03-0{index % 2 + 1},2025-04-01,10,"{products}"')
+        return '\n'.join(lines).encode()
+
+    def test_csv_import_in_chunks(self):
+        """Test that projects, product lines and totals are written in bulk"""
+        stream = io.BytesIO(self.unique_solar_csv(25))
+        result = import_projects(stream, 'unique_solar', 'csv', chunk_size=10)
+
+        self.assertEqual(result, {'created': 25, 'failed': 0, 'errors': []})
+        self.assertEqual(UniqueSolarProjectProduct.objects.count(), 50)
+        project = UniqueSolarProject.objects.get(project_id=f'US-{self.year}-0025')
+        self.assertEqual(project.subtotal, Decimal('500.00'))
+        self.assertEqual(project.grand_total, Decimal('550.00'))
+        self.assertEqual(check_rollups(), [])
+
+    def test_invalid_rows_are_reported(self):
+        """Test that bad rows are skipped with their line numbers"""
+        rows = [
+            {'customer_name': 'Good', 'address': 'A', 'valid_until': '2025-04-01',
+             'amount': '100.00', 'service_ids': [self.cleaning.id, self.repair.id]},
+            {'customer_name': 'No address', 'valid_until': '2025-04-01'},
+            'not json',
+            {'customer_name': 'Bad service', 'address': 'A', 'valid_until': '2025-04-01',
+             'amount': '100.00', 'service_ids': [9999]},
+        ]
+        content = '\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows)
+        result = import_projects(io.BytesIO(content.encode()), 'zarorrat', 'jsonl')
+
+        self.assertEqual(result['created'], 1)
+        self.assertEqual([error['row'] for error in result['errors']], [2, 3, 4])
+        self.assertIn('address', result['errors'][0]['errors'])
+        self.assertIn('service_ids', result['errors'][2]['errors'])
+        project = ZarorratProject.objects.get()
+        self.assertEqual(project.project_id, f'ZR-{self.year}-0001')
+        self.assertEqual(project.selected_services.count(), 2)
+
+    def test_unreadable_file_keeps_the_imported_chunks(self):
+        """Test that a decode error late in the file reports the rows already created"""
+        content = self.unique_solar_csv(200) + b'\nCustomer \xff,Address,2025-03-01,2025-04-01,10,[]'
+        upload = SimpleUploadedFile('quotes.csv', content, content_type='text/csv')
+        response = self.client.post(
+            reverse('project-import'), {'file': upload, 'kind': 'unique_solar'}, format='multipart'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        created = response.data['created']
+        self.assertGreater(created, 0)
+        self.assertEqual(UniqueSolarProject.objects.count(), created)
+        # Line 1 is the header
+        self.assertEqual([error['row'] for error in response.data['errors']], [created + 2])
+        self.assertIn('Could not read the rest of the file', response.data['errors'][0]['errors'])
+
+    def test_import_endpoint(self):
+        """Test that the endpoint imports an uploaded file"""
+        upload = SimpleUploadedFile('quotes.csv', self.unique_solar_csv(3), content_type='text/csv')
+        response = self.client.post(
+            reverse('project-import'), {'file': upload, 'kind': 'unique_solar'}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 3)
+
+        response = self.client.post(
+            reverse('project-import'), {'file': upload, 'kind': 'other'}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_import_command(self):
+        """Test the import_projects management command"""
+        with tempfile.NamedTemporaryFile(suffix='.csv') as handle:
+            handle.write(self.unique_solar_csv(4))
+            handle.flush()
+            output = io.StringIO()
+            call_command('import_projects', handle.name, kind='unique_solar', stdout=output)
+
+        self.assertIn('Imported 4 projects, 0 rows failed', output.getvalue())
+        self.assertEqual(UniqueSolarProject.objects.count(), 4)
+
+
+class UniqueSolarProjectExportTestCase(TestCase):
+    def setUp(self):
+        """Set up an authenticated client and projects with and without lines"""
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for index, status in enumerate(['pending', 'complete', 'complete']):
+            project = UniqueSolarProject.objects.create(
+                customer_name=f'Customer {index}',
+                address='Test Address',
+                valid_until=timezone.now().date(),
+                status=status,
+            )
+            if index:
+                project.add_products([
+                    {'product_type': 'solar_panel', 'quantity': 2, 'unit_price': Decimal('100.00'), 'order': 0},
+                    {'product_type': 'inverter', 'quantity': 1, 'unit_price': Decimal('300.00'), 'order': 1},
+                ])
+
+    def export(self, **params):
+        response = self.client.get(reverse('unique-solar-project-export'), params)
+        self.assertTrue(response.streaming)
+        return list(csv.DictReader(b''.join(response.streaming_content).decode('utf-8-sig').splitlines()))
+
+    def test_lines_are_flattened(self):
+        """Test one row per product line and one row for a project without lines"""
+        rows = self.export()
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['customer_name'], 'Customer 0')
+        self.assertEqual(rows[0]['line_product_type'], '')
+        self.assertEqual([row['line_line_total'] for row in rows[1:3]], ['200.00', '300.00'])
+
+    def test_list_filters_apply(self):
+        """Test that the list view filters limit the export"""
+        rows = self.export(status='pending')
+        self.assertEqual([row['customer_name'] for row in rows], ['Customer 0'])
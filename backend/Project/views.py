@@ -1,27 +1,34 @@
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
+from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework import serializers
 from django.shortcuts import get_object_or_404
 from django.db import transaction
+from django.db.models import Prefetch
 import json
 from .models import (
     ZarorratService,
     ZarorratProject,
+    ZarorratProjectService,
     UniqueSolarProject,
     UniqueSolarChecklist,
     UniqueSolarProjectProduct,
     UniqueSolarProjectImage,
     UniqueSolarProjectChecklist,
 )
+from backend.conditional import conditional_get
+from backend.exports import EXPORT_CHUNK_SIZE, csv_response, filter_year
+from .cache import split_checklist_ids
+from .importers import FORMATS, IMPORTERS, import_projects
 from .serializers import (
     ZarorratServiceSerializer,
     ZarorratProjectSerializer,
     ZarorratProjectServiceSerializer,
     UniqueSolarProjectSerializer,
     UniqueSolarChecklistSerializer,
-    UniqueSolarProjectProductSerializer,
+    UniqueSolarProjectProductLineSerializer,
     UniqueSolarProjectImageSerializer,
 )
 
@@ -32,6 +39,91 @@ class ZarorratProjectPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class UniqueSolarProjectPagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class UniqueSolarProjectCursorPagination(CursorPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+
+def zarorrat_project_queryset():
+    """Zarorrat projects with their selected services (and service names) prefetched"""
+    return ZarorratProject.objects.prefetch_related(
+        Prefetch(
+            "selected_services",
+            queryset=ZarorratProjectService.objects.select_related("service"),
+        ),
+    )
+
+
+def unique_solar_project_queryset():
+    """Unique Solar projects with everything UniqueSolarProjectSerializer renders prefetched"""
+    return UniqueSolarProject.objects.prefetch_related(
+        "images",
+        "products",
+        Prefetch(
+            "checklist",
+            queryset=UniqueSolarProjectChecklist.objects.select_related("checklist"),
+        ),
+    )
+
+
+def validate_product_lines(products_data, skip_invalid=False):
+    """
+    Validate product line dicts without touching the database.
+    Lines without an order get their position in the list. Invalid lines
+    (and repeated orders) raise a ValidationError, or are dropped when
+    skip_invalid is set.
+    """
+    lines = []
+    orders = set()
+    for position, product_data in enumerate(products_data):
+        if not isinstance(product_data, dict):
+            continue
+        product_serializer = UniqueSolarProjectProductLineSerializer(data=product_data)
+        if product_serializer.is_valid():
+            errors = None
+            if product_serializer.validated_data.setdefault("order", position) in orders:
+                errors = {"order": ["Each product must have a unique order."]}
+        else:
+            errors = product_serializer.errors
+
+        if errors:
+            if skip_invalid:
+                continue
+            raise serializers.ValidationError(f"Product validation error: {errors}")
+
+        orders.add(product_serializer.validated_data["order"])
+        lines.append(product_serializer.validated_data)
+    return lines
+
+
+def filter_zarorrat_projects(queryset, params):
+    """Apply the query parameter filters of the Zarorrat project list"""
+    status_filter = params.get("status", None)
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+    return queryset
+
+
+def filter_unique_solar_projects(queryset, params):
+    """Apply the query parameter filters of the Unique Solar project list"""
+    status_filter = params.get("status", None)
+    installation_type = params.get("installation_type", None)
+
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+    if installation_type:
+        queryset = queryset.filter(installation_type=installation_type)
+    return queryset
+
+
 # Zarorrat Service views
 class ZarorratServiceListView(APIView):
     """
@@ -73,11 +165,9 @@ class ZarorratProjectListView(APIView):
 
     pagination_class = ZarorratProjectPagination
 
+    @conditional_get(ZarorratProject, ZarorratProjectService, ZarorratService)
     def get(self, request):
-        queryset = ZarorratProject.objects.all()
-        status_filter = request.query_params.get("status", None)
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
+        queryset = filter_zarorrat_projects(zarorrat_project_queryset(), request.query_params)
 
         # Apply pagination
         paginator = self.pagination_class()
@@ -118,7 +208,7 @@ class ZarorratProjectDetailView(APIView):
     """
 
     def get(self, request, project_id):
-        project = get_object_or_404(ZarorratProject, project_id=project_id)
+        project = get_object_or_404(zarorrat_project_queryset(), project_id=project_id)
         serializer = ZarorratProjectSerializer(project)
         return Response(serializer.data)
 
@@ -165,23 +255,39 @@ class UniqueSolarProjectListView(APIView):
     Query Parameters:
     - status: Filter projects by status (e.g., 'planning', 'installation', 'completed')
     - installation_type: Filter by installation type (e.g., 'residential', 'commercial')
+    - page: Page number for pagination (default: 1)
+    - page_size: Number of items per page (default: 10, max: 100)
+    - cursor / pagination=cursor: Use cursor pagination instead of page numbers,
+      which stays fast on deep pages
+
+    Images, products and checklist items are prefetched, so a page costs a
+    fixed number of queries regardless of its size.
 
     Unique solar projects are comprehensive solar energy installations
     that include products, images, and checklist items.
     """
 
+    @conditional_get(
+        UniqueSolarProject,
+        UniqueSolarProjectProduct,
+        UniqueSolarProjectImage,
+        UniqueSolarProjectChecklist,
+        UniqueSolarChecklist,
+    )
     def get(self, request):
-        queryset = UniqueSolarProject.objects.all()
-        status_filter = request.query_params.get("status", None)
-        installation_type = request.query_params.get("installation_type", None)
+        queryset = filter_unique_solar_projects(
+            unique_solar_project_queryset(), request.query_params
+        )
 
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        if installation_type:
-            queryset = queryset.filter(installation_type=installation_type)
+        # Apply pagination
+        if "cursor" in request.query_params or request.query_params.get("pagination") == "cursor":
+            paginator = UniqueSolarProjectCursorPagination()
+        else:
+            paginator = UniqueSolarProjectPagination()
+        paginated_queryset = paginator.paginate_queryset(queryset, request)
 
-        serializer = UniqueSolarProjectSerializer(queryset, many=True)
-        return Response(serializer.data)
+        serializer = UniqueSolarProjectSerializer(paginated_queryset, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 
 class UniqueSolarProjectCreateView(APIView):
@@ -326,17 +432,8 @@ class UniqueSolarProjectCreateView(APIView):
 
                 project = serializer.save()
 
-                # Create products
-                for product_data in products_data:
-                    product_data["project"] = project.id
-                    product_serializer = UniqueSolarProjectProductSerializer(
-                        data=product_data
-                    )
-                    if not product_serializer.is_valid():
-                        raise serializers.ValidationError(
-                            f"Product validation error: {product_serializer.errors}"
-                        )
-                    product_serializer.save()
+                # Create products in one insert, then total them once
+                project.add_products(validate_product_lines(products_data))
 
                 # Create images
                 for image_data in images_data:
@@ -351,21 +448,23 @@ class UniqueSolarProjectCreateView(APIView):
                     image_serializer.save()
 
                 # Create checklist items
-                for checklist_id in checklist_ids:
-                    try:
-                        checklist = UniqueSolarChecklist.objects.get(
-                            id=checklist_id, is_active=True
-                        )
-                        UniqueSolarProjectChecklist.objects.create(
-                            project=project, checklist=checklist
-                        )
-                    except UniqueSolarChecklist.DoesNotExist:
-                        raise serializers.ValidationError(
-                            f"Checklist item with ID {checklist_id} not found or inactive"
-                        )
+                checklist_ids, invalid_ids = split_checklist_ids(checklist_ids)
+                if invalid_ids:
+                    raise serializers.ValidationError(
+                        f"Checklist items with IDs {invalid_ids} not found or inactive"
+                    )
+                UniqueSolarProjectChecklist.objects.bulk_create(
+                    [
+                        UniqueSolarProjectChecklist(project=project, checklist_id=checklist_id)
+                        for checklist_id in checklist_ids
+                    ],
+                    ignore_conflicts=True,
+                )
 
                 # Return the complete project data
-                complete_serializer = UniqueSolarProjectSerializer(project)
+                complete_serializer = UniqueSolarProjectSerializer(
+                    unique_solar_project_queryset().get(pk=project.pk)
+                )
                 return Response(
                     complete_serializer.data, status=status.HTTP_201_CREATED
                 )
@@ -399,7 +498,7 @@ class UniqueSolarProjectDetailView(APIView):
     """
 
     def get(self, request, project_id):
-        project = get_object_or_404(UniqueSolarProject, project_id=project_id)
+        project = get_object_or_404(unique_solar_project_queryset(), project_id=project_id)
         serializer = UniqueSolarProjectSerializer(project)
         return Response(serializer.data)
 
@@ -486,17 +585,10 @@ class UniqueSolarProjectDetailView(APIView):
 
                 # ✅ UPDATE PRODUCTS
                 if products_data:
-                    # Delete existing products
-                    project.products.all().delete()
-                    # Create new products
-                    for product_data in products_data:
-                        if isinstance(product_data, dict):
-                            product_data["project"] = project.id
-                            product_serializer = UniqueSolarProjectProductSerializer(
-                                data=product_data
-                            )
-                            if product_serializer.is_valid():
-                                product_serializer.save()
+                    # Write only the lines that were added, changed or removed
+                    updated_project.sync_products(
+                        validate_product_lines(products_data, skip_invalid=True)
+                    )
 
                 # ✅ UPDATE IMAGES
                 if images_data:
@@ -510,22 +602,15 @@ class UniqueSolarProjectDetailView(APIView):
 
                 # ✅ UPDATE CHECKLIST (MOST IMPORTANT FIX)
                 if checklist_ids is not None:
-                    # Delete existing checklist items
-                    project.checklist.all().delete()  # Uses related_name='checklist'
-                    # Create new checklist items
-                    for checklist_id in checklist_ids:
-                        try:
-                            checklist_item = UniqueSolarChecklist.objects.get(
-                                id=checklist_id, is_active=True
-                            )
-                            UniqueSolarProjectChecklist.objects.create(
-                                project=project, checklist=checklist_item
-                            )
-                        except UniqueSolarChecklist.DoesNotExist:
-                            continue  # Skip invalid checklist items
+                    # Invalid checklist items are skipped
+                    valid_ids, _ = split_checklist_ids(checklist_ids)
+                    # Link new items and unlink removed ones only
+                    updated_project.sync_checklist(valid_ids)
 
                 # Return updated project with proper checklist data
-                complete_serializer = UniqueSolarProjectSerializer(updated_project)
+                complete_serializer = UniqueSolarProjectSerializer(
+                    unique_solar_project_queryset().get(pk=updated_project.pk)
+                )
                 return Response(complete_serializer.data)
 
         except Exception as e:
@@ -569,3 +654,133 @@ class UniqueSolarChecklistListView(APIView):
             queryset = queryset.filter(project_id=project_id)
         serializer = UniqueSolarChecklistSerializer(queryset, many=True)
         return Response(serializer.data)
+
+
+# Project export views
+class ZarorratProjectExportView(APIView):
+    """
+    Zarorrat Project Export View
+
+    This view handles:
+    - GET: Stream zarorrat projects as CSV, one row per project
+
+    Query Parameters:
+    - status: Same filter as the project list
+    - year: Only export projects dated in this year
+
+    Services are prefetched per chunk of projects, so memory stays flat
+    however many projects are exported.
+    """
+
+    header = [
+        "project_id", "date", "customer_name", "contact_number", "address",
+        "valid_until", "status", "amount", "advance_received", "notes", "services",
+    ]
+
+    def get(self, request):
+        queryset = filter_zarorrat_projects(
+            zarorrat_project_queryset().order_by("date", "id"), request.query_params
+        )
+        try:
+            queryset = filter_year(queryset, request.query_params)
+        except ValueError:
+            return Response({"error": "year must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = (
+            [
+                project.project_id, project.date, project.customer_name,
+                project.contact_number, project.address, project.valid_until,
+                project.status, project.amount, project.advance_received, project.notes,
+                ", ".join(selected.service.name for selected in project.selected_services.all()),
+            ]
+            for project in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        return csv_response("zarorrat_projects.csv", self.header, rows)
+
+
+class UniqueSolarProjectExportView(APIView):
+    """
+    Unique Solar Project Export View
+
+    This view handles:
+    - GET: Stream unique solar projects as CSV with their product lines flattened,
+      one row per line (projects without lines get one row with empty line columns)
+
+    Query Parameters:
+    - status, installation_type: Same filters as the project list
+    - year: Only export projects dated in this year
+    """
+
+    project_columns = [
+        "project_id", "date", "customer_name", "contact_number", "address",
+        "valid_until", "project_type", "installation_type", "installation_amount",
+        "tax_percentage", "subtotal", "grand_total", "advance_payment",
+        "completion_payment", "status",
+    ]
+    line_columns = ["product_type", "specify_product", "quantity", "unit_price", "line_total"]
+
+    def get(self, request):
+        queryset = filter_unique_solar_projects(
+            UniqueSolarProject.objects.prefetch_related("products").order_by("date", "id"),
+            request.query_params,
+        )
+        try:
+            queryset = filter_year(queryset, request.query_params)
+        except ValueError:
+            return Response({"error": "year must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+
+        header = self.project_columns + [f"line_{column}" for column in self.line_columns]
+        return csv_response("unique_solar_projects.csv", header, self.rows(queryset))
+
+    def rows(self, queryset):
+        for project in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            values = [getattr(project, column) for column in self.project_columns]
+            lines = project.products.all()
+            if not lines:
+                yield values + [""] * len(self.line_columns)
+            for line in lines:
+                yield values + [getattr(line, column) for column in self.line_columns]
+
+
+# Project import view
+class ProjectImportView(APIView):
+    """
+    Project Import View
+
+    This view handles:
+    - POST: Import Zarorrat or Unique Solar projects from an uploaded CSV or JSONL file
+
+    Form fields:
+    - file: The CSV or JSONL file (one project per row/line)
+    - kind: 'zarorrat' or 'unique_solar'
+    - format: 'csv' or 'jsonl' (defaults to the file extension)
+
+    Nested services (service_ids) and products are JSON lists, written as
+    JSON text in CSV cells. Valid rows are imported in chunks; invalid rows
+    (and a file that cannot be read to the end) are reported with their line
+    numbers next to the number of projects created.
+    """
+
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        kind = request.data.get("kind")
+        file_format = request.data.get("format") or (
+            upload.name.rsplit(".", 1)[-1].lower() if upload else None
+        )
+
+        if upload is None:
+            return Response({"error": "A file is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if kind not in IMPORTERS:
+            return Response(
+                {"error": f"kind must be one of {list(IMPORTERS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if file_format not in FORMATS:
+            return Response(
+                {"error": f"format must be one of {FORMATS}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(import_projects(upload.file, kind, file_format))
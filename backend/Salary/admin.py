@@ -1,21 +1,42 @@
 from django.contrib import admin
-from .models import Salary, AdvanceHistory
+from .models import Employee, Salary, AdvanceHistory, AdvanceBalance
+
+
+@admin.register(Employee)
+class EmployeeAdmin(admin.ModelAdmin):
+    list_display = ["name", "wage_type", "monthly_salary", "is_active", "created_at"]
+    list_filter = ["wage_type", "is_active"]
+    search_fields = ["name"]
+    readonly_fields = ["created_at", "updated_at"]
 
 
 @admin.register(Salary)
 class SalaryAdmin(admin.ModelAdmin):
     list_display = ["employee", "wage_type", "month", "amount", "status", "date"]
     list_filter = ["wage_type", "status", "month", "date"]
-    search_fields = ["employee"]
+    search_fields = ["employee__name"]
     date_hierarchy = "month"
-    ordering = ["-month", "employee"]
+    ordering = ["-month", "employee__name"]
+    list_select_related = ["employee"]
 
 
 @admin.register(AdvanceHistory)
 class AdvanceHistoryAdmin(admin.ModelAdmin):
     list_display = ["employee", "date", "advance_taken", "purpose", "created_at"]
     list_filter = ["employee", "date", "created_at"]
-    search_fields = ["employee", "purpose"]
+    search_fields = ["employee__name", "purpose"]
     date_hierarchy = "date"
-    ordering = ["-date", "employee"]
+    ordering = ["-date", "employee__name"]
+    list_select_related = ["employee"]
     readonly_fields = ["created_at", "updated_at"]
+
+
+@admin.register(AdvanceBalance)
+class AdvanceBalanceAdmin(admin.ModelAdmin):
+    list_display = ["employee", "month", "opening_balance", "advances", "recovered", "closing_balance"]
+    search_fields = ["employee__name"]
+    date_hierarchy = "month"
+    list_select_related = ["employee"]
+    readonly_fields = [
+        "employee", "month", "opening_balance", "advances", "salary", "recovered", "closing_balance", "updated_at",
+    ]
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SalaryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Salary'
+
+    def ready(self):
+        from .signals import connect_ledger_signals
+        connect_ledger_signals()
@@ -0,0 +1,67 @@
+from django.db import transaction
+from Dashboard.rollups import apply_bulk_create
+from .models import Employee, Salary
+
+
+def employees_for_names(names):
+    """
+    {name key: Employee} for the given names with one lookup query; names
+    seen for the first time become Daily employees in one insert.
+    """
+    wanted = {Employee.key_for(name): Employee.clean_name(name) for name in names}
+    employees = {employee.name_key: employee for employee in Employee.objects.filter(name_key__in=wanted)}
+    missing = [
+        # bulk_create skips save(), so the key is set here
+        Employee(name=name, name_key=key, wage_type="Daily")
+        for key, name in wanted.items() if key not in employees
+    ]
+    Employee.objects.bulk_create(missing)
+    employees.update({employee.name_key: employee for employee in missing})
+    return employees
+
+
+def record_attendance(entries, user=None):
+    """
+    Create a Daily wage row per worker and day worked, like DailyWageView.post
+    but for many workers and days at once. entries is a list of
+    {'employee': name, 'dates': [date, ...], 'description': text}.
+    Days already recorded for a worker are skipped, so resubmitting a sheet
+    does not count a day twice.
+    Returns {'created': [Salary], 'skipped': count}.
+    """
+    with transaction.atomic():
+        employees = employees_for_names(entry["employee"] for entry in entries)
+        days = {}
+        for entry in entries:
+            employee = employees[Employee.key_for(entry["employee"])]
+            for day in entry["dates"]:
+                days[(employee.id, day)] = (employee, entry.get("description"))
+
+        recorded = set(
+            Salary.objects.filter(
+                wage_type="Daily",
+                employee__in={employee_id for employee_id, _ in days},
+                date__in={day for _, day in days},
+            ).values_list("employee_id", "date")
+        )
+
+        salaries = [
+            Salary(
+                wage_type="Daily",
+                employee=employee,
+                date=day,
+                month=day,
+                amount=0,
+                total_paid=0,
+                salary_amount=0,
+                description=description,
+                updated_by=user,
+            )
+            for (employee_id, day), (employee, description) in sorted(days.items())
+            if (employee_id, day) not in recorded
+        ]
+        Salary.objects.bulk_create(salaries)
+        # bulk_create sends no signals; Daily wages are not part of the advance ledger
+        apply_bulk_create(Salary, salaries)
+
+    return {"created": salaries, "skipped": len(days) - len(salaries)}
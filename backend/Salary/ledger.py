@@ -0,0 +1,204 @@
+"""
+Advance ledger: per-employee, per-month advance balances (AdvanceBalance).
+
+Each month's advances are recovered from that month's Monthly salaries, up to
+the salary; what is left is carried into the next month:
+
+    recovered = min(opening_balance + advances, salary)
+    closing_balance = opening_balance + advances - recovered
+
+Advance and salary writes refresh the touched months and roll the balances of
+that employee's later months forward (see signals.py); rebuild_balances()
+recomputes the whole table from the history.
+"""
+import heapq
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from itertools import groupby
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from .models import AdvanceBalance, AdvanceHistory, Salary
+
+BALANCE_FIELDS = ['opening_balance', 'advances', 'salary', 'recovered', 'closing_balance']
+REBUILD_CHUNK_SIZE = 2000
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(day):
+    return day.replace(year=day.year + day.month // 12, month=day.month % 12 + 1, day=1)
+
+
+def ledger_key(instance):
+    """(employee id, month) of the ledger row an advance or salary counts towards, or None"""
+    if isinstance(instance, AdvanceHistory):
+        return (instance.employee_id, month_start(instance.date))
+    if instance.wage_type == 'Monthly':
+        return (instance.employee_id, month_start(instance.month))
+    return None
+
+
+def roll_forward(rows, opening):
+    """Recompute the running balance of consecutive ledger rows starting from `opening`"""
+    for row in rows:
+        row.opening_balance = opening
+        row.recovered = max(min(opening + row.advances, row.salary), Decimal('0'))
+        row.closing_balance = opening + row.advances - row.recovered
+        row.updated_at = timezone.now()
+        opening = row.closing_balance
+    return rows
+
+
+def month_totals(keys):
+    """
+    {(employee id, month): (advances, Monthly salary amount)} for the given
+    keys, with one grouped query per table
+    """
+    employee_ids = {employee_id for employee_id, _ in keys}
+    first = min(month for _, month in keys)
+    after = next_month(max(month for _, month in keys))
+    totals = defaultdict(lambda: [Decimal('0'), Decimal('0')])
+
+    advances = (
+        AdvanceHistory.objects.filter(employee_id__in=employee_ids, date__gte=first, date__lt=after)
+        .order_by().values('employee_id', 'date__year', 'date__month').annotate(total=Sum('advance_taken'))
+    )
+    for row in advances:
+        totals[(row['employee_id'], date(row['date__year'], row['date__month'], 1))][0] = row['total']
+
+    salaries = (
+        Salary.objects.filter(employee_id__in=employee_ids, wage_type='Monthly', month__gte=first, month__lt=after)
+        .order_by().values('employee_id', 'month__year', 'month__month').annotate(total=Sum('amount'))
+    )
+    for row in salaries:
+        totals[(row['employee_id'], date(row['month__year'], row['month__month'], 1))][1] = row['total']
+
+    return {key: tuple(totals[key]) for key in keys}
+
+
+def refresh_balances(keys):
+    """
+    Re-total the given (employee id, month) ledger rows and roll each
+    employee's balance forward from the earliest of them. The number of
+    queries does not depend on the number of keys (payroll runs touch one
+    row per employee).
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    starts = {}
+    for employee_id, month in keys:
+        starts[employee_id] = min(month, starts.get(employee_id, month))
+    totals = month_totals(keys)
+
+    with transaction.atomic():
+        ledger = AdvanceBalance.objects.filter(employee_id__in=starts)
+        rows = defaultdict(dict)
+        for row in ledger.filter(month__gte=min(starts.values())).order_by():
+            if row.month >= starts[row.employee_id]:
+                rows[row.employee_id][row.month] = row
+        # Closing balance of the last month before each employee's first touched month
+        openings = {}
+        for employee_id, month, closing in (
+            ledger.filter(month__lt=max(starts.values())).order_by('month')
+            .values_list('employee_id', 'month', 'closing_balance')
+        ):
+            if month < starts[employee_id]:
+                openings[employee_id] = closing
+
+        touched = defaultdict(dict)
+        for (employee_id, month), month_total in totals.items():
+            touched[employee_id][month] = month_total
+
+        created, updated, removed = [], [], []
+        for employee_id in starts:
+            employee_rows = rows[employee_id]
+            for month, (advances, salary) in touched[employee_id].items():
+                row = employee_rows.get(month)
+                if not (advances or salary):
+                    if row is not None:
+                        removed.append(employee_rows.pop(month).pk)
+                    continue
+                if row is None:
+                    row = employee_rows[month] = AdvanceBalance(employee_id=employee_id, month=month)
+                row.advances, row.salary = advances, salary
+
+            ordered = [employee_rows[month] for month in sorted(employee_rows)]
+            for row in roll_forward(ordered, openings.get(employee_id, Decimal('0'))):
+                (updated if row.pk else created).append(row)
+
+        AdvanceBalance.objects.filter(pk__in=removed).delete()
+        AdvanceBalance.objects.bulk_create(created)
+        AdvanceBalance.objects.bulk_update(updated, BALANCE_FIELDS + ['updated_at'])
+
+
+def opening_balances(employee_ids, month):
+    """{employee id: advance balance carried into `month`}, from each employee's last ledger row before it"""
+    openings = {}
+    for employee_id, closing in (
+        AdvanceBalance.objects.filter(employee_id__in=employee_ids, month__lt=month_start(month))
+        .order_by('month').values_list('employee_id', 'closing_balance')
+    ):
+        openings[employee_id] = closing
+    return openings
+
+
+def balances_for(keys):
+    """{(employee id, month): AdvanceBalance} for the given keys, in one query"""
+    keys = set(keys)
+    if not keys:
+        return {}
+    rows = AdvanceBalance.objects.filter(
+        employee_id__in={employee_id for employee_id, _ in keys},
+        month__in={month for _, month in keys},
+    )
+    return {(row.employee_id, row.month): row for row in rows if (row.employee_id, row.month) in keys}
+
+
+def _stream_history(advance_model, salary_model):
+    """Yield (employee id, month, advance, salary) for every advance and Monthly salary in (employee, date) order"""
+    advances = (
+        (employee_id, month_start(day), amount, Decimal('0'))
+        for employee_id, day, amount in advance_model.objects.order_by('employee_id', 'date', 'id')
+        .values_list('employee_id', 'date', 'advance_taken').iterator(chunk_size=REBUILD_CHUNK_SIZE)
+    )
+    salaries = (
+        (employee_id, month_start(day), Decimal('0'), amount)
+        for employee_id, day, amount in salary_model.objects.filter(wage_type='Monthly').order_by('employee_id', 'month', 'id')
+        .values_list('employee_id', 'month', 'amount').iterator(chunk_size=REBUILD_CHUNK_SIZE)
+    )
+    return heapq.merge(advances, salaries, key=lambda entry: (entry[0], entry[1]))
+
+
+def rebuild_balances(advance_model=AdvanceHistory, salary_model=Salary, balance_model=AdvanceBalance):
+    """
+    Replace the ledger with a recompute that streams the advance and salary
+    history in date order, one employee at a time.
+    The models can be swapped for their historical versions in migrations.
+    Returns the number of ledger rows written.
+    """
+    written = 0
+    with transaction.atomic():
+        balance_model.objects.all().delete()
+        batch = []
+        for employee_id, entries in groupby(_stream_history(advance_model, salary_model), key=lambda entry: entry[0]):
+            rows = []
+            for month, month_entries in groupby(entries, key=lambda entry: entry[1]):
+                row = balance_model(employee_id=employee_id, month=month)
+                for _, _, advance, salary in month_entries:
+                    row.advances += advance
+                    row.salary += salary
+                rows.append(row)
+            batch += roll_forward(rows, Decimal('0'))
+
+            if len(batch) >= REBUILD_CHUNK_SIZE:
+                balance_model.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        balance_model.objects.bulk_create(batch)
+        written += len(batch)
+    return written
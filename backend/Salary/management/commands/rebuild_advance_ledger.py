@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from Salary.ledger import rebuild_balances
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-employee, per-month advance balances from the advance and salary history"
+
+    def handle(self, *args, **options):
+        written = rebuild_balances()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the advance ledger: {written} balance rows"))
@@ -0,0 +1,23 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from Salary.payroll import run_payroll
+
+
+class Command(BaseCommand):
+    help = "Create the Monthly salaries of all active Monthly employees for one month"
+
+    def add_arguments(self, parser):
+        parser.add_argument('month', help="Payroll month as YYYY-MM")
+        parser.add_argument('--date', help="Payment date as YYYY-MM-DD (defaults to the last day of the month)")
+
+    def handle(self, *args, **options):
+        try:
+            month = datetime.strptime(options['month'], '%Y-%m')
+            pay_date = datetime.strptime(options['date'], '%Y-%m-%d').date() if options['date'] else None
+        except ValueError as e:
+            raise CommandError(e)
+
+        result = run_payroll(month.year, month.month, pay_date=pay_date)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(result['created'])} salaries, skipped {result['skipped']} already paid"
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Salary', '0005_advancehistory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salary',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
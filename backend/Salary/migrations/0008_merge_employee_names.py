@@ -0,0 +1,60 @@
+from collections import Counter, defaultdict
+from django.db import migrations, models
+
+
+def clean_name(name):
+    return " ".join(name.split())
+
+
+def link_employees(apps, schema_editor):
+    """
+    Create one Employee per name (ignoring case and repeated whitespace) and
+    point every salary and advance at it. The most used spelling wins.
+    """
+    Employee = apps.get_model('Salary', 'Employee')
+    models = [apps.get_model('Salary', 'Salary'), apps.get_model('Salary', 'AdvanceHistory')]
+
+    spellings = defaultdict(Counter)
+    for model in models:
+        for name in model.objects.values_list('employee', flat=True).iterator():
+            name = clean_name(name)
+            spellings[name.casefold()][name] += 1
+
+    employees = {}
+    for key, names in spellings.items():
+        employees[key] = Employee.objects.create(name=names.most_common(1)[0][0], name_key=key)
+
+    for model in models:
+        for name in model.objects.values_list('employee', flat=True).distinct():
+            employee = employees[clean_name(name).casefold()]
+            model.objects.filter(employee=name).update(employee_ref=employee)
+
+
+def restore_names(apps, schema_editor):
+    for model_name in ['Salary', 'AdvanceHistory']:
+        model = apps.get_model('Salary', model_name)
+        for row in model.objects.select_related('employee_ref'):
+            model.objects.filter(pk=row.pk).update(employee=row.employee_ref.name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Salary', '0007_employee'),
+    ]
+
+    operations = [
+        # Nullable so that unapplying 0009 can add the column back before
+        # restore_names fills it
+        migrations.AlterField(
+            model_name='salary',
+            name='employee',
+            field=models.CharField(max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name='advancehistory',
+            name='employee',
+            field=models.CharField(max_length=255, null=True),
+        ),
+        migrations.RunPython(link_employees, restore_names),
+    ]
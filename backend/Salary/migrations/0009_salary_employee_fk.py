@@ -0,0 +1,48 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Salary', '0008_merge_employee_names'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='salary',
+            name='employee',
+        ),
+        migrations.RemoveField(
+            model_name='advancehistory',
+            name='employee',
+        ),
+        migrations.RenameField(
+            model_name='salary',
+            old_name='employee_ref',
+            new_name='employee',
+        ),
+        migrations.RenameField(
+            model_name='advancehistory',
+            old_name='employee_ref',
+            new_name='employee',
+        ),
+        migrations.AlterField(
+            model_name='salary',
+            name='employee',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='salaries', to='Salary.employee'),
+        ),
+        migrations.AlterField(
+            model_name='advancehistory',
+            name='employee',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='advances', to='Salary.employee'),
+        ),
+        migrations.AddIndex(
+            model_name='salary',
+            index=models.Index(fields=['employee', 'month'], name='salary_employee_month_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='advancehistory',
+            index=models.Index(fields=['employee', 'date'], name='advance_employee_date_idx'),
+        ),
+    ]
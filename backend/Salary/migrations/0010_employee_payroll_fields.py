@@ -0,0 +1,47 @@
+from django.db import migrations, models
+
+
+def seed_wage_settings(apps, schema_editor):
+    """
+    Take each employee's wage type from their latest salary and, for Monthly
+    employees, the salary amount the payroll run will pay
+    """
+    Employee = apps.get_model('Salary', 'Employee')
+    Salary = apps.get_model('Salary', 'Salary')
+    latest = {}
+    for employee_id, wage_type, salary_amount in (
+        Salary.objects.order_by('month', 'id').values_list('employee_id', 'wage_type', 'salary_amount').iterator()
+    ):
+        latest[employee_id] = (wage_type, salary_amount)
+
+    for employee_id, (wage_type, salary_amount) in latest.items():
+        Employee.objects.filter(pk=employee_id).update(
+            wage_type=wage_type,
+            monthly_salary=salary_amount if wage_type == 'Monthly' else None,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Salary', '0009_salary_employee_fk'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='monthly_salary',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='wage_type',
+            field=models.CharField(choices=[('Monthly', 'Monthly'), ('Daily', 'Daily'), ('Wage', 'Wage')], default='Wage', max_length=20),
+        ),
+        migrations.RunPython(seed_wage_settings, migrations.RunPython.noop),
+    ]
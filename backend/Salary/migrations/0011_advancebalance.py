@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_ledger(apps, schema_editor):
+    """Build the ledger from the existing advances and salaries"""
+    from Salary.ledger import rebuild_balances
+    rebuild_balances(
+        advance_model=apps.get_model('Salary', 'AdvanceHistory'),
+        salary_model=apps.get_model('Salary', 'Salary'),
+        balance_model=apps.get_model('Salary', 'AdvanceBalance'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Salary', '0010_employee_payroll_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdvanceBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('opening_balance', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('advances', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('salary', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('recovered', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('closing_balance', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='advance_balances', to='Salary.employee')),
+            ],
+            options={
+                'ordering': ['employee', 'month'],
+                'constraints': [models.UniqueConstraint(fields=('employee', 'month'), name='unique_advance_balance_month')],
+            },
+        ),
+        migrations.RunPython(fill_ledger, migrations.RunPython.noop),
+    ]
@@ -6,16 +6,62 @@ from Authentication.models import CustomUser
 
 # Create your models here.
 
+WAGE_TYPES = [
+    ("Monthly", "Monthly"),
+    ("Daily", "Daily"),
+    ("Wage", "Wage"),
+]
+
+
+class Employee(models.Model):
+    """
+    An employee that salaries and advances belong to. Names are matched
+    ignoring case and repeated whitespace (name_key), so "Ali  Khan" and
+    "ali khan" are the same employee.
+    """
+
+    name = models.CharField(max_length=255)
+    name_key = models.CharField(max_length=255, unique=True, editable=False)
+    wage_type = models.CharField(max_length=20, choices=WAGE_TYPES, default="Wage")
+    # Salary paid to Monthly employees by the payroll run
+    monthly_salary = models.PositiveIntegerField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def clean_name(name):
+        return " ".join(str(name).split())
+
+    @classmethod
+    def key_for(cls, name):
+        return cls.clean_name(name).casefold()
+
+    @classmethod
+    def for_name(cls, name):
+        """Return the employee with this name, creating it on first use"""
+        name = cls.clean_name(name)
+        employee, _ = cls.objects.get_or_create(name_key=name.casefold(), defaults={"name": name})
+        return employee
+
+    def save(self, *args, **kwargs):
+        self.name = self.clean_name(self.name)
+        self.name_key = self.name.casefold()
+        super().save(*args, **kwargs)
+
+
 
 class Salary(models.Model):
 
-    WAGE_TYPE = [
-        ("Monthly", "Monthly"),
-        ("Daily", "Daily"),
-        ("Wage", "Wage"),
-    ]
+    WAGE_TYPE = WAGE_TYPES
     wage_type = models.CharField(max_length=20, choices=WAGE_TYPE, default="Wage")
-    employee = models.CharField(max_length=255)
+    employee = models.ForeignKey(Employee, on_delete=models.PROTECT, related_name="salaries")
     month = models.DateField()
     total_paid = models.PositiveIntegerField()
     status = models.CharField(max_length=50, null=True, blank=True)
@@ -26,15 +72,21 @@ class Salary(models.Model):
         CustomUser, on_delete=models.CASCADE, null=True, blank=True
     )
     description = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["employee", "month"], name="salary_employee_month_idx"),
+        ]
 
     def __str__(self):
-        return self.employee
+        return self.employee.name
 
 
 class AdvanceHistory(models.Model):
     """Model to track advance payments taken by employees"""
 
-    employee = models.CharField(max_length=255)
+    employee = models.ForeignKey(Employee, on_delete=models.PROTECT, related_name="advances")
     date = models.DateField()
     advance_taken = models.DecimalField(max_digits=10, decimal_places=2)
     purpose = models.TextField()
@@ -47,6 +99,37 @@ class AdvanceHistory(models.Model):
     class Meta:
         ordering = ["-date"]
         verbose_name_plural = "Advance Histories"
+        indexes = [
+            models.Index(fields=["employee", "date"], name="advance_employee_date_idx"),
+        ]
 
     def __str__(self):
         return f"{self.employee} - {self.date} - Rs. {self.advance_taken}"
+
+
+class AdvanceBalance(models.Model):
+    """
+    Advance ledger: one row per employee and month with advances or a
+    Monthly salary, maintained by Salary.ledger. Advances are recovered from
+    the month's Monthly salaries; whatever is not recovered is carried to
+    the next month as opening balance.
+    """
+
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="advance_balances")
+    # First day of the month
+    month = models.DateField()
+    opening_balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    advances = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    salary = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    recovered = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    closing_balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["employee", "month"]
+        constraints = [
+            models.UniqueConstraint(fields=["employee", "month"], name="unique_advance_balance_month"),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} - {self.month:%Y-%m} - Rs. {self.closing_balance}"
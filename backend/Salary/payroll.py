@@ -0,0 +1,68 @@
+from django.db import transaction
+from django.db.models import Sum
+from backend.dates import month_bounds
+from Dashboard.rollups import apply_bulk_create
+from .ledger import ledger_key, opening_balances, refresh_balances
+from .models import Employee, Salary, AdvanceHistory
+
+
+def run_payroll(year, month, pay_date=None, user=None):
+    """
+    Create the Monthly salary of every active Monthly employee with a
+    monthly_salary for one month, in one transaction.
+
+    Employees that already have a Monthly salary for the month are skipped,
+    so running the payroll again only adds the missing salaries. total_paid
+    is the salary net of the advances it recovers, as the advance ledger
+    counts them: the balance carried from earlier months plus the month's
+    advances (one query each for everyone); amount stays the gross salary.
+    Returns {'created': [Salary], 'skipped': count}.
+    """
+    first, last = month_bounds(year, month)
+    pay_date = pay_date or last
+
+    with transaction.atomic():
+        # Locks the employees (on databases that support it) so two runs
+        # for the same month cannot both create a salary
+        employees = list(
+            Employee.objects.select_for_update()
+            .filter(is_active=True, wage_type="Monthly", monthly_salary__isnull=False)
+            .order_by("name")
+        )
+        paid = set(
+            Salary.objects.filter(wage_type="Monthly", month__range=(first, last))
+            .values_list("employee_id", flat=True)
+        )
+        advances = dict(
+            AdvanceHistory.objects.filter(date__range=(first, last))
+            .order_by()
+            .values("employee")
+            .annotate(total=Sum("advance_taken"))
+            .values_list("employee", "total")
+        )
+        openings = opening_balances([employee.id for employee in employees], first)
+
+        salaries = []
+        for employee in employees:
+            if employee.id in paid:
+                continue
+            outstanding = openings.get(employee.id, 0) + (advances.get(employee.id) or 0)
+            # Same recovery as the ledger rows refreshed below
+            recovered = max(min(outstanding, employee.monthly_salary), 0)
+            salaries.append(Salary(
+                wage_type="Monthly",
+                employee=employee,
+                month=first,
+                date=pay_date,
+                amount=employee.monthly_salary,
+                salary_amount=employee.monthly_salary,
+                total_paid=int(employee.monthly_salary - recovered),
+                updated_by=user,
+            ))
+
+        Salary.objects.bulk_create(salaries)
+        # bulk_create sends no signals: update the rollups and the advance ledger here
+        apply_bulk_create(Salary, salaries)
+        refresh_balances({ledger_key(salary) for salary in salaries})
+
+    return {"created": salaries, "skipped": len(employees) - len(salaries)}
@@ -1,15 +1,45 @@
+from collections import defaultdict
 from rest_framework import serializers
-from .models import Salary, AdvanceHistory
+from .ledger import balances_for, ledger_key, next_month
+from .models import Employee, Salary, AdvanceHistory
 from decimal import Decimal
 
 
-class SalarySerializer(serializers.ModelSerializer):
+class EmployeeNameField(serializers.CharField):
+    """Employee as its name; EmployeeSerializerMixin turns the name into an Employee on save"""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("max_length", 255)
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return value.name
+
+
+class EmployeeSerializerMixin(serializers.Serializer):
+    """Create the employee of a new name when the record is saved, not while validating"""
+
+    employee = EmployeeNameField()
+
+    def resolve_employee(self, validated_data):
+        if "employee" in validated_data:
+            validated_data["employee"] = Employee.for_name(validated_data["employee"])
+        return validated_data
+
+    def create(self, validated_data):
+        return super().create(self.resolve_employee(validated_data))
+
+    def update(self, instance, validated_data):
+        return super().update(instance, self.resolve_employee(validated_data))
+
+
+class SalarySerializer(EmployeeSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Salary
         fields = "__all__"
 
 
-class DailyWageSerializer(serializers.ModelSerializer):
+class DailyWageSerializer(EmployeeSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Salary
         fields = ["employee", "date", "description", "wage_type"]
@@ -23,7 +53,26 @@ class DailyWageSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class MonthlySalarySerializer(serializers.ModelSerializer):
+class AttendanceEntrySerializer(serializers.Serializer):
+    """Days worked by one worker"""
+
+    employee = serializers.CharField(max_length=255)
+    dates = serializers.ListField(child=serializers.DateField(), min_length=1, max_length=31)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    def validate_employee(self, value):
+        if not Employee.clean_name(value):
+            raise serializers.ValidationError("This field may not be blank.")
+        return value
+
+
+class BulkAttendanceSerializer(serializers.Serializer):
+    """A day or week of attendance for many workers"""
+
+    entries = AttendanceEntrySerializer(many=True, allow_empty=False, max_length=500)
+
+
+class MonthlySalarySerializer(EmployeeSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Salary
         fields = ["employee", "date", "description", "salary_amount", "wage_type"]
@@ -35,10 +84,19 @@ class MonthlySalarySerializer(serializers.ModelSerializer):
         validated_data["amount"] = Decimal(str(salary_amount))
         validated_data["total_paid"] = Decimal(str(salary_amount))
         validated_data["month"] = validated_data["date"]
-        return super().create(validated_data)
+        salary = super().create(validated_data)
+
+        # The payroll run pays Monthly employees their monthly_salary, so the
+        # salary posted last becomes the one paid from then on
+        employee = salary.employee
+        if salary_amount and (employee.wage_type, employee.monthly_salary) != ("Monthly", salary_amount):
+            employee.wage_type = "Monthly"
+            employee.monthly_salary = salary_amount
+            employee.save(update_fields=["wage_type", "monthly_salary", "updated_at"])
+        return salary
 
 
-class AdvanceHistorySerializer(serializers.ModelSerializer):
+class AdvanceHistorySerializer(EmployeeSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = AdvanceHistory
         fields = [
@@ -53,11 +111,43 @@ class AdvanceHistorySerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
 
 
-class MonthlySalaryWithAdvanceSerializer(serializers.ModelSerializer):
-    """Serializer for monthly salary with advance calculations"""
+def advance_context(salaries):
+    """
+    Advance balances and histories for the monthly salaries of one page, keyed
+    by (employee id, month): one query for the AdvanceBalance ledger rows and
+    one for the advances themselves. Pass the result as serializer context
+    to MonthlySalaryWithAdvanceSerializer.
+    """
+    keys = {ledger_key(salary) for salary in salaries} - {None}
+    context = {"advance_balances": balances_for(keys), "advance_history": {}}
+    if not keys:
+        return context
+
+    advances = AdvanceHistory.objects.filter(
+        employee__in={employee for employee, _ in keys},
+        date__gte=min(month for _, month in keys),
+        date__lt=next_month(max(month for _, month in keys)),
+    )
+    history = defaultdict(list)
+    for advance in advances.select_related("employee").order_by("-date"):
+        key = ledger_key(advance)
+        if key in keys:
+            history[key].append(advance)
+    context["advance_history"] = history
+    return context
+
+
+class MonthlySalaryWithAdvanceSerializer(EmployeeSerializerMixin, serializers.ModelSerializer):
+    """
+    Serializer for monthly salary with advance calculations.
+    Reads the advance ledger rows and histories from the advance_context() of
+    the serialized salaries when it is passed as context, otherwise queries
+    them per salary.
+    """
 
     total_advance_taken = serializers.SerializerMethodField()
     remaining_salary = serializers.SerializerMethodField()
+    outstanding_advance = serializers.SerializerMethodField()
     advance_history = serializers.SerializerMethodField()
 
     class Meta:
@@ -72,36 +162,40 @@ class MonthlySalaryWithAdvanceSerializer(serializers.ModelSerializer):
             "status",
             "total_advance_taken",
             "remaining_salary",
+            "outstanding_advance",
             "advance_history",
         ]
 
+    def get_advances(self, obj):
+        """Return (ledger row or None, history) of the employee's advances in the salary month"""
+        context = self.context
+        if "advance_balances" not in context:
+            context = advance_context([obj])
+        key = ledger_key(obj)
+        return context["advance_balances"].get(key), context["advance_history"].get(key, [])
+
     def get_total_advance_taken(self, obj):
-        """Calculate total advance taken for the employee in the given month"""
+        """Total advance taken by the employee in the given month"""
         if obj.wage_type == "Monthly":
-            # Get advances for the employee in the same month
-            advances = AdvanceHistory.objects.filter(
-                employee=obj.employee,
-                date__year=obj.month.year,
-                date__month=obj.month.month,
-            )
-            return sum(advance.advance_taken for advance in advances)
+            balance = self.get_advances(obj)[0]
+            return balance.advances if balance else 0
         return 0
 
     def get_remaining_salary(self, obj):
         """Calculate remaining salary after deducting advances"""
         if obj.wage_type == "Monthly":
-            total_advance = self.get_total_advance_taken(obj)
-            base_salary = float(obj.amount)
-            return base_salary - total_advance
+            return float(obj.amount) - float(self.get_total_advance_taken(obj))
+        return 0
+
+    def get_outstanding_advance(self, obj):
+        """Advance balance still owed by the employee at the end of the salary month"""
+        if obj.wage_type == "Monthly":
+            balance = self.get_advances(obj)[0]
+            return balance.closing_balance if balance else 0
         return 0
 
     def get_advance_history(self, obj):
         """Get advance history for the employee in the given month"""
         if obj.wage_type == "Monthly":
-            advances = AdvanceHistory.objects.filter(
-                employee=obj.employee,
-                date__year=obj.month.year,
-                date__month=obj.month.month,
-            ).order_by("-date")
-            return AdvanceHistorySerializer(advances, many=True).data
+            return AdvanceHistorySerializer(self.get_advances(obj)[1], many=True).data
         return []
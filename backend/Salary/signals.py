@@ -0,0 +1,33 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from .ledger import ledger_key, refresh_balances
+from .models import AdvanceHistory, Salary
+
+
+def remember_ledger_key(sender, instance, raw=False, **kwargs):
+    """Keep the ledger row the stored record counted towards, in case the save moves it"""
+    if raw:
+        return
+    stored = sender.objects.filter(pk=instance.pk).first() if instance.pk else None
+    instance._ledger_previous = ledger_key(stored) if stored else None
+
+
+def update_ledger_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    keys = {ledger_key(instance), getattr(instance, '_ledger_previous', None)} - {None}
+    instance._ledger_previous = None
+    if keys:
+        refresh_balances(keys)
+
+
+def update_ledger_on_delete(sender, instance, **kwargs):
+    key = ledger_key(instance)
+    if key:
+        refresh_balances({key})
+
+
+def connect_ledger_signals():
+    for model in (AdvanceHistory, Salary):
+        pre_save.connect(remember_ledger_key, sender=model, dispatch_uid=f'ledger_pre_save_{model.__name__}')
+        post_save.connect(update_ledger_on_save, sender=model, dispatch_uid=f'ledger_post_save_{model.__name__}')
+        post_delete.connect(update_ledger_on_delete, sender=model, dispatch_uid=f'ledger_post_delete_{model.__name__}')
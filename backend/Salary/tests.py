@@ -1,3 +1,365 @@
+import io
 from django.test import TestCase
+from django.core.management import call_command
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from decimal import Decimal
+from datetime import date
+from Dashboard.rollups import check_rollups
+from .models import Employee, Salary, AdvanceHistory, AdvanceBalance
+from .payroll import run_payroll
 
 # Create your tests here.
+
+class MonthlySalaryAdvanceTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_salaries(self, employees, months):
+        for name in employees:
+            employee = Employee.for_name(name)
+            for month in months:
+                Salary.objects.create(
+                    wage_type='Monthly', employee=employee, month=date(2024, month, 1),
+                    date=date(2024, month, 1), amount=Decimal('30000.00'),
+                    total_paid=30000, salary_amount=30000,
+                )
+                AdvanceHistory.objects.create(
+                    employee=employee, date=date(2024, month, 5),
+                    advance_taken=Decimal('1000.00'), purpose='Rent',
+                )
+                AdvanceHistory.objects.create(
+                    employee=employee, date=date(2024, month, 20),
+                    advance_taken=Decimal('500.00'), purpose='Fuel',
+                )
+
+    def test_advances_are_matched_per_employee_and_month(self):
+        """Test that totals and histories only include the salary's own month"""
+        self.create_salaries(['Kashif'], [3, 12])
+        AdvanceHistory.objects.create(
+            employee=Employee.for_name('Tariq'), date=date(2024, 3, 5), advance_taken=Decimal('700.00'), purpose='Other'
+        )
+        response = self.client.get(reverse('salary:monthly-salary'))
+        self.assertEqual(response.status_code, 200)
+
+        for row in response.data['results']:
+            self.assertEqual(row['total_advance_taken'], Decimal('1500.00'))
+            self.assertEqual(row['remaining_salary'], 28500.0)
+            self.assertEqual([advance['date'] for advance in row['advance_history']], [
+                f"{row['month'][:7]}-20", f"{row['month'][:7]}-05",
+            ])
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        """Test that the monthly salary list runs in constant queries"""
+        self.create_salaries(['Kashif'], [1])
+        # exists, count, page, advance totals, advance history
+        with self.assertNumQueries(5):
+            self.client.get(reverse('salary:monthly-salary'))
+
+        self.create_salaries(['Tariq', 'Bilal', 'Hamza'], [1, 2, 3])
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('salary:monthly-salary'), {'page_size': 20})
+        self.assertEqual(len(response.data['results']), 10)
+
+
+class EmployeeTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_names_differing_in_case_and_spacing_are_one_employee(self):
+        """Test that salaries and advances posted by name share one Employee"""
+        response = self.client.post(reverse('salary:monthly-salary'), {
+            'employee': 'Ali  Khan', 'date': '2024-03-01', 'salary_amount': 30000,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['data']['employee'], 'Ali Khan')
+
+        response = self.client.post(reverse('salary:advance-list'), {
+            'employee': 'ali khan', 'date': '2024-03-10', 'advance_taken': '2000.00', 'purpose': 'Rent',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Employee.objects.count(), 1)
+
+        response = self.client.get(
+            reverse('salary:employee-salary-summary', args=['ALI KHAN']), {'year': 2024, 'month': 3}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['employee'], 'Ali Khan')
+        self.assertEqual(response.data['remaining_salary'], 28000.0)
+        self.assertEqual(len(response.data['advance_history']), 1)
+
+    def test_invalid_salary_does_not_create_employee(self):
+        """Test that the employee is only created when the record is saved"""
+        response = self.client.post(reverse('salary:monthly-salary'), {
+            'employee': 'Tariq', 'date': 'not a date', 'salary_amount': 30000,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Employee.objects.exists())
+
+    def test_employee_rename_changes_salary_list_etag(self):
+        """Test that renaming an employee is not answered with 304"""
+        employee = Employee.for_name('Tariq')
+        Salary.objects.create(
+            wage_type='Monthly', employee=employee, month=date(2024, 3, 1), date=date(2024, 3, 1),
+            amount=Decimal('30000.00'), total_paid=30000, salary_amount=30000,
+        )
+        url = reverse('salary:salary-list')
+        etag = self.client.get(url)['ETag']
+
+        employee.name = 'Tariq Mehmood'
+        employee.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['employee'], 'Tariq Mehmood')
+
+    def test_unknown_employee_summary_is_404(self):
+        """Test that the summary of a name without records is not found"""
+        response = self.client.get(reverse('salary:employee-salary-summary', args=['Nobody']))
+        self.assertEqual(response.status_code, 404)
+
+
+class PayrollRunTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        for index in range(30):
+            Employee.objects.create(name=f'Worker {index}', wage_type='Monthly', monthly_salary=30000)
+        Employee.objects.create(name='Former', wage_type='Monthly', monthly_salary=30000, is_active=False)
+        Employee.objects.create(name='Labourer', wage_type='Daily')
+        AdvanceHistory.objects.create(
+            employee=Employee.for_name('Worker 0'), date=date(2024, 3, 5),
+            advance_taken=Decimal('1000.00'), purpose='Rent',
+        )
+        AdvanceHistory.objects.create(
+            employee=Employee.for_name('Worker 0'), date=date(2024, 4, 5),
+            advance_taken=Decimal('700.00'), purpose='Rent',
+        )
+
+    def test_run_creates_active_monthly_salaries_in_constant_queries(self):
+        """Test that one request pays every active Monthly employee, net of advances"""
+        with self.captureOnCommitCallbacks(execute=True):
+            # Independent of the number of employees: lookups, one insert,
+            # rollup bucket updates and the advance ledger refresh
+            with self.assertNumQueries(27):
+                response = self.client.post(reverse('salary:payroll-run'), {'month': '2024-03'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 30)
+
+        salaries = Salary.objects.filter(month=date(2024, 3, 1))
+        self.assertEqual(salaries.count(), 30)
+        self.assertFalse(salaries.filter(employee__name__in=['Former', 'Labourer']).exists())
+        worker = salaries.get(employee__name='Worker 0')
+        self.assertEqual(worker.date, date(2024, 3, 31))
+        self.assertEqual(worker.amount, Decimal('30000'))
+        self.assertEqual(worker.total_paid, 29000)
+        self.assertEqual(salaries.get(employee__name='Worker 1').total_paid, 30000)
+        self.assertEqual(check_rollups(), [])
+
+    def test_advance_carried_from_an_earlier_month_is_deducted(self):
+        """Test that payroll deducts what the ledger recovers, not only the month's advances"""
+        worker = Employee.for_name('Worker 1')
+        AdvanceHistory.objects.create(
+            employee=worker, date=date(2024, 2, 10), advance_taken=Decimal('40000.00'), purpose='Loan'
+        )
+
+        run_payroll(2024, 3)
+        run_payroll(2024, 4)
+
+        paid = dict(Salary.objects.filter(employee=worker).values_list('month', 'total_paid'))
+        self.assertEqual(paid, {date(2024, 3, 1): 0, date(2024, 4, 1): 20000})
+        recovered = dict(AdvanceBalance.objects.filter(employee=worker).values_list('month', 'recovered'))
+        self.assertEqual(recovered[date(2024, 3, 1)], 30000)
+        self.assertEqual(recovered[date(2024, 4, 1)], 10000)
+
+    def test_rerun_only_adds_missing_salaries(self):
+        """Test that the payroll run is idempotent"""
+        Salary.objects.create(
+            wage_type='Monthly', employee=Employee.for_name('Worker 5'), month=date(2024, 3, 10),
+            date=date(2024, 3, 10), amount=Decimal('30000.00'), total_paid=30000, salary_amount=30000,
+        )
+        out = io.StringIO()
+        call_command('run_payroll', '2024-03', stdout=out)
+        self.assertIn('Created 29 salaries, skipped 1', out.getvalue())
+
+        response = self.client.post(reverse('salary:payroll-run'), {'month': '2024-03'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 0)
+        self.assertEqual(Salary.objects.filter(month__year=2024, month__month=3).count(), 30)
+
+    def test_posted_monthly_salary_enrols_the_employee(self):
+        """Test that an employee paid through the monthly salary endpoint is paid by later runs"""
+        response = self.client.post(
+            reverse('salary:monthly-salary'),
+            {'employee': 'New Hire', 'date': '2024-02-28', 'salary_amount': 45000},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        employee = Employee.objects.get(name='New Hire')
+        self.assertEqual((employee.wage_type, employee.monthly_salary), ('Monthly', 45000))
+
+        run_payroll(2024, 3)
+        self.assertEqual(Salary.objects.get(employee=employee, month=date(2024, 3, 1)).amount, Decimal('45000'))
+
+    def test_invalid_month_is_rejected(self):
+        """Test that the month must be YYYY-MM"""
+        response = self.client.post(reverse('salary:payroll-run'), {'month': 'March'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class AdvanceLedgerTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.employee = Employee.for_name('Kashif')
+
+    def salary(self, month, amount):
+        return Salary.objects.create(
+            wage_type='Monthly', employee=self.employee, month=date(2024, month, 1),
+            date=date(2024, month, 28), amount=Decimal(amount), total_paid=int(amount), salary_amount=int(amount),
+        )
+
+    def advance(self, day, amount):
+        return AdvanceHistory.objects.create(
+            employee=self.employee, date=day, advance_taken=Decimal(amount), purpose='Loan'
+        )
+
+    def ledger(self):
+        return list(AdvanceBalance.objects.filter(employee=self.employee).order_by('month').values_list(
+            'month', 'opening_balance', 'advances', 'salary', 'recovered', 'closing_balance'
+        ))
+
+    def test_unrecovered_advances_carry_into_later_months(self):
+        """Test that balances are maintained on advance and salary writes"""
+        self.advance(date(2024, 1, 10), '50000.00')
+        self.salary(1, '30000')
+        self.salary(2, '30000')
+        self.assertEqual(self.ledger(), [
+            (date(2024, 1, 1), 0, 50000, 30000, 30000, 20000),
+            (date(2024, 2, 1), 20000, 0, 30000, 20000, 0),
+        ])
+
+        # Moving the advance to February changes both months
+        advance = AdvanceHistory.objects.get()
+        advance.date = date(2024, 2, 3)
+        advance.save()
+        self.assertEqual(self.ledger(), [
+            (date(2024, 1, 1), 0, 0, 30000, 0, 0),
+            (date(2024, 2, 1), 0, 50000, 30000, 30000, 20000),
+        ])
+
+        advance.delete()
+        self.assertEqual(self.ledger()[1], (date(2024, 2, 1), 0, 0, 30000, 0, 0))
+
+    def test_rebuild_matches_incremental_ledger(self):
+        """Test that the rebuild command recomputes the same balances"""
+        self.advance(date(2024, 1, 10), '40000.00')
+        self.advance(date(2024, 3, 2), '5000.00')
+        self.salary(1, '30000')
+        self.salary(3, '30000')
+        other = Employee.for_name('Tariq')
+        AdvanceHistory.objects.create(employee=other, date=date(2024, 2, 1), advance_taken=Decimal('900.00'), purpose='Fuel')
+        incremental = list(AdvanceBalance.objects.order_by('employee', 'month').values_list(
+            'employee', 'month', 'opening_balance', 'advances', 'salary', 'recovered', 'closing_balance'
+        ))
+
+        AdvanceBalance.objects.all().delete()
+        out = io.StringIO()
+        call_command('rebuild_advance_ledger', stdout=out)
+        self.assertIn('3 balance rows', out.getvalue())
+        rebuilt = list(AdvanceBalance.objects.order_by('employee', 'month').values_list(
+            'employee', 'month', 'opening_balance', 'advances', 'salary', 'recovered', 'closing_balance'
+        ))
+        self.assertEqual(rebuilt, incremental)
+        self.assertEqual([(row[4], row[5]) for row in self.ledger()], [(30000, 10000), (15000, 0)])
+
+    def test_summary_and_list_read_the_ledger(self):
+        """Test that views report the month's advances and the outstanding balance"""
+        self.advance(date(2024, 1, 10), '50000.00')
+        self.salary(1, '30000')
+        self.salary(2, '30000')
+        self.advance(date(2024, 2, 12), '1000.00')
+
+        response = self.client.get(
+            reverse('salary:employee-salary-summary', args=['Kashif']), {'year': 2024, 'month': 2}
+        )
+        self.assertEqual(response.data['total_advance_taken'], Decimal('1000.00'))
+        self.assertEqual(response.data['outstanding_advance'], 0)
+
+        response = self.client.get(reverse('salary:monthly-salary'))
+        outstanding = {row['month']: row['outstanding_advance'] for row in response.data['results']}
+        self.assertEqual(outstanding, {'2024-01-01': Decimal('20000.00'), '2024-02-01': 0})
+
+
+class BulkAttendanceTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.week = [f'2024-03-{day:02d}' for day in range(4, 10)]
+
+    def test_week_for_many_workers_is_one_request(self):
+        """Test that a week of attendance is written in constant queries"""
+        entries = [{'employee': f'Worker {index}', 'dates': self.week} for index in range(20)]
+        with self.captureOnCommitCallbacks(execute=True):
+            # Independent of the number of workers: employee lookup and
+            # insert, duplicate check, one insert, then one rollup bucket
+            # update per day and for the month
+            with self.assertNumQueries(49):
+                response = self.client.post(reverse('salary:daily-wage-bulk'), {'entries': entries}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 120)
+
+        salary = Salary.objects.filter(wage_type='Daily', employee__name='Worker 3').first()
+        self.assertEqual((salary.amount, salary.total_paid, salary.salary_amount), (0, 0, 0))
+        self.assertEqual(salary.month, salary.date)
+        self.assertEqual(Employee.objects.get(name='Worker 3').wage_type, 'Daily')
+        self.assertEqual(check_rollups(), [])
+
+    def test_resubmitted_days_are_skipped(self):
+        """Test that days already recorded for a worker are not counted twice"""
+        Salary.objects.create(
+            wage_type='Daily', employee=Employee.for_name('Ali'), month=date(2024, 3, 4),
+            date=date(2024, 3, 4), amount=0, total_paid=0, salary_amount=0,
+        )
+        response = self.client.post(reverse('salary:daily-wage-bulk'), {'entries': [
+            {'employee': 'ali', 'dates': self.week[:2]},
+            {'employee': 'Bilal', 'dates': self.week[:1], 'description': 'Roof work'},
+        ]}, format='json')
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['skipped'], 1)
+        self.assertEqual(Employee.objects.count(), 2)
+
+    def test_invalid_entries_are_rejected(self):
+        """Test that malformed sheets write nothing"""
+        response = self.client.post(reverse('salary:daily-wage-bulk'), {'entries': [
+            {'employee': 'Ali', 'dates': ['2024-03-04']},
+            {'employee': '  ', 'dates': ['not a date']},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Salary.objects.exists())
+
+    def test_monthly_days_worked(self):
+        """Test that days worked are counted per worker in one query"""
+        self.client.post(reverse('salary:daily-wage-bulk'), {'entries': [
+            {'employee': 'Ali', 'dates': self.week},
+            {'employee': 'Bilal', 'dates': self.week[:3] + ['2024-04-01']},
+        ]}, format='json')
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('salary:daily-wage-monthly'), {'year': 2024, 'month': 3})
+        self.assertEqual(response.data['workers'], [
+            {'employee': 'Ali', 'days_worked': 6},
+            {'employee': 'Bilal', 'days_worked': 3},
+        ])
+        self.assertEqual(response.data['total_days'], 9)
+
+        response = self.client.get(reverse('salary:daily-wage-monthly'), {'year': 2024, 'month': 13})
+        self.assertEqual(response.status_code, 400)
@@ -6,8 +6,12 @@ app_name = 'salary'
 urlpatterns = [
     path('', views.SalaryView.as_view(), name='salary-list'),
     path('<int:salary_id>/', views.SalaryView.as_view(), name='salary-detail'),
+    path('export/', views.SalaryExportView.as_view(), name='salary-export'),
     path('daily-wage/', views.DailyWageView.as_view(), name='daily-wage'),
+    path('daily-wage/bulk/', views.BulkAttendanceView.as_view(), name='daily-wage-bulk'),
+    path('daily-wage/monthly/', views.DailyWageMonthlyView.as_view(), name='daily-wage-monthly'),
     path('monthly-salary/', views.MonthlySalaryView.as_view(), name='monthly-salary'),
+    path('payroll/', views.PayrollRunView.as_view(), name='payroll-run'),
     
     path('advance/', views.AdvanceHistoryView.as_view(), name='advance-list'),
     path('advance/<int:advance_id>/', views.AdvanceHistoryView.as_view(), name='advance-detail'),
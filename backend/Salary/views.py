@@ -4,11 +4,20 @@ from rest_framework import status
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
-from django.db.models import Sum
-from .models import Salary, AdvanceHistory
+from django.db.models import Count, Sum
+from django.utils import timezone
+from datetime import datetime
+from .models import Employee, Salary, AdvanceHistory, AdvanceBalance
+from .ledger import month_start
+from backend.conditional import conditional_get
+from backend.dates import month_bounds
+from backend.exports import csv_response, filter_year, iter_values
+from .attendance import record_attendance
+from .payroll import run_payroll
 from .serializers import (
     SalarySerializer, DailyWageSerializer, MonthlySalarySerializer,
-    AdvanceHistorySerializer, MonthlySalaryWithAdvanceSerializer
+    AdvanceHistorySerializer, MonthlySalaryWithAdvanceSerializer, BulkAttendanceSerializer,
+    advance_context
 )
 
 class SalaryPagination(PageNumberPagination):
@@ -19,13 +28,15 @@ class SalaryPagination(PageNumberPagination):
 class SalaryView(APIView):
     permission_classes = [IsAuthenticated]
     
+    # Employee renames change the serialized employee names
+    @conditional_get(Salary, Employee)
     def get(self, request, salary_id=None):
         if salary_id:
             salary = get_object_or_404(Salary, id=salary_id)
             serializer = SalarySerializer(salary)
             return Response(serializer.data)    
         else:
-            salaries = Salary.objects.all()
+            salaries = Salary.objects.select_related('employee')
             if not salaries.exists():
                 return Response({'error': 'No salaries found'}, status=status.HTTP_204_NO_CONTENT)
             
@@ -59,7 +70,7 @@ class DailyWageView(APIView):
     
     def get(self, request):
         """Get all daily wages"""
-        daily_wages = Salary.objects.filter(wage_type='Daily')
+        daily_wages = Salary.objects.filter(wage_type='Daily').select_related('employee')
         if not daily_wages.exists():
             return Response({'error': 'No daily wages found'}, status=status.HTTP_204_NO_CONTENT)
         
@@ -79,18 +90,80 @@ class DailyWageView(APIView):
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class BulkAttendanceView(APIView):
+    """
+    Bulk Attendance View
+
+    - POST: Record a day or week of daily-wage attendance for many workers.
+      Body: {"entries": [{"employee": "Ali", "dates": ["2024-03-04", ...],
+      "description": "optional"}, ...]}
+
+    Each worker and day becomes one Daily wage row, written together; days
+    already recorded for a worker are skipped.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = BulkAttendanceSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        result = record_attendance(serializer.validated_data['entries'], user=request.user)
+        created = result['created']
+        return Response({
+            'message': f"Recorded {len(created)} days, skipped {result['skipped']} already recorded",
+            'created': len(created),
+            'skipped': result['skipped'],
+            'data': DailyWageSerializer(created, many=True).data
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+class DailyWageMonthlyView(APIView):
+    """
+    Days worked per daily-wage worker in one month (?year=&month=, defaults
+    to the current month), counted in the database with one grouped query.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        today = timezone.localdate()
+        try:
+            year = int(request.query_params.get('year', today.year))
+            month = int(request.query_params.get('month', today.month))
+            first, last = month_bounds(year, month)
+        except ValueError:
+            return Response({'error': 'year and month must be valid numbers'}, status=status.HTTP_400_BAD_REQUEST)
+
+        workers = (
+            Salary.objects.filter(wage_type='Daily', date__range=(first, last))
+            .values('employee', 'employee__name')
+            .annotate(days_worked=Count('date', distinct=True))
+            .order_by('employee__name')
+        )
+        workers = [
+            {'employee': row['employee__name'], 'days_worked': row['days_worked']} for row in workers
+        ]
+        return Response({
+            'year': year,
+            'month': month,
+            'total_days': sum(row['days_worked'] for row in workers),
+            'workers': workers,
+        })
+
 class MonthlySalaryView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
         """Get all monthly salaries"""
-        monthly_salaries = Salary.objects.filter(wage_type='Monthly')
+        monthly_salaries = Salary.objects.filter(wage_type='Monthly').select_related('employee')
         if not monthly_salaries.exists():
             return Response({'error': 'No monthly salaries found'}, status=status.HTTP_204_NO_CONTENT)
         
         paginator = SalaryPagination()
         paginated_salaries = paginator.paginate_queryset(monthly_salaries, request)
-        serializer = MonthlySalaryWithAdvanceSerializer(paginated_salaries, many=True)
+        # Advances of the whole page in two queries instead of several per salary
+        serializer = MonthlySalaryWithAdvanceSerializer(
+            paginated_salaries, many=True, context=advance_context(paginated_salaries)
+        )
         return paginator.get_paginated_response(serializer.data)
     
     def post(self, request):
@@ -100,10 +173,44 @@ class MonthlySalaryView(APIView):
             salary = serializer.save(updated_by=request.user)
             return Response({
                 'message': 'Monthly salary created successfully',
-                'data': MonthlySalaryWithAdvanceSerializer(salary).data
+                'data': MonthlySalaryWithAdvanceSerializer(salary, context=advance_context([salary])).data
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class PayrollRunView(APIView):
+    """
+    Payroll Run View
+
+    - POST: Create the Monthly salaries of all active Monthly employees for
+      one month. Body: {"month": "YYYY-MM", "date": "YYYY-MM-DD" (optional,
+      defaults to the last day of the month)}
+
+    Employees already paid for the month are skipped, so the run can be repeated.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            month = datetime.strptime(str(request.data.get('month', '')), '%Y-%m')
+        except ValueError:
+            return Response({'error': 'month must be given as YYYY-MM'}, status=status.HTTP_400_BAD_REQUEST)
+
+        pay_date = None
+        if request.data.get('date'):
+            try:
+                pay_date = datetime.strptime(str(request.data['date']), '%Y-%m-%d').date()
+            except ValueError:
+                return Response({'error': 'date must be given as YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = run_payroll(month.year, month.month, pay_date=pay_date, user=request.user)
+        created = result['created']
+        return Response({
+            'message': f"Created {len(created)} salaries, skipped {result['skipped']} already paid",
+            'created': len(created),
+            'skipped': result['skipped'],
+            'data': SalarySerializer(created, many=True).data
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
 class AdvanceHistoryView(APIView):
     permission_classes = [IsAuthenticated]
     
@@ -118,10 +225,10 @@ class AdvanceHistoryView(APIView):
             month = request.query_params.get('month', None)
             year = request.query_params.get('year', None)
             
-            advances = AdvanceHistory.objects.all()
+            advances = AdvanceHistory.objects.select_related('employee')
             
             if employee:
-                advances = advances.filter(employee=employee)
+                advances = advances.filter(employee__name_key=Employee.key_for(employee))
             if month and year:
                 advances = advances.filter(date__year=year, date__month=month)
             
@@ -170,7 +277,12 @@ class EmployeeSalarySummaryView(APIView):
         month = request.query_params.get('month', None)
         year = request.query_params.get('year', None)
         
-        salary_filter = {'employee': employee_name, 'wage_type': 'Monthly'}
+        employee = Employee.objects.filter(name_key=Employee.key_for(employee_name)).first()
+        if employee is None:
+            return Response({'error': 'Monthly salary not found for this employee'}, status=status.HTTP_404_NOT_FOUND)
+
+        # Both lookups are index seeks on (employee, month) and (employee, date)
+        salary_filter = {'employee': employee, 'wage_type': 'Monthly'}
         if month and year:
             salary_filter['month__year'] = year
             salary_filter['month__month'] = month
@@ -180,26 +292,59 @@ class EmployeeSalarySummaryView(APIView):
         except Salary.DoesNotExist:
             return Response({'error': 'Monthly salary not found for this employee'}, status=status.HTTP_404_NOT_FOUND)
         
-        advance_filter = {'employee': employee_name}
+        advance_filter = {'employee': employee}
         if month and year:
             advance_filter['date__year'] = year
             advance_filter['date__month'] = month
         
-        advances = AdvanceHistory.objects.filter(**advance_filter).order_by('-date')
-        total_advance = advances.aggregate(total=Sum('advance_taken'))['total'] or 0
+        advances = AdvanceHistory.objects.filter(**advance_filter).select_related('employee').order_by('-date')
+
+        # Totals and balances come from the advance ledger instead of re-summing the history
+        balances = AdvanceBalance.objects.filter(employee=employee)
+        if month and year:
+            balance = balances.filter(month=month_start(salary.month)).first()
+            total_advance = balance.advances if balance else 0
+        else:
+            total_advance = balances.aggregate(total=Sum('advances'))['total'] or 0
+        latest = balances.filter(month__lte=month_start(salary.month)).order_by('-month').first()
         
         base_salary = float(salary.amount)
-        remaining_salary = base_salary - total_advance
+        remaining_salary = base_salary - float(total_advance)
         
         response_data = {
-            'employee': employee_name,
+            'employee': employee.name,
             'month': salary.month,
             'base_salary': base_salary,
             'total_advance_taken': total_advance,
             'remaining_salary': remaining_salary,
+            'outstanding_advance': latest.closing_balance if latest else 0,
             'advance_history': AdvanceHistorySerializer(advances, many=True).data
         }
         
         return Response(response_data)
 
+class SalaryExportView(APIView):
+    """
+    Stream salaries as CSV.
+    ?wage_type= limits the export like the daily-wage/monthly-salary lists, ?year= to one year.
+    """
+    permission_classes = [IsAuthenticated]
+    header = [
+        'id', 'date', 'month', 'employee', 'wage_type', 'amount',
+        'total_paid', 'salary_amount', 'status', 'description',
+    ]
+    columns = [
+        'id', 'date', 'month', 'employee__name', 'wage_type', 'amount',
+        'total_paid', 'salary_amount', 'status', 'description',
+    ]
 
+    def get(self, request):
+        salaries = Salary.objects.order_by('date', 'id')
+        wage_type = request.query_params.get('wage_type', None)
+        if wage_type:
+            salaries = salaries.filter(wage_type=wage_type)
+        try:
+            salaries = filter_year(salaries, request.query_params)
+        except ValueError:
+            return Response({'error': 'year must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        return csv_response('salaries.csv', self.header, iter_values(salaries, self.columns))
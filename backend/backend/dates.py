@@ -0,0 +1,10 @@
+"""
+Calendar helpers shared by the apps.
+"""
+import calendar
+from datetime import date
+
+
+def month_bounds(year, month):
+    """Return the first and last date of a month"""
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
@@ -0,0 +1,49 @@
+"""
+Streaming CSV exports.
+
+Rows are pulled from the database with .iterator(chunk_size=...) and written
+to the response one line at a time, so memory use does not grow with the
+number of exported rows.
+"""
+import csv
+from django.http import StreamingHttpResponse
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose write() hands the formatted line back to csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def filter_year(queryset, params, field='date'):
+    """
+    Apply the optional ?year= filter shared by every export.
+    Raises ValueError for a year that is not a number.
+    """
+    year = params.get('year')
+    if year:
+        queryset = queryset.filter(**{f'{field}__year': int(year)})
+    return queryset
+
+
+def iter_values(queryset, columns):
+    """Yield value tuples for `columns` without loading the queryset into memory"""
+    return queryset.values_list(*columns).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def csv_response(filename, header, rows):
+    """Stream `rows` (an iterable of sequences) as a CSV attachment"""
+    writer = csv.writer(Echo())
+
+    def lines():
+        # The byte order mark lets Excel detect UTF-8
+        yield '\ufeff' + writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(lines(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,152 @@
+"""
+Per-request performance instrumentation (settings.REQUEST_INSTRUMENTATION).
+
+For every request handled by a DRF view the middleware records the number of
+SQL queries, the time spent in them, the time spent in serializer .data and
+the wall time. The numbers are sent back in a Server-Timing header and logged
+as one JSON line on the 'backend.instrumentation' logger. SQL templates that
+repeat more than REQUEST_INSTRUMENTATION_N_PLUS_ONE_THRESHOLD times in one
+request are listed in the log line (logged as a warning) as N+1 suspects.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework import serializers
+from rest_framework.views import APIView
+
+logger = logging.getLogger('backend.instrumentation')
+
+_current = ContextVar('request_profile', default=None)
+
+# "IN (%s, %s, %s)" and "VALUES (%s, %s), (%s, %s)" differ only in length
+PLACEHOLDER_LIST = re.compile(r'%s(?:\s*,\s*%s)+')
+VALUES_LIST = re.compile(r'(\([^()]*\))(?:\s*,\s*\1)+')
+
+
+def sql_template(sql):
+    """Collapse placeholder lists so the same query with more parameters matches"""
+    return VALUES_LIST.sub(r'\1', PLACEHOLDER_LIST.sub('%s', sql))
+
+
+class RequestProfile:
+    """Counters for one request"""
+
+    def __init__(self):
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.templates = Counter()
+        self._serializer_depth = 0
+
+    def record_query(self, execute, sql, params, many, context):
+        """connection.execute_wrapper hook"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.query_count += 1
+            self.templates[sql_template(sql)] += 1
+
+    def repeated_queries(self, threshold):
+        """[(template, count)] for templates run more than `threshold` times"""
+        return [(sql, count) for sql, count in self.templates.most_common() if count > threshold]
+
+
+def _timed(getter):
+    def data(self):
+        profile = _current.get()
+        # Nested serializers (or .data called inside .data) count once
+        if profile is None or profile._serializer_depth:
+            return getter(self)
+        profile._serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            return getter(self)
+        finally:
+            profile.serializer_time += time.perf_counter() - start
+            profile._serializer_depth -= 1
+
+    data.instrumented = True
+    return property(data)
+
+
+def instrument_serializers():
+    """Time Serializer.data and ListSerializer.data (once per process)"""
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        getter = cls.__dict__['data'].fget
+        if not getattr(getter, 'instrumented', False):
+            cls.data = _timed(getter)
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Request Instrumentation Middleware
+
+    Only installed when settings.REQUEST_INSTRUMENTATION is true; requests
+    that do not reach a DRF view (admin, media files) are not reported.
+    For streaming responses the wall time ends when the response is returned,
+    before its body is sent.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        instrument_serializers()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.record_query))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        wall_time = time.perf_counter() - start
+
+        view = getattr(request, 'instrumented_view', None)
+        if view:
+            self.report(request, response, view, profile, wall_time)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None)
+        if view_class is not None and issubclass(view_class, APIView):
+            request.instrumented_view = view_class.__name__
+
+    def report(self, request, response, view, profile, wall_time):
+        response['Server-Timing'] = ', '.join([
+            f'sql;dur={_ms(profile.sql_time)};desc="{profile.query_count} queries"',
+            f'serializer;dur={_ms(profile.serializer_time)}',
+            f'total;dur={_ms(wall_time)}',
+        ])
+
+        repeated = profile.repeated_queries(settings.REQUEST_INSTRUMENTATION_N_PLUS_ONE_THRESHOLD)
+        record = {
+            'view': view,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': profile.query_count,
+            'sql_ms': _ms(profile.sql_time),
+            'serializer_ms': _ms(profile.serializer_time),
+            'wall_ms': _ms(wall_time),
+            'n_plus_one': [{'sql': sql, 'count': count} for sql, count in repeated],
+        }
+        log = logger.warning if repeated else logger.info
+        log(json.dumps(record))
@@ -52,9 +52,11 @@ INSTALLED_APPS = [
     'Salary',
     'Authentication',
     'Dashboard',
+    'Media',
 ]
 
 MIDDLEWARE = [
+    'backend.instrumentation.RequestInstrumentationMiddleware',  # only with REQUEST_INSTRUMENTATION
     'corsheaders.middleware.CorsMiddleware',  # added (hammad)
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -127,6 +129,45 @@ USE_I18N = True
 USE_TZ = True
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local-memory cache is per process; switch to FileBasedCache when running
+# several workers so dashboard invalidation is shared between them.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ledger-solar',
+    }
+}
+
+# Seconds a cached dashboard response may live (writes change its key earlier)
+DASHBOARD_CACHE_TIMEOUT = 60 * 60
+
+# Seconds the active checklist catalog is cached (edits in this process clear it earlier)
+CHECKLIST_CACHE_TIMEOUT = 5 * 60
+
+# Re-check dashboard responses against their serializers (debug and test runs only)
+DASHBOARD_VALIDATE_RESPONSES = DEBUG
+
+# Per-request SQL count/time, serializer time and wall time for DRF views,
+# sent as Server-Timing headers and logged (see backend.instrumentation)
+REQUEST_INSTRUMENTATION = False
+# A SQL template repeated more often than this in one request is logged as N+1
+REQUEST_INSTRUMENTATION_N_PLUS_ONE_THRESHOLD = 10
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'backend.instrumentation': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
@@ -137,6 +178,30 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Upload directories served by Media.views.MediaView
+MEDIA_SERVE_PREFIXES = [
+    'products/', 'unique_solar_projects/', 'expense_images/', 'profile_images/',
+    'blobs/', 'variants/',
+]
+
+# Browser cache lifetime of media files that are not content-addressed blobs
+MEDIA_CACHE_MAX_AGE = 24 * 60 * 60
+
+# Let the web server send media files: None, 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache)
+MEDIA_SENDFILE = None
+# Internal nginx location that maps to MEDIA_ROOT, used with 'x-accel-redirect'
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+# Resized copies generated for every uploaded image (see Media.variants)
+IMAGE_VARIANTS = {
+    'thumb': {'size': 320, 'format': 'WEBP', 'quality': 75},
+    'medium': {'size': 1280, 'format': 'WEBP', 'quality': 80},
+    'thumb_jpeg': {'size': 320, 'format': 'JPEG', 'quality': 80},
+}
+
+# Worker threads that generate image variants (0 generates them inline)
+IMAGE_VARIANT_WORKERS = 2
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
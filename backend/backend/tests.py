@@ -0,0 +1,76 @@
+import json
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from decimal import Decimal
+from datetime import date
+from Project.models import UniqueSolarProject
+from .instrumentation import RequestProfile, sql_template
+
+# Create your tests here.
+
+@override_settings(REQUEST_INSTRUMENTATION=True, REQUEST_INSTRUMENTATION_N_PLUS_ONE_THRESHOLD=10)
+class RequestInstrumentationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='owner', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for day in range(1, 4):
+            UniqueSolarProject.objects.create(
+                customer_name=f'Customer {day}', address='Karachi', date=date(2024, 3, day),
+                valid_until=date(2024, 4, day), installation_amount=Decimal('500.00'),
+            )
+
+    def test_drf_view_reports_server_timing_and_log_line(self):
+        """Test that a DRF view gets a Server-Timing header and one JSON log line"""
+        with self.assertLogs('backend.instrumentation', level='INFO') as logs:
+            response = self.client.get(reverse('unique-solar-project-list'))
+        self.assertEqual(response.status_code, 200)
+
+        timing = response['Server-Timing']
+        for metric in ('sql;dur=', 'serializer;dur=', 'total;dur='):
+            self.assertIn(metric, timing)
+
+        self.assertEqual(len(logs.records), 1)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'UniqueSolarProjectListView')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['queries'], 0)
+        self.assertIn(f'desc="{record["queries"]} queries"', timing)
+        self.assertGreater(record['serializer_ms'], 0)
+        self.assertEqual(record['n_plus_one'], [])
+
+    @override_settings(REQUEST_INSTRUMENTATION_N_PLUS_ONE_THRESHOLD=0)
+    def test_repeated_template_is_flagged(self):
+        """Test that templates over the threshold are logged as a warning"""
+        with self.assertLogs('backend.instrumentation', level='WARNING') as logs:
+            self.client.get(reverse('dashboard:dashboard_data'), {'year': 2024})
+        record = json.loads(logs.records[0].getMessage())
+        self.assertTrue(record['n_plus_one'])
+
+    def test_template_ignores_parameter_list_length(self):
+        """Test that IN lists and multi-row VALUES collapse to one template"""
+        self.assertEqual(
+            sql_template('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+            sql_template('SELECT * FROM t WHERE id IN (%s)'),
+        )
+        self.assertEqual(
+            sql_template('INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)'),
+            sql_template('INSERT INTO t (a, b) VALUES (%s, %s)'),
+        )
+
+        profile = RequestProfile()
+        for pk in range(12):
+            profile.templates[sql_template('SELECT * FROM t WHERE id = %s')] += 1
+        self.assertEqual(profile.repeated_queries(10), [('SELECT * FROM t WHERE id = %s', 12)])
+
+    @override_settings(REQUEST_INSTRUMENTATION=False)
+    def test_disabled_by_setting(self):
+        """Test that no header is added when the setting is off"""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get(reverse('unique-solar-project-list'))
+        self.assertNotIn('Server-Timing', response)
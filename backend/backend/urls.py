@@ -17,7 +17,6 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -27,8 +26,6 @@ urlpatterns = [
     path('api/salary/', include('Salary.urls')),
     path('api/auth/', include('Authentication.urls')),
     path('api/dashboard/', include('Dashboard.urls')),
+    # Media files (with Range, ETag and X-Accel-Redirect/X-Sendfile support)
+    path(settings.MEDIA_URL.lstrip('/'), include('Media.urls')),
 ]
-
-# Serve media files in development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
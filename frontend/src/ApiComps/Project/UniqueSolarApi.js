@@ -53,11 +53,24 @@ export const createUniqueSolarProject = async (formData) => {
   }
 };
 
+// The list is paginated: follow the cursor links until every project is loaded
+const fetchAllUniqueSolarProjects = async () => {
+  const projects = [];
+  let response = await api.get("/project/unique-solar-projects/", {
+    params: { pagination: "cursor", page_size: 100 },
+  });
+  projects.push(...(response.data.results || response.data));
+  while (response.data.next) {
+    response = await api.get(response.data.next);
+    projects.push(...response.data.results);
+  }
+  return projects;
+};
+
 export const getUniqueSolarProjects = async () => {
   try {
-    const response = await api.get("/project/unique-solar-projects/");
-    const projects = response.data;
-    const transformedProjects = (projects.results || projects).map(project => {
+    const projects = await fetchAllUniqueSolarProjects();
+    const transformedProjects = projects.map(project => {
       const projectData = {
         ...project,
         company_name: "UNIQUE SOLAR",